@@ -0,0 +1,163 @@
+"""
+Chat memory access patterns of MongoDAL with thousands of chats of hundreds of messages each:
+the chat list (full documents vs projected summaries), message appends (returning the updated
+document vs the new message id) and loading the history of a question (whole chat vs $slice tail).
+
+Runs on an in-memory mongomock-motor database by default, which shows the cost of the documents each
+call moves around but not index use or network transfer. Pass --mongodb-uri to run against a real
+server, a throwaway database is created and dropped.
+
+Usage:
+    uv run --with mongomock-motor python benchmarks/chat_memory.py --chats 2000 --messages 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from stubs import percentile
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMemory, ChatMessage
+from openai_sdk_resume_assistant.backend.app.services.data_access_layer import MongoDAL
+
+WORDS = "data pipeline model azure python team project delivered improved designed cloud analytics".split()
+
+
+def make_chat(user_id: str, index: int, messages: int, rng: random.Random) -> dict:
+    """A chat document as stored before message_count was kept."""
+    created_at = datetime(2025, 1, 1) + timedelta(minutes=index)
+    return {
+        "chat_name": f"Chat {index}",
+        "user_id": user_id,
+        "created_at": created_at,
+        "chat_messages": [
+            {
+                "id": str(uuid4()),
+                "role": "user" if turn % 2 == 0 else "assistant",
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(10, 120))),
+                "timestamp": created_at + timedelta(seconds=turn),
+            }
+            for turn in range(messages)
+        ],
+    }
+
+
+async def legacy_add_message(collection, chat_id, role: str, content: str) -> ChatMemory | None:
+    """The previous append, returning the whole updated chat."""
+    message = ChatMessage(role=role, content=content)
+    doc = await collection.find_one_and_update(
+        {"_id": ObjectId(chat_id)}, {"$push": {"chat_messages": message.model_dump()}}, return_document=ReturnDocument.AFTER
+    )
+    return ChatMemory.from_doc(doc) if doc else None
+
+
+def payload_size(result) -> int:
+    """Bytes of the JSON response a route would send for the result."""
+    if isinstance(result, list):
+        return len(json.dumps([item.model_dump(mode="json") for item in result]))
+    if result is None or isinstance(result, str):
+        return len(json.dumps(result))
+    return len(result.model_dump_json())
+
+
+async def measure(name: str, calls: list, repeat: int) -> None:
+    latencies, sizes = [], []
+    for _ in range(repeat):
+        for call in calls:
+            start = time.perf_counter()
+            result = await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+            sizes.append(payload_size(result))
+    print(
+        f"{name:<34}{percentile(latencies, 50):>10.2f}{percentile(latencies, 95):>10.2f}{sum(sizes) / len(sizes) / 1024:>14.1f}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.mongodb_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(args.mongodb_uri)
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("Install mongomock-motor (uv run --with mongomock-motor ...) or pass --mongodb-uri")
+        client = AsyncMongoMockClient()
+    database = client[f"bench_chat_memory_{uuid4().hex[:8]}"]
+    collection = database["chat_memories"]
+    dal = MongoDAL(collection)
+
+    rng = random.Random(args.seed)
+    users = [f"user_{index}" for index in range(args.users)]
+    print(f"Seeding {args.chats} chats of {args.messages} messages for {args.users} users ...")
+    for start in range(0, args.chats, 100):
+        await collection.insert_many(
+            [
+                make_chat(users[index % args.users], index, args.messages, rng)
+                for index in range(start, min(start + 100, args.chats))
+            ]
+        )
+    # Chats are seeded in the previous layout, without message_count, and migrated here
+    await dal.ensure_indexes()
+    chat_ids = [str(doc["_id"]) async for doc in collection.find({}, {"_id": 1})]
+    owners = {str(doc["_id"]): doc["user_id"] async for doc in collection.find({}, {"user_id": 1})}
+    sample = rng.sample(chat_ids, min(args.samples, len(chat_ids)))
+    sample_users = rng.sample(users, min(args.samples, len(users)))
+
+    print(f"\n{'operation':<34}{'p50 ms':>10}{'p95 ms':>10}{'payload KiB':>14}")
+    await measure(
+        "chat list: all_chats (full docs)",
+        [lambda user=user: dal.get_all_chats(user_id=user, limit=50) for user in sample_users],
+        args.repeat,
+    )
+    await measure(
+        "chat list: chats (summaries)",
+        [lambda user=user: dal.list_chat_summaries(user_id=user, limit=50) for user in sample_users],
+        args.repeat,
+    )
+    await measure(
+        "append: return updated chat",
+        [lambda chat=chat: legacy_add_message(collection, chat, "user", "How many years of Python?") for chat in sample],
+        args.repeat,
+    )
+    await measure(
+        "append: return message id",
+        [lambda chat=chat: dal.add_message_to_chat(chat, "user", "How many years of Python?") for chat in sample],
+        args.repeat,
+    )
+    await measure(
+        "history: whole chat",
+        [lambda chat=chat: dal.get_chat_memory_for_user(chat, user_id=owners[chat]) for chat in sample],
+        args.repeat,
+    )
+    await measure(
+        "history: $slice tail",
+        [lambda chat=chat: dal.get_chat_history_for_user(chat, user_id=owners[chat]) for chat in sample],
+        args.repeat,
+    )
+    await measure(
+        "messages: page of 50",
+        [lambda chat=chat: dal.get_chat_messages_for_user(chat, user_id=owners[chat], before=100, limit=50) for chat in sample],
+        args.repeat,
+    )
+
+    await client.drop_database(database.name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mongodb-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
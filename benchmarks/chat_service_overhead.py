@@ -0,0 +1,78 @@
+"""
+Per-request overhead of building ChatService for every request (Depends(ChatService)) versus the
+app-scoped singleton injected with Depends(get_chat_service), measured on list_collection_items.
+
+No Azure calls are made: an API key is set so no credential probe runs, and the vector database
+lives in a temporary directory.
+
+Usage:
+    uv run python benchmarks/chat_service_overhead.py --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "fake")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1:9")
+os.environ.setdefault("VECTOR_DB_DIR", tempfile.mkdtemp(prefix="bench_vectorstore_"))
+os.environ.setdefault("EMBEDDING_CACHE_DIR", tempfile.mkdtemp(prefix="bench_embedding_cache_"))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from stubs import percentile  # noqa: E402
+
+from openai_sdk_resume_assistant.backend.app.services.chat_service import ChatService, get_chat_service  # noqa: E402
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/per_request")
+    def per_request(service: ChatService = Depends(ChatService)):
+        return service.list_collection_items()
+
+    @app.get("/singleton")
+    def singleton(service: ChatService = Depends(get_chat_service)):
+        return service.list_collection_items()
+
+    app.chat_service = ChatService()  # type: ignore
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples, time.perf_counter() - start
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'dependency':<14}{'mean (ms)':>11}{'p95 (ms)':>11}{'req/s':>10}")
+        for path in ("/per_request", "/singleton"):
+            await drive(client, path, args.concurrency, args.concurrency)  # warm up
+            samples, elapsed = await drive(client, path, args.requests, args.concurrency)
+            mean = sum(samples) / len(samples) * 1000
+            print(f"{path.strip('/'):<14}{mean:>11.1f}{percentile(samples, 95) * 1000:>11.1f}{args.requests / elapsed:>10.1f}")
+    await app.chat_service.aclose()  # type: ignore
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,54 @@
+"""
+Ingestion embedding throughput: one embeddings request per document versus the batched,
+concurrent EmbeddingPipeline, both against a local fake Azure OpenAI embeddings endpoint.
+
+Usage:
+    uv run python benchmarks/embeddings.py --documents 500 --latency 0.05 --throttle-rate 0.05
+"""
+
+import argparse
+import time
+
+from openai import AzureOpenAI
+from stubs import FakeAzureOpenAIServer
+
+from openai_sdk_resume_assistant.RAG.embedding_pipeline import EmbeddingPipeline
+
+
+def make_documents(count: int) -> list[str]:
+    words = "python azure fastapi chroma embeddings resume experience education skills project".split()
+    return [" ".join(words[(index + offset) % len(words)] for offset in range(80)) + f" #{index}" for index in range(count)]
+
+
+def main(args: argparse.Namespace) -> None:
+    documents = make_documents(args.documents)
+    with FakeAzureOpenAIServer(latency=args.latency, throttle_rate=args.throttle_rate) as server:
+        client = AzureOpenAI(azure_endpoint=server.endpoint, api_key="fake", api_version="2024-10-21", max_retries=0)
+        pipeline = EmbeddingPipeline(client, batch_size=args.batch_size, max_concurrency=args.concurrency, backoff_base=0.05)
+
+        results = {}
+
+        start = time.perf_counter()
+        sequential = [pipeline._embed_batch([document])[0] for document in documents]
+        results["sequential"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = pipeline.embed(documents)
+        results["pipeline"] = time.perf_counter() - start
+
+        assert batched == sequential, "Batched embeddings must match the per-document ones"
+
+        print(f"\n{'mode':<12}{'seconds':>10}{'docs/sec':>12}")
+        for mode, seconds in results.items():
+            print(f"{mode:<12}{seconds:>10.2f}{len(documents) / seconds:>12.1f}")
+        print(f"\nRequests served: {server.requests}, throttled: {server.throttled}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per embeddings request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,113 @@
+"""
+Retrieval quality and latency of dense-only, hybrid (BM25 + dense with reciprocal rank fusion) and
+hybrid + lexical reranking in RAGTool, on a synthetic resume corpus where every question names an
+exact term (company, certification or tool) that only a few chunks mention.
+
+Dense embeddings come from a local hashed character trigram model, so no Azure calls are made.
+
+Usage:
+    uv run python benchmarks/hybrid_retrieval.py --chunks 400 --top-k 5
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("VECTOR_DB_DIR", tempfile.mkdtemp(prefix="bench_vectorstore_"))
+os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+os.environ["QUERY_CACHE_ENABLED"] = "false"
+
+from stubs import LocalEmbeddingClient, percentile  # noqa: E402
+
+from openai_sdk_resume_assistant.RAG.hybrid_retrieval import LexicalReranker  # noqa: E402
+from openai_sdk_resume_assistant.RAG.rag_agent import RAGTool  # noqa: E402
+from openai_sdk_resume_assistant.RAG.vector_db import VectorDB  # noqa: E402
+
+COMPANIES = [
+    f"{prefix}{suffix}"
+    for prefix in ["Norva", "Kestrel", "Altamira", "Brightwave", "Quantix"]
+    for suffix in ["Labs", "Systems", "Analytics", "Group"]
+]
+CERTIFICATIONS = [
+    f"{vendor} {level}" for vendor in ["AZ-104", "AZ-204", "DP-100", "AI-102", "PL-300"] for level in ["Associate", "Expert"]
+]
+TOOLS = ["Airflow", "Terraform", "Kubernetes", "Snowflake", "dbt", "Kafka", "Databricks", "FastAPI", "LangChain", "Pinecone"]
+FILLER = [
+    "Worked closely with cross-functional teams to deliver data products and machine learning solutions.",
+    "Led the design of scalable pipelines and mentored junior engineers on best practices.",
+    "Improved reliability and reduced costs through automation and careful monitoring.",
+    "Collaborated with stakeholders to translate business requirements into technical designs.",
+    "Presented results to leadership and documented the architecture for future teams.",
+]
+
+
+def make_corpus(chunks: int, seed: int) -> tuple[list[str], list[tuple[str, str]]]:
+    """Chunks of resume-like filler mentioning one entity each, and (question, entity) pairs."""
+    rng = random.Random(seed)
+    entities = (
+        [("company", name) for name in COMPANIES]
+        + [("certification", name) for name in CERTIFICATIONS]
+        + [("tool", name) for name in TOOLS]
+    )
+    texts = []
+    for index in range(chunks):
+        kind, name = entities[index % len(entities)] if index < len(entities) * 2 else ("none", "")
+        sentences = rng.sample(FILLER, 3)
+        if kind == "company":
+            sentences.insert(rng.randrange(4), f"Joined {name} as a data engineer.")
+        elif kind == "certification":
+            sentences.insert(rng.randrange(4), f"Holds the {name} certification.")
+        elif kind == "tool":
+            sentences.insert(rng.randrange(4), f"Built production workflows with {name}.")
+        texts.append(" ".join(sentences) + f" (entry {index})")
+
+    questions = (
+        [(f"Did he work at {name}?", name) for name in COMPANIES]
+        + [(f"Does he hold the {name} certification?", name) for name in CERTIFICATIONS]
+        + [(f"Has he used {name}?", name) for name in TOOLS]
+    )
+    return texts, questions
+
+
+def main(args: argparse.Namespace) -> None:
+    texts, questions = make_corpus(args.chunks, args.seed)
+    client = LocalEmbeddingClient()
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        # One small file per chunk, so the splitter keeps every chunk intact
+        for index, text in enumerate(texts):
+            (Path(upload_dir) / f"chunk_{index:04d}.txt").write_text(text)
+        vector_db = VectorDB("bench_hybrid", azure_openai_client=client)  # type: ignore
+        vector_db.add_texts_to_collection(upload_dir, collection_name="bench_hybrid")
+
+    rag_tool = RAGTool("bench_hybrid", azure_ai_client=client, vector_db=vector_db)  # type: ignore
+    modes = {"dense": ("dense", None), "hybrid": ("hybrid", None), "hybrid+rerank": ("hybrid", LexicalReranker())}
+
+    print(f"\n{len(texts)} chunks, {len(questions)} exact-term questions, top_k={args.top_k}")
+    print(f"\n{'mode':<16}{'recall@k':>10}{'MRR':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for mode, (retrieval_mode, reranker) in modes.items():
+        rag_tool.retrieval_mode, rag_tool.reranker = retrieval_mode, reranker
+        hits, reciprocal_ranks, latencies = 0, 0.0, []
+        for question, entity in questions:
+            start = time.perf_counter()
+            documents, _ = rag_tool._find_similar(question, top_k=args.top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            rank = next((position for position, document in enumerate(documents, start=1) if entity in document), None)
+            if rank:
+                hits += 1
+                reciprocal_ranks += 1 / rank
+        print(
+            f"{mode:<16}{hits / len(questions):>10.2f}{reciprocal_ranks / len(questions):>8.2f}"
+            f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,333 @@
+"""
+End-to-end load test of the FastAPI app with local stand-ins for its services:
+
+- Azure OpenAI: FakeAzureOpenAIServer from stubs, serving embeddings and streamed chat completions
+  with a configurable latency and token rate
+- MongoDB: an in-memory mongomock-motor database, or a real server with --mongodb-uri
+- MCP: a local FastMCP stdio server standing in for the Playwright MCP server (this script with --serve-mcp)
+
+The app runs on uvicorn in a background thread with its own lifespan, in the default direct RAG mode.
+A resume is uploaded before the measurements so the questions retrieve documents. Each scenario is
+driven at the given concurrency by virtual users with their own chats, and reports the latency
+percentiles, the time to first answer chunk (ask_stream) and the throughput.
+
+With mongomock-motor the Beanie user store is not available, so requests are authenticated as fixed
+users through a dependency override instead of JWTs. With --mongodb-uri users register and log in.
+
+Usage:
+    uv run --with mongomock-motor python benchmarks/load_test.py --concurrency 10 --requests 50
+    uv run python benchmarks/load_test.py --scenarios ask_stream --token-rate 100 --mongodb-uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "fake")
+os.environ.setdefault("VECTOR_DB_DIR", tempfile.mkdtemp(prefix="bench_vectorstore_"))
+os.environ.setdefault("EMBEDDING_CACHE_DIR", tempfile.mkdtemp(prefix="bench_embedding_cache_"))
+os.environ.setdefault("MONGODB_URI", "mongodb://bench")
+os.environ.setdefault("DATABASE_NAME", f"bench_load_{uuid4().hex[:8]}")
+os.environ["RAG_MODE"] = "direct"
+
+import httpx  # noqa: E402
+from stubs import FakeAzureOpenAIServer, percentile  # noqa: E402
+
+SCENARIOS = ("ask_stream", "upload_files", "all_chats")
+RESUME = """Mohamed Ilyan is a data engineer with eight years of Python experience.
+He designed data pipelines on Azure, delivered analytics platforms and led a team of five engineers.
+Education: MSc in Computer Science. Skills: Python, SQL, Spark, Azure Data Factory, Docker, FastAPI.
+"""
+QUESTIONS = [
+    "What is his experience with Python?",
+    "Which cloud platforms has he worked with?",
+    "Has he led a team?",
+    "What did he study?",
+]
+
+
+def serve_mcp() -> None:
+    """Stand-in for the Playwright MCP server, one cheap tool so the agent lists and offers it."""
+    from fastmcp import FastMCP
+
+    mcp = FastMCP(name="bench_browser")
+
+    @mcp.tool(name="browser_navigate", description="Navigate to a URL")
+    async def browser_navigate(url: str) -> str:
+        return f"Navigated to {url}"
+
+    mcp.run(transport="stdio", show_banner=False)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    first_chunks: list[float] = field(default_factory=list)
+    chunks: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def use_mongomock(app) -> None:
+    """Swap the Motor client of the lifespan for mongomock-motor and authenticate without Beanie."""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("Install mongomock-motor (uv run --with mongomock-motor ...) or pass --mongodb-uri")
+    from fastapi import Request
+
+    from openai_sdk_resume_assistant.backend.app import mongodb
+    from openai_sdk_resume_assistant.backend.app.users import current_active_user
+
+    async def skip_init_beanie(**kwargs) -> None:
+        pass
+
+    # mongomock's bulk builder predates the sort option pymongo now passes with every UpdateOne
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    BulkOperationBuilder.add_update = lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+
+    # The lifespan uses the names bound in its module at import, those are swapped rather than the
+    # motor.motor_asyncio and beanie originals; the app lives as long as the process, the patches too
+    patch.object(mongodb, "AsyncIOMotorClient", AsyncMongoMockClient).start()
+    patch.object(mongodb, "init_beanie", skip_init_beanie).start()
+
+    def bench_user(request: Request) -> SimpleNamespace:
+        return SimpleNamespace(id=request.headers["authorization"].removeprefix("Bearer "), email="bench@example.com")
+
+    app.dependency_overrides[current_active_user] = bench_user
+
+
+def start_server(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 120
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise SystemExit("The app did not start, see the log above")
+        time.sleep(0.05)
+    return server, thread
+
+
+async def login(client: httpx.AsyncClient, index: int, real_auth: bool) -> dict[str, str]:
+    """Authorization header of a virtual user."""
+    if not real_auth:
+        return {"Authorization": f"Bearer {uuid4().hex[:24]}"}
+    email, password = f"bench_{index}_{uuid4().hex[:6]}@example.com", "bench-password"
+    (await client.post("/auth/register", json={"email": email, "password": password})).raise_for_status()
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_chat(client: httpx.AsyncClient, headers: dict[str, str], name: str) -> str:
+    response = await client.post("/api/chat/create_chat_memory", params={"chat_name": name}, headers=headers)
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def upload(client: httpx.AsyncClient, headers: dict[str, str], name: str, text: str, wait: bool) -> None:
+    response = await client.post(
+        "/api/chat/upload_files", files=[("files", (name, text.encode(), "text/plain"))], headers=headers
+    )
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while wait:
+        job = (await client.get(f"/api/chat/upload_jobs/{job_id}", headers=headers)).json()
+        if job["status"] == "failed":
+            raise RuntimeError(f"Ingestion failed: {job['errors']}")
+        if job["status"] == "completed":
+            return
+        await asyncio.sleep(0.05)
+
+
+async def ask(client: httpx.AsyncClient, headers: dict[str, str], chat_id: str, question: str, result: ScenarioResult) -> None:
+    start = time.perf_counter()
+    first_chunk = None
+    async with client.stream(
+        "POST", "/api/chat/ask_stream", json={"question": question, "chat_id": chat_id}, headers=headers
+    ) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif not line:
+                event = None
+            elif line.startswith("data: ") and event is None:
+                data = json.loads(line[6:])
+                if "error" in data:
+                    raise RuntimeError(data["error"])
+                if "chunk" in data:
+                    first_chunk = first_chunk or time.perf_counter()
+                    result.chunks += 1
+    if first_chunk is not None:
+        result.first_chunks.append(first_chunk - start)
+
+
+async def run_scenario(
+    name: str, client: httpx.AsyncClient, users: list[tuple[dict[str, str], str]], args: argparse.Namespace
+) -> ScenarioResult:
+    result = ScenarioResult(name)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(index: int) -> None:
+        headers, chat_id = users[index % len(users)]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if name == "ask_stream":
+                    await ask(client, headers, chat_id, f"{QUESTIONS[index % len(QUESTIONS)]} ({index})", result)
+                elif name == "upload_files":
+                    await upload(
+                        client, headers, f"notes_{index}.txt", f"{RESUME}\nNote {index}: {uuid4().hex}", args.wait_ingestion
+                    )
+                else:
+                    (await client.get("/api/chat/all_chats", headers=headers)).raise_for_status()
+            except Exception as e:
+                result.errors += 1
+                if result.errors == 1:
+                    print(f"  first {name} error: {type(e).__name__}: {e}")
+                return
+            result.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(args.requests)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def report(results: list[ScenarioResult]) -> None:
+    print(
+        f"\n{'scenario':<14}{'ok':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'TTFT p50':>10}{'TTFT p95':>10}{'TTFT p99':>10}{'req/s':>8}{'chunks/s':>10}"
+    )
+    for result in results:
+        samples, ttft = result.latencies or [0.0], result.first_chunks
+        ttft_columns = "".join(f"{percentile(ttft, q) * 1000:>10.0f}" for q in (50, 95, 99)) if ttft else f"{'-':>10}" * 3
+        print(
+            f"{result.name:<14}{len(result.latencies):>6}{result.errors:>5}"
+            + "".join(f"{percentile(samples, q) * 1000:>9.0f}" for q in (50, 95, 99))
+            + ttft_columns
+            + f"{len(result.latencies) / result.elapsed:>8.1f}{result.chunks / result.elapsed:>10.0f}"
+        )
+
+
+async def drive(port: int, args: argparse.Namespace, real_auth: bool) -> list[ScenarioResult]:
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        users = []
+        for index in range(args.users):
+            headers = await login(client, index, real_auth)
+            for chat in range(args.seed_chats):
+                await create_chat(client, headers, f"Seeded chat {chat}")
+            users.append((headers, await create_chat(client, headers, f"Load test {index}")))
+
+        # The resume the questions retrieve from, and a warm-up question per user
+        await upload(client, users[0][0], "resume.txt", RESUME, wait=True)
+        warm_up = ScenarioResult("warm_up")
+        await asyncio.gather(*(ask(client, headers, chat_id, QUESTIONS[0], warm_up) for headers, chat_id in users))
+
+        results = []
+        for name in args.scenarios:
+            print(f"Running {name}: {args.requests} requests, {args.concurrency} concurrent ...")
+            results.append(await run_scenario(name, client, users, args))
+        return results
+
+
+def main(args: argparse.Namespace) -> None:
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    fake = FakeAzureOpenAIServer(
+        latency=args.embedding_latency,
+        chat_latency=args.model_latency,
+        token_rate=args.token_rate,
+        answer_tokens=args.answer_tokens,
+    )
+    with fake:
+        os.environ["AZURE_OPENAI_ENDPOINT"] = fake.endpoint
+
+        # Point the agent's MCP server at the local stand-in before the app builds its pools
+        from openai_sdk_resume_assistant.mcp_params import playwright_params
+
+        playwright_params.clear()
+        playwright_params.update({"command": sys.executable, "args": [str(Path(__file__).resolve()), "--serve-mcp"]})
+
+        from openai_sdk_resume_assistant.backend.app.main import app
+
+        real_auth = bool(args.mongodb_uri)
+        if real_auth:
+            os.environ["MONGODB_URI"] = args.mongodb_uri
+            from openai_sdk_resume_assistant.backend.app import mongodb
+
+            mongodb.MONGODB_URI = args.mongodb_uri
+        else:
+            use_mongomock(app)
+
+        port = free_port()
+        server, thread = start_server(app, port)
+        try:
+            results = asyncio.run(drive(port, args, real_auth))
+        finally:
+            server.should_exit = True
+            thread.join(timeout=30)
+            if real_auth:
+                from pymongo import MongoClient
+
+                MongoClient(args.mongodb_uri).drop_database(os.environ["DATABASE_NAME"])
+
+    print(
+        f"\nStand-ins: model {args.model_latency}s to first token, {args.token_rate or 'unthrottled'} tokens/s, "
+        f"{args.answer_tokens} tokens per answer, embeddings {args.embedding_latency}s. "
+        f"{fake.chat_requests} chat completions, {fake.requests - fake.chat_requests} embeddings requests."
+    )
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS), help=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=5, help="Virtual users, each with its own chat")
+    parser.add_argument("--seed-chats", type=int, default=20, help="Extra chats per user listed by all_chats")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Seconds per chat completion before the first token")
+    parser.add_argument("--token-rate", type=float, default=50, help="Streamed tokens per second, 0 for unthrottled")
+    parser.add_argument("--answer-tokens", type=int, default=100)
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Seconds per embeddings request")
+    parser.add_argument("--wait-ingestion", action="store_true", help="Time uploads until their ingestion job completes")
+    parser.add_argument("--mongodb-uri", default=None)
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the app")
+    parser.add_argument("--serve-mcp", action="store_true", help=argparse.SUPPRESS)
+    parsed = parser.parse_args()
+    if unknown := set(parsed.scenarios) - set(SCENARIOS):
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    if parsed.serve_mcp:
+        serve_mcp()
+    else:
+        main(parsed)
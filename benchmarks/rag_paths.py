@@ -0,0 +1,129 @@
+"""
+Latency comparison between the two RAG topologies of the resume agent, using a stubbed model:
+
+- direct:     the RAG tool is registered as a native function tool on the resume agent
+- mcp:        resume agent -> stdio MCP server -> nested RAG agent -> RAG tool, spawned per run
+- mcp-pooled: same as mcp, but the MCP server is leased from a warm MCPSessionManager pool
+
+The Playwright MCP server is left out of every path so only the retrieval topology is compared.
+
+Usage:
+    uv run python benchmarks/rag_paths.py --requests 20 --model-latency 0.3
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from agents import set_tracing_disabled
+from stubs import TOOL_ERROR_MESSAGE, StubModel, StubRAGTool, percentile
+
+from openai_sdk_resume_assistant.base_agent import AIAgent
+from openai_sdk_resume_assistant.mcp_pool import MCPSessionManager
+from openai_sdk_resume_assistant.RAG.rag_agent import create_rag_function_tool
+
+set_tracing_disabled(True)
+
+QUESTION = "What is his experience with Python?"
+
+
+def serve_rag_mcp(model_latency: float, retrieval_latency: float) -> None:
+    """Mirror of mcp_servers/rag_agent_server.py with the stubbed model and retrieval."""
+    from fastmcp import FastMCP
+
+    rag_mcp = FastMCP(name="bench_rag_agent_server")
+    rag_agent = AIAgent(
+        name="RAGAgent",
+        instructions="",
+        model=StubModel(latency=model_latency),
+        mcp_params=[],
+        tools=[create_rag_function_tool(StubRAGTool(retrieval_latency))],  # type: ignore
+    )
+
+    @rag_mcp.tool(name="RAG_tool", description="RAG tool for retrieving relevant documents from the vector database")
+    async def rag_agent_tool(query: str) -> str:
+        return await rag_agent.run_agent_with_mcp(query)
+
+    rag_mcp.run(transport="stdio", show_banner=False)
+
+
+async def run(agent: AIAgent) -> None:
+    # The stubbed answer echoes the tool output, a failed tool would otherwise be timed as a fast run
+    answer = await agent.run_agent_with_mcp(QUESTION)
+    if TOOL_ERROR_MESSAGE in str(answer):
+        raise RuntimeError(f"The RAG tool failed: {answer}")
+
+
+async def time_runs(agent: AIAgent, requests: int) -> list[float]:
+    await run(agent)  # warm up
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await run(agent)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    rag_server_params = {
+        "command": sys.executable,
+        "args": [
+            str(Path(__file__).resolve()),
+            "--serve-rag-mcp",
+            "--model-latency",
+            str(args.model_latency),
+            "--retrieval-latency",
+            str(args.retrieval_latency),
+        ],
+    }
+
+    direct_agent = AIAgent(
+        name="ResumeAgent",
+        instructions="",
+        model=StubModel(latency=args.model_latency),
+        mcp_params=[],
+        tools=[create_rag_function_tool(StubRAGTool(args.retrieval_latency))],  # type: ignore
+    )
+    mcp_agent = AIAgent(
+        name="ResumeAgent",
+        instructions="",
+        model=StubModel(latency=args.model_latency),  # type: ignore
+        mcp_params=rag_server_params,
+    )
+    session_manager = MCPSessionManager(pool_size=1)
+    session_manager.add_server(rag_server_params)
+    pooled_agent = AIAgent(
+        name="ResumeAgent",
+        instructions="",
+        model=StubModel(latency=args.model_latency),  # type: ignore
+        mcp_params=rag_server_params,
+        session_manager=session_manager,
+    )
+
+    results = {
+        "direct": await time_runs(direct_agent, args.requests),
+        "mcp": await time_runs(mcp_agent, args.requests),
+        "mcp-pooled": await time_runs(pooled_agent, args.requests),
+    }
+    await session_manager.close()
+
+    print(f"\n{'path':<12}{'mean (s)':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+    for path, samples in results.items():
+        mean = sum(samples) / len(samples)
+        print(f"{path:<12}{mean:>10.3f}{percentile(samples, 50):>10.3f}{percentile(samples, 95):>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Seconds per stubbed LLM call")
+    parser.add_argument("--retrieval-latency", type=float, default=0.05, help="Seconds per stubbed retrieval")
+    parser.add_argument("--serve-rag-mcp", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_rag_mcp:
+        serve_rag_mcp(args.model_latency, args.retrieval_latency)
+    else:
+        asyncio.run(main(args))
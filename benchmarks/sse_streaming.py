@@ -0,0 +1,100 @@
+"""
+SSE framing cost of a streamed answer: one frame per model delta with string concatenation (the
+previous ask_stream generator) versus AnswerStream coalescing deltas by size and time.
+
+A fake upstream emits short text deltas at a given token rate, the responses are served by a FastAPI
+app and read through httpx, so the frames go through the Starlette streaming response.
+
+Usage:
+    uv run python benchmarks/sse_streaming.py --streams 20 --tokens 2000 --rate 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from openai_sdk_resume_assistant.backend.app.services.sse_stream import AnswerStream, sse_frame
+
+
+async def fake_deltas(tokens: int, rate: float) -> AsyncIterator[str]:
+    """Deltas of one or two words, like the chat completions stream, at rate tokens per second (0 is unthrottled)."""
+    for index in range(tokens):
+        yield f" word{index % 97}" if index % 3 else f" w{index % 7}."
+        await asyncio.sleep(1 / rate if rate > 0 else 0)
+
+
+def create_app(tokens: int, rate: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/per_delta")
+    async def per_delta():
+        async def event_generator():
+            full_response = ""
+            async for chunk in fake_deltas(tokens, rate):
+                full_response += chunk
+                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
+            yield f"data: {json.dumps({'done': True})}\n\n"
+
+        return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+    @app.get("/coalesced")
+    async def coalesced(request: Request):
+        stream = AnswerStream(fake_deltas(tokens, rate), is_disconnected=request.is_disconnected)
+
+        async def event_generator():
+            async for frame in stream.frames():
+                yield frame
+            yield sse_frame({"done": True})
+
+        return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+    return app
+
+
+async def read_stream(client: httpx.AsyncClient, path: str) -> tuple[int, int, str]:
+    frames, size, text = 0, 0, []
+    async with client.stream("GET", path) as response:
+        async for line in response.aiter_lines():
+            size += len(line) + 1
+            if line.startswith("data: "):
+                frames += 1
+                text.append(json.loads(line[6:]).get("chunk", ""))
+    return frames, size, "".join(text)
+
+
+async def run(path: str, args: argparse.Namespace) -> None:
+    transport = httpx.ASGITransport(app=create_app(args.tokens, args.rate))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await read_stream(client, path)  # Warm up
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        results = await asyncio.gather(*[read_stream(client, path) for _ in range(args.streams)])
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    frames = sum(result[0] for result in results)
+    size = sum(result[1] for result in results)
+    assert len({result[2] for result in results}) == 1, "streams returned different text"
+    print(
+        f"{path:<14}{frames / args.streams:>12.0f}{frames / wall:>12.0f}{size / args.streams / 1024:>12.1f}"
+        f"{cpu / args.streams * 1000:>14.1f}{wall:>10.2f}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"\n{args.streams} concurrent streams of {args.tokens} deltas at {args.rate or 'unthrottled'} tokens/s")
+    print(f"{'framing':<14}{'frames/req':>12}{'frames/s':>12}{'KiB/req':>12}{'CPU ms/req':>14}{'wall s':>10}")
+    for path in ["/per_delta", "/coalesced"]:
+        await run(path, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500, help="Tokens per second per stream, 0 for unthrottled")
+    asyncio.run(main(parser.parse_args()))
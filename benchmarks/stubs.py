@@ -0,0 +1,361 @@
+"""
+Stand-ins for the model and retrieval used by the benchmarks, so they run
+without Azure OpenAI credentials or a populated vector store.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections.abc import AsyncIterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+from agents import Model, ModelResponse, Usage
+from agents.items import TResponseStreamEvent
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemDoneEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+# Start of the tool output the agents SDK sends the model when a function tool raises
+TOOL_ERROR_MESSAGE = "An error occurred while running the tool"
+
+
+class StubModel(Model):
+    """
+    Model that calls the first available tool once with the user's input and then answers
+    with the tool output, streamed or not. Every call sleeps for `latency` seconds to stand in for an LLM round trip.
+    """
+
+    def __init__(self, latency: float = 0.3, answer_prefix: str = "Answer"):
+        self.latency = latency
+        self.answer_prefix = answer_prefix
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ModelResponse(output=[self._output(input, tools)], usage=Usage(), response_id=None)
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        """The same turn as get_response, streamed: the answer word by word, then the completed output item."""
+        await asyncio.sleep(self.latency)
+        output = self._output(input, tools)
+        sequence = itertools.count()
+        if isinstance(output, ResponseOutputMessage):
+            for delta in re.findall(r"\S+\s*", output.content[0].text):  # type: ignore
+                yield ResponseTextDeltaEvent(
+                    content_index=0,
+                    delta=delta,
+                    item_id=output.id,
+                    output_index=0,
+                    logprobs=[],
+                    sequence_number=next(sequence),
+                    type="response.output_text.delta",
+                )
+        yield ResponseOutputItemDoneEvent(
+            item=output, output_index=0, sequence_number=next(sequence), type="response.output_item.done"
+        )
+        response = Response(
+            id=f"resp_{uuid4().hex}",
+            created_at=time.time(),
+            model="stub",
+            object="response",
+            output=[output],
+            tool_choice="auto",
+            tools=[],
+            top_p=None,
+            parallel_tool_calls=False,
+        )
+        yield ResponseCompletedEvent(response=response, sequence_number=next(sequence), type="response.completed")
+
+    def _output(self, input, tools) -> ResponseFunctionToolCall | ResponseOutputMessage:
+        items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+        tool_outputs = [item for item in items if item.get("type") == "function_call_output"]
+
+        if tools and not tool_outputs:
+            user_input = next(item["content"] for item in items if item.get("role") == "user")
+            output = ResponseFunctionToolCall(
+                id=f"fc_{uuid4().hex}",
+                call_id=f"call_{uuid4().hex}",
+                name=tools[0].name,
+                arguments=json.dumps(self._tool_arguments(tools[0], user_input)),
+                type="function_call",
+                status="completed",
+            )
+        else:
+            tool_output = tool_outputs[-1]["output"] if tool_outputs else ""
+            output = ResponseOutputMessage(
+                id=f"msg_{uuid4().hex}",
+                content=[ResponseOutputText(text=f"{self.answer_prefix}: {tool_output}", type="output_text", annotations=[])],
+                role="assistant",
+                status="completed",
+                type="message",
+            )
+        return output
+
+    @staticmethod
+    def _tool_arguments(tool, user_input: str) -> dict[str, str]:
+        # Fill the first string parameter of the tool with the user input
+        properties = tool.params_json_schema.get("properties", {}) if hasattr(tool, "params_json_schema") else {}
+        name = next(iter(properties), "query")
+        return {name: user_input}
+
+
+class StubRAGTool:
+    """Duck-typed RAGTool returning canned context after a fixed embedding + query delay."""
+
+    def __init__(self, retrieval_latency: float = 0.05):
+        self.retrieval_latency = retrieval_latency
+
+    def create_rag_context(self, text_input: str, collection_name: str | None = None) -> str:
+        time.sleep(self.retrieval_latency)
+        return f"Potentially related Document: resume page about '{text_input}'\nPage number: 0\n\n"
+
+
+def fake_embedding(text: str, dim: int) -> list[float]:
+    """Deterministic unit vector for the text, so equal texts get equal embeddings."""
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vector = rng.standard_normal(dim).astype("float32")
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def hashed_embedding(text: str, dim: int = 256) -> list[float]:
+    """Unit vector of hashed character trigrams, a crude local stand-in for a semantic embedding model."""
+    vector = np.zeros(dim, dtype="float32")
+    normalized = f" {' '.join(text.lower().split())} "
+    for start in range(len(normalized) - 2):
+        vector[zlib.crc32(normalized[start : start + 3].encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+class LocalEmbeddingClient:
+    """Duck-typed Azure OpenAI client whose embeddings.create runs a local embedding function in-process."""
+
+    def __init__(self, embed=hashed_embedding):
+        self.embed = embed
+        self.embeddings = self
+        self.requests = 0
+
+    def create(self, input: str | list[str], model: str) -> SimpleNamespace:
+        self.requests += 1
+        texts = [input] if isinstance(input, str) else input
+        tokens = sum(len(text.split()) for text in texts)
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=index, embedding=self.embed(text)) for index, text in enumerate(texts)],
+            usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens),
+        )
+
+
+class FakeAzureOpenAIServer:
+    """
+    Local HTTP stand-in for the Azure OpenAI embeddings and chat completions endpoints.
+    A chat completion offered tools calls the RAG tool (or the first tool) once with the last user
+    message, then answers; streamed answers are sent token by token at token_rate. A failed tool call
+    is answered with a 400, so the benchmarks fail instead of timing the error.
+    Args:
+        latency (float): Seconds added to every embeddings request.
+        latency_per_input (float): Extra seconds per embedded input.
+        throttle_rate (float): Fraction of embeddings requests answered with 429 and a retry-after header.
+        dim (int): Embedding dimension.
+        chat_latency (float): Seconds before the first token (or the whole response) of a chat completion.
+        token_rate (float): Streamed tokens per second per completion, 0 for no delay.
+        answer_tokens (int): Tokens of an answer.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        latency_per_input: float = 0.001,
+        throttle_rate: float = 0.0,
+        dim: int = 1536,
+        chat_latency: float = 0.3,
+        token_rate: float = 50.0,
+        answer_tokens: int = 100,
+    ):
+        self.latency = latency
+        self.latency_per_input = latency_per_input
+        self.throttle_rate = throttle_rate
+        self.dim = dim
+        self.chat_latency = chat_latency
+        self.token_rate = token_rate
+        self.answer_tokens = answer_tokens
+        self.requests = 0
+        self.throttled = 0
+        self.chat_requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake.requests += 1
+                if self.path.split("?")[0].endswith("/embeddings"):
+                    self._embeddings(request)
+                elif self.path.split("?")[0].endswith("/chat/completions"):
+                    fake.chat_requests += 1
+                    self._chat_completions(request)
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def _embeddings(self, request: dict) -> None:
+                if random.random() < fake.throttle_rate:
+                    fake.throttled += 1
+                    self._send_json(429, {"error": {"code": "429", "message": "Rate limit"}}, {"retry-after": "0.05"})
+                    return
+                inputs = request["input"] if isinstance(request["input"], list) else [request["input"]]
+                time.sleep(fake.latency + fake.latency_per_input * len(inputs))
+                data = [
+                    {"object": "embedding", "index": index, "embedding": fake_embedding(text, fake.dim)}
+                    for index, text in enumerate(inputs)
+                ]
+                tokens = sum(len(text) // 4 + 1 for text in inputs)
+                self._send_json(
+                    200,
+                    {
+                        "object": "list",
+                        "data": data,
+                        "model": request.get("model", ""),
+                        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                    },
+                )
+
+            def _chat_completions(self, request: dict) -> None:
+                messages = request.get("messages", [])
+                prompt_tokens = sum(len(str(message.get("content") or "")) // 4 + 1 for message in messages)
+                tools = request.get("tools") or []
+                after_question = messages[-1:] if messages and messages[-1].get("role") == "tool" else []
+                time.sleep(fake.chat_latency)
+                if after_question and TOOL_ERROR_MESSAGE in str(after_question[0].get("content")):
+                    self._send_json(400, {"error": {"code": "tool_error", "message": after_question[0]["content"]}})
+                    return
+
+                if tools and not after_question:
+                    function = next((tool for tool in tools if "rag" in tool["function"]["name"].lower()), tools[0])["function"]
+                    question = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+                    parameter = next(iter(function.get("parameters", {}).get("properties", {})), "query")
+                    call = {
+                        "index": 0,
+                        "id": f"call_{uuid4().hex}",
+                        "type": "function",
+                        "function": {"name": function["name"], "arguments": json.dumps({parameter: question})},
+                    }
+                    deltas, finish_reason, completion_tokens = [{"role": "assistant", "tool_calls": [call]}], "tool_calls", 20
+                else:
+                    words = [f" word{index % 89}" if index % 9 else " done." for index in range(fake.answer_tokens)]
+                    deltas = [{"role": "assistant", "content": ""}] + [{"content": word} for word in words]
+                    finish_reason, completion_tokens = "stop", len(words)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+                completion = {"id": f"chatcmpl-{uuid4().hex}", "created": int(time.time()), "model": request.get("model", "")}
+
+                if not request.get("stream"):
+                    message = {"role": "assistant", "content": "".join(delta.get("content", "") for delta in deltas) or None}
+                    if finish_reason == "tool_calls":
+                        message["tool_calls"] = [{key: value for key, value in call.items() if key != "index"}]
+                    choice = {"index": 0, "message": message, "finish_reason": finish_reason}
+                    self._send_json(200, {**completion, "object": "chat.completion", "choices": [choice], "usage": usage})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                chunk = {**completion, "object": "chat.completion.chunk"}
+                for index, delta in enumerate(deltas):
+                    if index > 1 and fake.token_rate > 0:
+                        time.sleep(1 / fake.token_rate)
+                    self._send_event({**chunk, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                self._send_event({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]})
+                self._send_event({**chunk, "choices": [], "usage": usage})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_event(self, payload: dict) -> None:
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+                self.wfile.flush()
+
+        return Handler
+
+    def __enter__(self) -> "FakeAzureOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def write_synthetic_pdf(path: Path, pages: int, lines_per_page: int = 40) -> Path:
+    """Write a minimal text-only PDF with the given number of pages, built by hand so no PDF writer is needed."""
+    words = "python azure fastapi chroma embeddings resume experience education skills project".split()
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page in range(pages):
+        lines = [
+            f"({' '.join(words[(page + line + offset) % len(words)] for offset in range(12))} {page}.{line}) Tj T*"
+            for line in range(lines_per_page)
+        ]
+        stream = f"BT /F1 10 Tf 12 TL 40 780 Td {' '.join(lines)} ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % len(objects)
+        )
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), pages)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(output)
+    return path
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import chromadb
+from chromadb.api import ClientAPI
+from chromadb.errors import NotFoundError
+from loguru import logger
+
+# Open collection handles kept per database, the least recently used ones are closed beyond this
+VECTOR_DB_MAX_OPEN_COLLECTIONS = int(os.getenv("VECTOR_DB_MAX_OPEN_COLLECTIONS", "256"))
+# Seconds a collection handle, and its BM25 index, is kept without being used
+VECTOR_DB_COLLECTION_IDLE_TTL = float(os.getenv("VECTOR_DB_COLLECTION_IDLE_TTL", "600"))
+
+
+@dataclass
+class CollectionStats:
+    """Counts of a collection as of its last ingestion, kept in the collection metadata."""
+
+    chunk_count: int = 0
+    file_count: int = 0
+    last_ingested_at: float | None = None  # Unix time
+
+    CHUNK_COUNT_KEY = "chunk_count"
+    FILE_COUNT_KEY = "file_count"
+    LAST_INGESTED_KEY = "last_ingested_at"
+
+    @classmethod
+    def from_metadata(cls, metadata: dict | None) -> "CollectionStats":
+        metadata = metadata or {}
+        return cls(
+            chunk_count=int(metadata.get(cls.CHUNK_COUNT_KEY, 0)),
+            file_count=int(metadata.get(cls.FILE_COUNT_KEY, 0)),
+            last_ingested_at=metadata.get(cls.LAST_INGESTED_KEY),
+        )
+
+    def to_metadata(self) -> dict[str, int | float]:
+        metadata: dict[str, int | float] = {self.CHUNK_COUNT_KEY: self.chunk_count, self.FILE_COUNT_KEY: self.file_count}
+        if self.last_ingested_at is not None:
+            metadata[self.LAST_INGESTED_KEY] = self.last_ingested_at
+        return metadata
+
+
+class CollectionRegistry:
+    """
+    Open collection handles of a chroma database, so lookups and creation are a dict access or a single
+    get/get_or_create call instead of listing every collection. Handles are kept in least recently used
+    order, idle ones and those beyond the capacity are closed; pinned collections stay open.
+    Args:
+        client: The chroma client of the database.
+        max_open: Handles kept open at most, pinned ones not included.
+        idle_ttl: Seconds a handle is kept without being used.
+        on_evict: Called with the name of each closed collection, e.g. to drop indexes built over it.
+    """
+
+    def __init__(
+        self,
+        client: ClientAPI,
+        max_open: int = VECTOR_DB_MAX_OPEN_COLLECTIONS,
+        idle_ttl: float = VECTOR_DB_COLLECTION_IDLE_TTL,
+        on_evict: Callable[[str], None] | None = None,
+    ):
+        self.client = client
+        self.max_open = max_open
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        # name -> (collection, last used), in order of last use
+        self._collections: OrderedDict[str, tuple[chromadb.Collection, float]] = OrderedDict()
+        self._pinned: dict[str, chromadb.Collection] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._collections) + len(self._pinned)
+
+    def _cached(self, name: str) -> chromadb.Collection | None:
+        now = time.monotonic()
+        with self._lock:
+            if (pinned := self._pinned.get(name)) is not None:
+                return pinned
+            entry = self._collections.get(name)
+            if entry is None or now - entry[1] >= self.idle_ttl:
+                return None
+            self._collections[name] = (entry[0], now)
+            self._collections.move_to_end(name)
+            return entry[0]
+
+    def _remember(self, collection: chromadb.Collection) -> None:
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            if collection.name in self._pinned:
+                self._pinned[collection.name] = collection
+                return
+            self._collections[collection.name] = (collection, now)
+            self._collections.move_to_end(collection.name)
+            # Idle handles are at the front
+            while self._collections:
+                name, (_, last_used) = next(iter(self._collections.items()))
+                if len(self._collections) <= self.max_open and now - last_used < self.idle_ttl:
+                    break
+                del self._collections[name]
+                evicted.append(name)
+        if evicted:
+            if self.on_evict is not None:
+                for name in evicted:
+                    self.on_evict(name)
+            logger.debug(f"Closed {len(evicted)} idle collection handle(s)")
+
+    def get(self, name: str) -> chromadb.Collection | None:
+        """Handle of an existing collection, None when there is no such collection."""
+        if (collection := self._cached(name)) is not None:
+            return collection
+        try:
+            collection = self.client.get_collection(name=name)
+        except NotFoundError:
+            return None
+        self._remember(collection)
+        return collection
+
+    def get_or_create(self, name: str, fresh: bool = False) -> chromadb.Collection:
+        """
+        Handle of the collection, created when it does not exist.
+        Args:
+            name: The collection name.
+            fresh: Read the collection again instead of using the open handle, whose metadata (the
+                ingestion manifest and stats) may be behind writes of other processes.
+        """
+        if not fresh and (collection := self._cached(name)) is not None:
+            return collection
+        collection = self.client.get_or_create_collection(name=name)
+        self._remember(collection)
+        return collection
+
+    def pin(self, name: str) -> chromadb.Collection:
+        """Get or create a collection kept open however long it is idle."""
+        collection = self.get_or_create(name)
+        with self._lock:
+            self._pinned[name] = collection
+            self._collections.pop(name, None)
+        return collection
+
+    def is_pinned(self, name: str) -> bool:
+        return name in self._pinned
+
+    def invalidate(self, name: str) -> None:
+        """Close the handle of the collection, the next lookup reads it from the database."""
+        with self._lock:
+            found = self._collections.pop(name, None) is not None
+            found = self._pinned.pop(name, None) is not None or found
+        if found and self.on_evict is not None:
+            self.on_evict(name)
+
+    def delete(self, name: str) -> bool:
+        """Delete the collection from the database, False when it did not exist."""
+        try:
+            self.client.delete_collection(name=name)
+        except NotFoundError:
+            return False
+        finally:
+            self.invalidate(name)
+        return True
+
+    def stats(self, name: str) -> CollectionStats | None:
+        """Chunk and file counts and last ingestion time of the collection, None when it does not exist."""
+        if (collection := self.get(name)) is None:
+            return None
+        return CollectionStats.from_metadata(collection.metadata)
@@ -0,0 +1,125 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from openai_sdk_resume_assistant.RAG.embedding_pipeline import estimate_tokens
+
+# Token budget of the retrieved context handed to the agent
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+# Chunks retrieved per question before deduplication and budgeting
+RAG_CONTEXT_TOP_K = int(os.getenv("RAG_CONTEXT_TOP_K", "5"))
+
+CONTEXT_HEADER = "To provide some context, here are some relevant documents:\n\n"
+# Matches the documents of a built context, see ContextBuilder.build
+CONTEXT_DOCUMENT_PATTERN = re.compile(r"Potentially related Document \(source: (.*?)\): .*?\nPage number: (\S+)\n", re.DOTALL)
+# Text chunks overlap by up to 100 characters (see the splitter in VectorDB), with some slack for whitespace
+MAX_CHUNK_OVERLAP = 200
+# Truncated documents shorter than this are left out instead
+MIN_TRUNCATED_TOKENS = 50
+
+
+@dataclass
+class RetrievedChunk:
+    text: str
+    metadata: dict[str, Any]
+    score: float
+
+    @property
+    def source(self) -> str:
+        return str(self.metadata.get("file_name", ""))
+
+    @property
+    def page(self) -> int:
+        return int(self.metadata.get("page", 0))
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    tokens_used: int
+    chunks_used: int
+    chunks_dropped: int  # Duplicates, merged away or over the budget
+
+
+def _merge_overlapping(first: str, second: str) -> str:
+    """Concatenate two consecutive chunks, dropping the text the splitter repeated at the start of the second."""
+    for size in range(min(len(first), len(second), MAX_CHUNK_OVERLAP), 0, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first}\n{second}"
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """Cut the text to roughly the given number of tokens at a word boundary."""
+    cut = text[: tokens * 4]
+    if len(cut) < len(text) and " " in cut:
+        cut = cut[: cut.rindex(" ")]
+    return cut.rstrip() + " ..."
+
+
+def parse_context_sources(text: str) -> list[dict[str, str]]:
+    """The source file and page of each document in a built context, in context order."""
+    return [{"source": source, "page": page} for source, page in CONTEXT_DOCUMENT_PATTERN.findall(text)]
+
+
+class ContextBuilder:
+    """
+    Assembles retrieved chunks into a prompt context within a token budget.
+    Chunks contained in an already selected chunk are dropped, consecutive chunks (pages) of the same
+    file are merged into one document with the repeated overlap removed, and documents are added in
+    order of their best chunk score while they fit the budget, truncating a document that only fits partly.
+    Args:
+        token_budget (int): Maximum estimated tokens of the built context.
+    """
+
+    def __init__(self, token_budget: int = RAG_CONTEXT_TOKEN_BUDGET):
+        self.token_budget = token_budget
+
+    def build(self, chunks: list[RetrievedChunk]) -> BuiltContext:
+        # Dedupe, best scored first so the kept copy is the most relevant one
+        unique: list[RetrievedChunk] = []
+        for chunk in sorted(chunks, key=lambda chunk: chunk.score, reverse=True):
+            text = " ".join(chunk.text.split())
+            if text and not any(text in " ".join(kept.text.split()) for kept in unique):
+                unique.append(chunk)
+
+        # Group runs of consecutive pages / chunks of the same file
+        groups: list[list[RetrievedChunk]] = []
+        for chunk in sorted(unique, key=lambda chunk: (chunk.source, chunk.page)):
+            previous = groups[-1][-1] if groups else None
+            if previous and previous.source == chunk.source and chunk.page - previous.page == 1:
+                groups[-1].append(chunk)
+            else:
+                groups.append([chunk])
+        groups.sort(key=lambda group: max(chunk.score for chunk in group), reverse=True)
+
+        parts: list[str] = []
+        tokens_used = estimate_tokens(CONTEXT_HEADER)
+        chunks_used = 0
+        for group in groups:
+            text = group[0].text
+            for chunk in group[1:]:
+                text = _merge_overlapping(text, chunk.text)
+            page = str(group[0].page) if len(group) == 1 else f"{group[0].page}-{group[-1].page}"
+            prefix = f"Potentially related Document (source: {group[0].source}): "
+            suffix = f"\nPage number: {page}\n\n"
+
+            available = self.token_budget - tokens_used - estimate_tokens(prefix + suffix)
+            if available < estimate_tokens(text):
+                if available < MIN_TRUNCATED_TOKENS:
+                    # A smaller, lower scored document may still fit
+                    continue
+                # Leave room for the " ..." marker and the rounding of the estimate
+                text = _truncate(text, available - 2)
+            part = prefix + text + suffix
+            parts.append(part)
+            tokens_used += estimate_tokens(part)
+            chunks_used += len(group)
+
+        return BuiltContext(
+            text=CONTEXT_HEADER + "".join(parts),
+            tokens_used=tokens_used,
+            chunks_used=chunks_used,
+            chunks_dropped=len(chunks) - chunks_used,
+        )
@@ -0,0 +1,147 @@
+"""
+Uploaded documents handed straight to ingestion, without a temp directory round trip. Small documents
+stay in memory, larger ones are spilled to a temp file so a batch upload never holds every file in memory,
+and the content hash is computed while the bytes arrive.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+# Documents up to this size are kept in memory, larger ones are spilled to a temp file
+DOCUMENT_SPOOL_MAX_MEMORY = int(os.getenv("DOCUMENT_SPOOL_MAX_MEMORY", str(1024 * 1024)))
+
+
+class DocumentSource:
+    """
+    A document to ingest, its bytes in memory or in a file, with its size and sha256 hash.
+    Args:
+        name: The uploaded file name, used as the document key of the ingestion manifest.
+        file: The document bytes, rewound.
+        size: Size in bytes.
+        sha256: Hex digest of the bytes.
+        path: The file holding the bytes when on disk, lets other processes open it by path.
+        content_type: The MIME type sent with the upload.
+        temporary: Whether the file at path is removed on close.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        file: BinaryIO,
+        size: int,
+        sha256: str,
+        path: Path | None = None,
+        content_type: str | None = None,
+        temporary: bool = True,
+    ):
+        self.name = name
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.path = path
+        self.content_type = content_type
+        self.temporary = temporary
+
+    @classmethod
+    def from_path(cls, path: Path) -> "DocumentSource":
+        """A document read from a file on disk, the file is kept on close."""
+        digest = hashlib.sha256()
+        file = open(path, "rb")  # noqa: SIM115
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+        file.seek(0)
+        return cls(path.name, file, path.stat().st_size, digest.hexdigest(), path=path, temporary=False)
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix.lower()
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+    def read_bytes(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def read_text(self) -> str:
+        return self.read_bytes().decode("utf-8", errors="replace")
+
+    def iter_blocks(self, size: int = 1 << 16) -> Iterator[bytes]:
+        """The bytes in blocks, for parsers reading the document incrementally."""
+        self.file.seek(0)
+        yield from iter(lambda: self.file.read(size), b"")
+
+    def iter_lines(self) -> Iterator[str]:
+        """The decoded lines, read incrementally."""
+        self.file.seek(0)
+        text = io.TextIOWrapper(self.file, encoding="utf-8", errors="replace")  # type: ignore
+        try:
+            yield from text
+        finally:
+            # Keep the document file open, closing the wrapper would close it
+            text.detach()
+
+    def close(self) -> None:
+        self.file.close()
+        if self.path is not None and self.temporary:
+            self.path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return f"DocumentSource({self.name!r}, {self.size} bytes{', spilled' if self.path and self.temporary else ''})"
+
+
+class DocumentBuffer:
+    """
+    Collects the bytes of a document as they arrive, in a BytesIO until max_memory is exceeded and
+    in a named temp file afterwards.
+    Args:
+        name: The uploaded file name.
+        content_type: The MIME type sent with the upload.
+        max_memory: Bytes kept in memory before spilling to disk.
+    """
+
+    def __init__(self, name: str, content_type: str | None = None, max_memory: int = DOCUMENT_SPOOL_MAX_MEMORY):
+        self.name = name
+        self.content_type = content_type
+        self.max_memory = max_memory
+        self.size = 0
+        self._file: BinaryIO = io.BytesIO()
+        self._path: Path | None = None
+        self._digest = hashlib.sha256()
+
+    @property
+    def on_disk(self) -> bool:
+        return self._path is not None
+
+    def write(self, data: bytes) -> None:
+        if self._path is None and self.size + len(data) > self.max_memory:
+            self._spill()
+        self._file.write(data)
+        self._digest.update(data)
+        self.size += len(data)
+
+    def _spill(self) -> None:
+        spilled = tempfile.NamedTemporaryFile(prefix="upload_", suffix=Path(self.name).suffix, delete=False)  # noqa: SIM115
+        spilled.write(self._file.getvalue())  # type: ignore
+        self._file = spilled  # type: ignore
+        self._path = Path(spilled.name)
+
+    def finish(self) -> DocumentSource:
+        """The complete document, the buffer is handed over to it."""
+        self._file.flush()
+        self._file.seek(0)
+        return DocumentSource(
+            self.name, self._file, self.size, self._digest.hexdigest(), path=self._path, content_type=self.content_type
+        )
+
+    def close(self) -> None:
+        """Discard an incomplete document."""
+        self._file.close()
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
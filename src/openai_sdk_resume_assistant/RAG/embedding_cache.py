@@ -0,0 +1,260 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "on", "yes"}
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", str(Path(__file__).parent / "embedding_cache")))
+# Bytes of vectors kept on disk (entries x dimension x 4), the least recently used ones are evicted beyond this
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "4096"))
+# Cache hits are recorded in memory and written to the index in batches of this size, or with the next put
+EMBEDDING_CACHE_TOUCH_BATCH = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode and collapse whitespace so trivially different texts share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class _VectorFile:
+    """Memory-mapped file of float32 rows with a fixed dimension, grown in place as slots are used."""
+
+    def __init__(self, path: Path, dim: int):
+        self.path = path
+        self.dim = dim
+        self.path.touch(exist_ok=True)
+        self._map: np.memmap | None = None
+        self.capacity = 0
+        self._remap(self.path.stat().st_size // (dim * 4))
+
+    def _remap(self, capacity: int) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        if self.path.stat().st_size < capacity * self.dim * 4:
+            with open(self.path, "r+b") as f:
+                f.truncate(capacity * self.dim * 4)
+        self.capacity = capacity
+        if capacity:
+            self._map = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def read(self, slot: int) -> np.ndarray:
+        if slot >= self.capacity:
+            # Another process may have grown the file
+            self._remap(self.path.stat().st_size // (self.dim * 4))
+        return np.array(self._map[slot])  # type: ignore
+
+    def write(self, slot: int, vector: np.ndarray) -> None:
+        if slot >= self.capacity:
+            self._remap(max(slot + 1, self.capacity * 2, 1024))
+        self._map[slot] = vector  # type: ignore
+
+    def flush(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache.
+    Entries are keyed by (model, normalized text hash). The index lives in SQLite and the vectors
+    are stored as float32 rows in one memory-mapped file per dimension, with an in-memory LRU tier
+    in front. The least recently used entries are evicted once the vectors exceed max_bytes. Lookups do
+    not write to the index, the last use of the hits is written in batches.
+    Args:
+        cache_dir (Path): Directory holding the SQLite index and the vector files.
+        max_bytes (int): Maximum size of the vectors kept on disk, entries x dimension x 4 bytes.
+        memory_entries (int): Number of entries kept in the in-memory LRU tier.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str = EMBEDDING_CACHE_DIR,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        memory_entries: int = EMBEDDING_CACHE_MEMORY_ENTRIES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._vector_files: dict[int, _VectorFile] = {}
+        self._touched: dict[str, float] = {}  # key -> last use not yet written to the index
+
+        self._db = sqlite3.connect(self.cache_dir / "index.sqlite3", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, dim INTEGER, slot INTEGER, last_used REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS free_slots (dim INTEGER, slot INTEGER, PRIMARY KEY (dim, slot))")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        logger.info(f"Initialized embedding cache: {self.cache_dir}")
+
+    def _vector_file(self, dim: int) -> _VectorFile:
+        if dim not in self._vector_files:
+            self._vector_files[dim] = _VectorFile(self.cache_dir / f"vectors_{dim}.f32", dim)
+        return self._vector_files[dim]
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: list[str]) -> list[np.ndarray | None]:
+        """Look up the embeddings of the texts, None for every miss."""
+        keys = [embedding_cache_key(model, text) for text in texts]
+        results: list[np.ndarray | None] = [None] * len(texts)
+        with self._lock:
+            disk_keys: dict[str, list[int]] = {}
+            for index, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = time.time()
+                    results[index] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    disk_keys.setdefault(key, []).append(index)
+
+            if disk_keys:
+                found = self._read_from_disk(list(disk_keys))
+                for key, indices in disk_keys.items():
+                    vector = found.get(key)
+                    if vector is None:
+                        self.misses += len(indices)
+                        continue
+                    self._remember(key, vector)
+                    self._touched[key] = time.time()
+                    self.disk_hits += len(indices)
+                    for index in indices:
+                        results[index] = vector
+
+            if len(self._touched) >= EMBEDDING_CACHE_TOUCH_BATCH:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._write_touches()
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+        return results
+
+    def _write_touches(self) -> None:
+        """Write the last use of the recent hits to the index, within the caller's transaction."""
+        if self._touched:
+            self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _read_from_disk(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        # Stay below SQLite's host parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(f"SELECT key, dim, slot FROM entries WHERE key IN ({placeholders})", batch).fetchall()
+            for key, dim, slot in rows:
+                found[key] = self._vector_file(dim).read(slot)
+        return found
+
+    def get(self, model: str, text: str) -> np.ndarray | None:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: list[str], embeddings: Sequence[list[float] | np.ndarray]) -> None:
+        """Store the embeddings of the texts, evicting the least recently used entries when full."""
+        with self._lock:
+            now = time.time()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for text, embedding in zip(texts, embeddings, strict=True):
+                    key = embedding_cache_key(model, text)
+                    vector = np.asarray(embedding, dtype=np.float32)
+                    self._remember(key, vector)
+                    if self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                        continue
+                    slot = self._allocate_slot(vector.shape[0])
+                    self._vector_file(vector.shape[0]).write(slot, vector)
+                    self._db.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", (key, vector.shape[0], slot, now))
+                # Recent hits count before evicting
+                self._write_touches()
+                self._evict()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            for vector_file in self._vector_files.values():
+                vector_file.flush()
+
+    def put(self, model: str, text: str, embedding: list[float] | np.ndarray) -> None:
+        self.put_many(model, [text], [embedding])
+
+    def _allocate_slot(self, dim: int) -> int:
+        row = self._db.execute("SELECT slot FROM free_slots WHERE dim = ? LIMIT 1", (dim,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM free_slots WHERE dim = ? AND slot = ?", (dim, row[0]))
+            return row[0]
+        row = self._db.execute("SELECT MAX(slot) FROM entries WHERE dim = ?", (dim,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _size(self) -> int:
+        (dims,) = self._db.execute("SELECT COALESCE(SUM(dim), 0) FROM entries").fetchone()
+        return dims * 4
+
+    def _evict(self) -> None:
+        overflow = self._size() - self.max_bytes
+        if overflow <= 0:
+            return
+        rows = []
+        for key, dim, slot in self._db.execute("SELECT key, dim, slot FROM entries ORDER BY last_used"):
+            rows.append((key, dim, slot))
+            overflow -= dim * 4
+            if overflow <= 0:
+                break
+        self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _, _ in rows])
+        self._db.executemany("INSERT OR IGNORE INTO free_slots VALUES (?, ?)", [(dim, slot) for _, dim, slot in rows])
+        for key, _, _ in rows:
+            self._memory.pop(key, None)
+        self.evictions += len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+            size = self._size()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Shared embedding cache for ingestion and retrieval, None when disabled."""
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache()
@@ -0,0 +1,159 @@
+import os
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+from loguru import logger
+from openai import AzureOpenAI
+from tqdm import tqdm
+
+from openai_sdk_resume_assistant.client import AzureAIClient
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS, record_usage
+from openai_sdk_resume_assistant.RAG.embedding_cache import EmbeddingCache
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "128"))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+# Errors worth retrying: throttling, transient server errors and dropped connections
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used to size embedding batches."""
+    return len(text) // 4 + 1
+
+
+class EmbeddingPipeline:
+    """
+    Embed many texts with batched embedding requests that run concurrently.
+    Args:
+        azure_openai_client: Client used for the embedding requests.
+        embedding_model (str): The embedding model (deployment) name.
+        batch_size (int): Maximum number of inputs per embedding request.
+        max_batch_tokens (int): Estimated token budget per embedding request.
+        max_concurrency (int): Number of embedding requests in flight at once.
+        max_retries (int): Retries per batch for throttled or failed requests.
+        backoff_base (float): Base delay in seconds for the exponential backoff.
+        cache (EmbeddingCache | None): Cache consulted before embedding, only misses are requested.
+    """
+
+    def __init__(
+        self,
+        azure_openai_client: AzureAIClient | AzureOpenAI,
+        embedding_model: str = "text-embedding-ada-002",
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_batch_tokens: int = EMBEDDING_BATCH_TOKENS,
+        max_concurrency: int = EMBEDDING_CONCURRENCY,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        backoff_base: float = 1.0,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.azure_openai_client = azure_openai_client
+        self.embedding_model = embedding_model
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.cache = cache
+
+    def make_batches(self, texts: list[str]) -> list[list[int]]:
+        """Pack text indices into batches bounded by both the batch size and the token budget."""
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        batch_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Honour the server's retry-after header when present, otherwise back off exponentially with jitter."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_base * 2**attempt * (0.5 + random.random())
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch in a single request, retrying throttled requests with backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with STAGE_SECONDS.time("embedding"):
+                    response = self.azure_openai_client.embeddings.create(input=texts, model=self.embedding_model)
+                record_usage(self.embedding_model, response.usage.prompt_tokens)
+                # The API returns one item per input, sorted by index to be safe
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+                logger.warning(f"Embedding request failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+        raise RuntimeError("Unreachable")
+
+    def embed(
+        self, texts: list[str], desc: str = "Embedding", on_embedded: Callable[[int], None] | None = None
+    ) -> list[list[float]]:
+        """
+        Embed the texts, keeping the input order.
+        Args:
+            texts: The texts to embed.
+            desc: Description of the progress bar.
+            on_embedded: Optional callback receiving the number of texts embedded (or served from cache) per step.
+        Returns:
+            One embedding per input text.
+        """
+        if not texts:
+            return []
+
+        embeddings: list[list[float]] = [[] for _ in texts]
+        cached_count = 0
+        if self.cache is not None:
+            for index, cached in enumerate(self.cache.get_many(self.embedding_model, texts)):
+                if cached is not None:
+                    embeddings[index] = cached.tolist()
+                    cached_count += 1
+        if on_embedded and cached_count:
+            on_embedded(cached_count)
+
+        # Request every distinct text that is not cached once
+        missing: dict[str, list[int]] = {}
+        for index, text in enumerate(texts):
+            if not embeddings[index]:
+                missing.setdefault(text, []).append(index)
+        if not missing:
+            logger.debug(f"All {len(texts)} embeddings served from the cache")
+            return embeddings
+
+        missing_texts = list(missing)
+        batches = self.make_batches(missing_texts)
+        logger.debug(
+            f"Embedding {len(missing_texts)} of {len(texts)} texts in {len(batches)} batches ({self.max_concurrency} concurrent)"
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = executor.map(lambda batch: self._embed_batch([missing_texts[index] for index in batch]), batches)
+            for batch, batch_embeddings in tqdm(zip(batches, results, strict=True), total=len(batches), desc=desc):
+                for index, embedding in zip(batch, batch_embeddings, strict=True):
+                    for text_index in missing[missing_texts[index]]:
+                        embeddings[text_index] = embedding
+                if self.cache is not None:
+                    self.cache.put_many(self.embedding_model, [missing_texts[index] for index in batch], batch_embeddings)
+                if on_embedded:
+                    on_embedded(sum(len(missing[missing_texts[index]]) for index in batch))
+
+        return embeddings
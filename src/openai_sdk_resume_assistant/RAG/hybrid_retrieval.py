@@ -0,0 +1,161 @@
+"""
+Lexical side of the hybrid retriever: a BM25 inverted index over the chunk texts of a collection,
+reciprocal rank fusion with the dense results and optional local rerankers.
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Protocol
+
+from loguru import logger
+
+# "hybrid" fuses BM25 with the vector search, "dense" only queries the vector store
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid").strip().lower()
+# Candidates taken from each retriever before fusion
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))
+# "none", "lexical" or "cross-encoder" (needs sentence-transformers)
+RAG_RERANKER = os.getenv("RAG_RERANKER", "none").strip().lower()
+RAG_RERANKER_MODEL = os.getenv("RAG_RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# Keeps terms like "c++", "c#", "node.js" and "ci/cd" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+|(?:[./-][a-z0-9]+)+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by did does do for from has have he her his how i in is it its of on or she that the their"
+    " them they this to was were what when where which who why with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over chunk texts, updated incrementally as chunks are added or removed.
+    Args:
+        k1 (float): Term frequency saturation.
+        b (float): Document length normalization.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.version: str | None = None  # Collection version the index reflects
+        self._postings: dict[str, dict[str, int]] = {}
+        self._doc_terms: dict[str, Counter[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, ids: list[str], texts: list[str]) -> None:
+        with self._lock:
+            for id_, text in zip(ids, texts, strict=True):
+                if id_ in self._doc_terms:
+                    self._remove(id_)
+                terms = Counter(tokenize(text))
+                self._doc_terms[id_] = terms
+                self._lengths[id_] = sum(terms.values())
+                self._total_length += self._lengths[id_]
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, {})[id_] = frequency
+
+    def _remove(self, id_: str) -> None:
+        terms = self._doc_terms.pop(id_, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(id_)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(id_, None)
+            if not postings:
+                del self._postings[term]
+
+    def remove(self, ids: list[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                self._remove(id_)
+
+    def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Return the ids and BM25 scores of the best matching chunks."""
+        with self._lock:
+            if not self._doc_terms:
+                return []
+            doc_count = len(self._doc_terms)
+            average_length = self._total_length / doc_count
+            scores: dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for id_, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[id_] / average_length)
+                    scores[id_] = scores.get(id_, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists, each id scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] = scores.get(id_, 0.0) + 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class Reranker(Protocol):
+    def rerank(self, query: str, texts: list[str]) -> list[float]:
+        """Score each text for the query, higher is more relevant."""
+        ...
+
+
+class LexicalReranker:
+    """
+    Cheap reranker favouring chunks that cover more of the query terms and contain them close together.
+    """
+
+    def rerank(self, query: str, texts: list[str]) -> list[float]:
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return [0.0] * len(texts)
+        scores = []
+        for text in texts:
+            tokens = tokenize(text)
+            positions = [index for index, token in enumerate(tokens) if token in query_terms]
+            matched = {tokens[index] for index in positions}
+            coverage = len(matched) / len(query_terms)
+            # Span of the matches relative to the number of matched terms, 1 when they are adjacent
+            proximity = len(matched) / (positions[-1] - positions[0] + 1) if len(matched) > 1 else 0.0
+            scores.append(coverage + 0.25 * proximity)
+        return scores
+
+
+class CrossEncoderReranker:
+    """Reranks with a local sentence-transformers cross-encoder model."""
+
+    def __init__(self, model_name: str = RAG_RERANKER_MODEL):
+        try:
+            from sentence_transformers import CrossEncoder  # type: ignore
+        except ImportError as e:
+            raise ImportError("RAG_RERANKER=cross-encoder requires the sentence-transformers package.") from e
+        self.model = CrossEncoder(model_name)
+
+    def rerank(self, query: str, texts: list[str]) -> list[float]:
+        return [float(score) for score in self.model.predict([(query, text) for text in texts])]
+
+
+def create_reranker(name: str = RAG_RERANKER) -> Reranker | None:
+    if name in {"", "none"}:
+        return None
+    if name == "lexical":
+        return LexicalReranker()
+    if name == "cross-encoder":
+        return CrossEncoderReranker()
+    logger.warning(f"Unknown RAG_RERANKER '{name}', reranking disabled")
+    return None
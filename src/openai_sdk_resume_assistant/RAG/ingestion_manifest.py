@@ -0,0 +1,109 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import chromadb
+from loguru import logger
+
+from openai_sdk_resume_assistant.RAG.collection_registry import CollectionStats
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """Hash the file bytes in blocks so large uploads are not read into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(document_key: str, text: str) -> str:
+    """Content-addressed chunk id, stable across uploads of the same document."""
+    snake_name = Path(document_key).stem.replace(" ", "_").lower()
+    digest = content_hash(f"{document_key}\0{text}")
+    return f"{snake_name}_{digest[:24]}"
+
+
+class IngestionManifest:
+    """
+    Per-document content hashes and chunk ids of a collection, stored as JSON in the collection metadata,
+    along with the source, page count and byte size of each document for the file inventory.
+    Documents are keyed by their file name, so a re-upload of a file replaces the chunks of its previous version.
+    Args:
+        collection (chromadb.Collection): The collection the manifest belongs to.
+    """
+
+    METADATA_KEY = "ingestion_manifest"
+    # Changes on every save, lets caches keyed on the collection content notice ingestion from any process
+    VERSION_KEY = "ingestion_version"
+
+    def __init__(self, collection: chromadb.Collection):
+        self.collection = collection
+        raw = (collection.metadata or {}).get(self.METADATA_KEY)
+        self.documents: dict[str, dict[str, Any]] = json.loads(raw) if isinstance(raw, str) else {}
+
+    def is_unchanged(self, document_key: str, document_hash: str) -> bool:
+        return self.documents.get(document_key, {}).get("hash") == document_hash
+
+    def chunk_ids(self, document_key: str) -> set[str]:
+        """Chunk ids stored for the document, or the name based ids of chunks ingested before the manifest existed."""
+        if document_key in self.documents:
+            return set(self.documents[document_key]["chunks"])
+        legacy = self.collection.get(where={"file_name": Path(document_key).stem}, include=[])
+        tracked = {chunk for document in self.documents.values() for chunk in document["chunks"]}
+        return set(legacy["ids"]) - tracked
+
+    def update(
+        self,
+        document_key: str,
+        document_hash: str,
+        chunk_ids: list[str],
+        source: str = "",
+        page_count: int | None = None,
+        size: int | None = None,
+    ) -> None:
+        self.documents[document_key] = {
+            "hash": document_hash,
+            "chunks": chunk_ids,
+            "source": source,
+            "pages": len(chunk_ids) if page_count is None else page_count,
+            "bytes": size,
+        }
+
+    @property
+    def chunk_count(self) -> int:
+        """Chunks tracked by the manifest, fewer than in the collection when it holds chunks from before the manifest."""
+        return sum(len(document["chunks"]) for document in self.documents.values())
+
+    def files(self) -> list[dict[str, Any]]:
+        """The ingested files with their source, page and chunk counts, byte size and hash, sorted by name."""
+        return [
+            {
+                "name": Path(document_key).stem,
+                "file": document_key,
+                "source": document.get("source", ""),
+                "page_count": document.get("pages", len(document["chunks"])),
+                "chunk_count": len(document["chunks"]),
+                "bytes": document.get("bytes"),
+                "hash": document["hash"],
+            }
+            for document_key, document in sorted(self.documents.items())
+        ]
+
+    def save(self) -> None:
+        # modify() replaces the whole metadata, so keep the other keys (the hnsw settings cannot be re-set)
+        metadata = {key: value for key, value in (self.collection.metadata or {}).items() if not key.startswith("hnsw:")}
+        metadata[self.METADATA_KEY] = json.dumps(self.documents)
+        metadata[self.VERSION_KEY] = uuid4().hex
+        # Stats read by the collection registry without scanning the collection
+        stats = CollectionStats(chunk_count=self.collection.count(), file_count=len(self.documents), last_ingested_at=time.time())
+        metadata.update(stats.to_metadata())
+        self.collection.modify(metadata=metadata)
+        logger.debug(f"Saved ingestion manifest of {self.collection.name} with {len(self.documents)} document(s)")
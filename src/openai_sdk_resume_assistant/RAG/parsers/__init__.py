@@ -0,0 +1,101 @@
+"""
+Registry of the document parsers by file extension and MIME type. Parsers live in their own modules and
+are only imported when a document of their format is ingested, so unused formats cost nothing at startup.
+Every parser turns an uploaded document into a stream of (source, location, text) records for the chunk
+and embed pipeline, where the location is a page number or the section (heading path, JSON path) of the text.
+"""
+
+import importlib
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+
+
+class DocumentRecord(NamedTuple):
+    source: str
+    location: int | str | None  # Page number, section, or None for the whole text
+    text: str
+
+
+DocumentParser = Callable[[DocumentSource], Iterator[DocumentRecord]]
+
+
+@dataclass
+class ParserEntry:
+    """
+    A document format.
+    Args:
+        name: Format name, e.g. "docx".
+        target: The parser as "module:function", imported on first use, or the parser itself.
+        extensions: File extensions of the format, with the leading dot.
+        mime_types: MIME types of the format.
+        split: Whether the records are split into chunks, PDF pages are embedded whole.
+    """
+
+    name: str
+    target: str | DocumentParser
+    extensions: tuple[str, ...] = ()
+    mime_types: tuple[str, ...] = ()
+    split: bool = True
+
+    def parser(self) -> DocumentParser:
+        if isinstance(self.target, str):
+            module_name, _, function_name = self.target.partition(":")
+            self.target = getattr(importlib.import_module(module_name), function_name)
+        return self.target  # type: ignore
+
+
+class ParserRegistry:
+    """Document parsers by file extension and MIME type, the extension wins over the (often generic) MIME type."""
+
+    def __init__(self, entries: list[ParserEntry] | None = None):
+        self._by_extension: dict[str, ParserEntry] = {}
+        self._by_mime_type: dict[str, ParserEntry] = {}
+        for entry in entries or []:
+            self.register(entry)
+
+    def register(self, entry: ParserEntry) -> None:
+        """Add a format, replacing the formats registered before for the same extensions and MIME types."""
+        for extension in entry.extensions:
+            self._by_extension[extension.lower()] = entry
+        for mime_type in entry.mime_types:
+            self._by_mime_type[mime_type.lower()] = entry
+
+    def lookup(self, document: DocumentSource) -> ParserEntry | None:
+        """The format of the document by its extension, then its MIME type, None when unsupported."""
+        if (entry := self._by_extension.get(document.suffix)) is not None:
+            return entry
+        mime_type = (document.content_type or "").split(";")[0].strip().lower()
+        return self._by_mime_type.get(mime_type)
+
+    @property
+    def extensions(self) -> list[str]:
+        return sorted(self._by_extension)
+
+
+_PACKAGE = __name__
+
+
+def default_registry() -> ParserRegistry:
+    """Registry of the built-in text formats. PDF is registered by VectorDB, which owns the extraction workers."""
+    return ParserRegistry(
+        [
+            ParserEntry("text", f"{_PACKAGE}.text:parse_text", (".txt",), ("text/plain",)),
+            ParserEntry("markdown", f"{_PACKAGE}.text:parse_markdown", (".md", ".markdown"), ("text/markdown",)),
+            ParserEntry("html", f"{_PACKAGE}.html:parse_html", (".html", ".htm"), ("text/html", "application/xhtml+xml")),
+            ParserEntry(
+                "docx",
+                f"{_PACKAGE}.docx:parse_docx",
+                (".docx",),
+                ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",),
+            ),
+            ParserEntry(
+                "json_resume",
+                f"{_PACKAGE}.json_resume:parse_json_resume",
+                (".json",),
+                ("application/json", "application/schema+json"),
+            ),
+        ]
+    )
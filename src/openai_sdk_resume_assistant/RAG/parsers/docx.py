@@ -0,0 +1,56 @@
+import re
+import zipfile
+from collections.abc import Iterator
+from xml.etree import ElementTree
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord
+from openai_sdk_resume_assistant.RAG.parsers.sections import Sections
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+HEADING_STYLE = re.compile(r"heading\s*(\d)")
+
+
+def _heading_level(paragraph: ElementTree.Element) -> int | None:
+    """Level of a heading paragraph from its outline level or its Title / Heading N style, None for body text."""
+    properties = paragraph.find(f"{W}pPr")
+    if properties is None:
+        return None
+    outline = properties.find(f"{W}outlineLvl")
+    if outline is not None and (level := int(outline.get(f"{W}val", "9"))) < 9:
+        return level + 1
+    style = properties.find(f"{W}pStyle")
+    if style is None:
+        return None
+    name = style.get(f"{W}val", "").lower()
+    if name == "title":
+        return 1
+    match = HEADING_STYLE.fullmatch(name)
+    return int(match.group(1)) if match else None
+
+
+def parse_docx(document: DocumentSource) -> Iterator[DocumentRecord]:
+    """
+    One record per section under a heading, from the paragraphs of word/document.xml. The XML is parsed
+    incrementally and each paragraph is dropped once read, so large documents are never held as a tree.
+    """
+    sections = Sections(document.name)
+    with zipfile.ZipFile(document.file) as archive, archive.open("word/document.xml") as xml:
+        for _, element in ElementTree.iterparse(xml, events=("end",)):
+            if element.tag != f"{W}p":
+                continue
+            text = "".join(
+                node.text or "" if node.tag == f"{W}t" else "\t" if node.tag == f"{W}tab" else "\n"
+                for node in element.iter()
+                if node.tag in (f"{W}t", f"{W}tab", f"{W}br", f"{W}cr")
+            )
+            level = _heading_level(element)
+            # Also empties paragraphs nested in text boxes, so the enclosing paragraph does not repeat them
+            element.clear()
+            if level is not None:
+                if record := sections.heading(level, " ".join(text.split())):
+                    yield record
+            elif text.strip():
+                sections.add(text)
+    if record := sections.flush():
+        yield record
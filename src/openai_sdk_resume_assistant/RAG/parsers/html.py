@@ -0,0 +1,78 @@
+import codecs
+from collections.abc import Iterator
+from html.parser import HTMLParser
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord
+from openai_sdk_resume_assistant.RAG.parsers.sections import Sections
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# Elements whose text is not part of the document
+SKIPPED = {"script", "style", "noscript", "template", "svg"}
+# Elements ending a line of text
+BLOCKS = {
+    "p", "div", "br", "li", "ul", "ol", "dl", "dt", "dd", "tr", "td", "th", "table", "section",
+    "article", "header", "footer", "main", "aside", "nav", "blockquote", "pre", "hr", "title",
+}  # fmt: skip
+
+
+class _SectionParser(HTMLParser):
+    def __init__(self, source: str):
+        super().__init__(convert_charrefs=True)
+        self.sections = Sections(source)
+        self.records: list[DocumentRecord] = []
+        self._skipped = 0
+        self._heading: tuple[int, list[str]] | None = None
+        self._line: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in SKIPPED:
+            self._skipped += 1
+        elif tag in HEADINGS:
+            self._end_line()
+            self._heading = (HEADINGS[tag], [])
+        elif tag in BLOCKS:
+            self._end_line()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED:
+            self._skipped = max(self._skipped - 1, 0)
+        elif tag in HEADINGS and self._heading is not None:
+            level, parts = self._heading
+            self._heading = None
+            if record := self.sections.heading(level, " ".join("".join(parts).split())):
+                self.records.append(record)
+        elif tag in BLOCKS:
+            self._end_line()
+
+    def handle_data(self, data: str) -> None:
+        if self._skipped:
+            return
+        if self._heading is not None:
+            self._heading[1].append(data)
+        else:
+            self._line.append(data)
+
+    def _end_line(self) -> None:
+        if text := " ".join("".join(self._line).split()):
+            self.sections.add(text)
+        self._line = []
+
+    def finish(self) -> None:
+        self.close()
+        self._end_line()
+        if record := self.sections.flush():
+            self.records.append(record)
+
+
+def parse_html(document: DocumentSource) -> Iterator[DocumentRecord]:
+    """One record per section under an h1-h6 heading, fed to the parser block by block. Scripts and styles are dropped."""
+    parser = _SectionParser(document.name)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for block in document.iter_blocks():
+        parser.feed(decoder.decode(block))
+        yield from parser.records
+        parser.records.clear()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.finish()
+    yield from parser.records
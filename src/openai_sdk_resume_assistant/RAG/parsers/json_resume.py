@@ -0,0 +1,69 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord
+
+# Fields making up the title line of the entries of the JSON Resume sections (https://jsonresume.org/schema)
+TITLE_FIELDS = {
+    "basics": ("name", "label"),
+    "work": ("position", "name"),
+    "volunteer": ("position", "organization"),
+    "education": ("studyType", "area", "institution"),
+    "awards": ("title", "awarder"),
+    "certificates": ("name", "issuer"),
+    "publications": ("name", "publisher"),
+    "skills": ("name", "level"),
+    "languages": ("language", "fluency"),
+    "interests": ("name",),
+    "references": ("name",),
+    "projects": ("name",),
+}
+DATE_FIELDS = ("startDate", "endDate")
+
+
+def _render(value: Any) -> str:
+    """A nested value as text: lists of strings comma separated, objects as key: value pairs."""
+    if isinstance(value, dict):
+        return ", ".join(f"{key}: {_render(item)}" for key, item in value.items() if item not in (None, "", [], {}))
+    if isinstance(value, list):
+        return "; ".join(_render(item) for item in value if item not in (None, "", [], {}))
+    return str(value)
+
+
+def _render_entry(section: str, entry: Any) -> str:
+    """An entry of a section as text: its title line, dates, then the remaining fields, highlights as bullets."""
+    if not isinstance(entry, dict):
+        return f"{section.capitalize()}: {_render(entry)}"
+    title_fields = TITLE_FIELDS.get(section, ())
+    title = " - ".join(str(entry[key]) for key in title_fields if entry.get(key))
+    lines = [f"{section.capitalize()}: {title}" if title else section.capitalize()]
+    if entry.get("startDate"):
+        lines.append(f"{entry['startDate']} to {entry.get('endDate') or 'present'}")
+    for key, value in entry.items():
+        if key in title_fields or key in DATE_FIELDS or value in (None, "", [], {}):
+            continue
+        if key == "highlights" and isinstance(value, list):
+            lines.extend(f"- {_render(item)}" for item in value)
+        else:
+            lines.append(f"{key}: {_render(value)}")
+    return "\n".join(lines)
+
+
+def parse_json_resume(document: DocumentSource) -> Iterator[DocumentRecord]:
+    """
+    One record per entry of a JSON Resume (basics, each job, degree, skill ...), located by its JSON path
+    such as "work[0]". Other JSON objects are read the same way, one record per top-level key or list item.
+    """
+    data = json.loads(document.read_text())
+    if not isinstance(data, dict):
+        data = {"items": data}
+    for section, value in data.items():
+        if section.startswith("$") or section == "meta" or value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            for index, entry in enumerate(value):
+                yield DocumentRecord(document.name, f"{section}[{index}]", _render_entry(section, entry))
+        else:
+            yield DocumentRecord(document.name, section, _render_entry(section, value))
@@ -0,0 +1,38 @@
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord
+
+
+class Sections:
+    """
+    Groups the lines of a structured document into one record per section, located by its heading path
+    (e.g. "Experience > Acme"). Parsers call heading() and add() as they read and yield the finished records.
+    Args:
+        source: The document name.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._path: list[tuple[int, str]] = []  # (level, title) of the enclosing headings
+        self._lines: list[str] = []
+
+    @property
+    def location(self) -> str | None:
+        return " > ".join(title for _, title in self._path) or None
+
+    def heading(self, level: int, title: str) -> DocumentRecord | None:
+        """Start a section, returns the record of the previous one."""
+        record = self.flush()
+        while self._path and self._path[-1][0] >= level:
+            self._path.pop()
+        if title:
+            self._path.append((level, title))
+            self._lines.append(title)
+        return record
+
+    def add(self, line: str) -> None:
+        self._lines.append(line.rstrip())
+
+    def flush(self) -> DocumentRecord | None:
+        """The record of the current section, None when it has no text."""
+        text = "\n".join(self._lines).strip()
+        self._lines = []
+        return DocumentRecord(self.source, self.location, text) if text else None
@@ -0,0 +1,34 @@
+import re
+from collections.abc import Iterator
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord
+from openai_sdk_resume_assistant.RAG.parsers.sections import Sections
+
+MARKDOWN_HEADING = re.compile(r"^ {0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+MARKDOWN_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+def parse_text(document: DocumentSource) -> Iterator[DocumentRecord]:
+    """The whole text, split into chunks by the pipeline."""
+    yield DocumentRecord(document.name, None, document.read_text())
+
+
+def parse_markdown(document: DocumentSource) -> Iterator[DocumentRecord]:
+    """One record per section under an ATX heading (#, ## ...), read line by line. Fenced code is kept as is."""
+    sections = Sections(document.name)
+    fence: str | None = None
+    for line in document.iter_lines():
+        line = line.rstrip("\r\n")
+        if match := MARKDOWN_FENCE.match(line):
+            if fence is None:
+                fence = match.group(1)
+            elif match.group(1).startswith(fence):
+                fence = None
+        elif fence is None and (match := MARKDOWN_HEADING.match(line)):
+            if record := sections.heading(len(match.group(1)), match.group(2).strip()):
+                yield record
+            continue
+        sections.add(line)
+    if record := sections.flush():
+        yield record
@@ -0,0 +1,139 @@
+"""
+Parallel PDF text extraction. PyPDF2 is pure Python and CPU bound, so large uploads are split into
+page ranges that are extracted on a process pool, with a serial fallback for single worker setups.
+Uploaded documents held in memory are sent to the workers as bytes, spilled ones by path.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+from PyPDF2 import PdfReader
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+
+# Worker processes used for extraction, 1 (or less) extracts serially in the calling process
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Number of pages extracted per task, smaller ranges balance better but re-open the file more often
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+
+class PdfPage(NamedTuple):
+    file: Path | DocumentSource
+    page: int
+    text: str
+
+
+def _pdf_input(pdf_file: Path | DocumentSource) -> Path | bytes:
+    """What the worker processes open: the path of files on disk, the bytes of in-memory documents."""
+    if isinstance(pdf_file, DocumentSource):
+        return pdf_file.path or pdf_file.read_bytes()
+    return pdf_file
+
+
+def _reader(pdf: Path | bytes) -> PdfReader:
+    return PdfReader(io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+
+
+def extract_page_range(pdf: Path | bytes, start: int, end: int) -> list[str]:
+    """Extract the text of pages [start, end) of a PDF. Runs in the worker processes."""
+    reader = _reader(pdf)
+    return [reader.pages[index].extract_text() or "" for index in range(start, end)]
+
+
+class PdfExtractor:
+    """
+    Extracts PDF pages on a process pool that fans out per file and per page range.
+    The pool is started on first use and kept for later uploads, since spawning the workers
+    costs more than extracting a typical resume.
+    Args:
+        max_workers (int): Number of worker processes, 1 (or less) extracts serially.
+        pages_per_task (int): Number of pages per extraction task.
+    """
+
+    def __init__(self, max_workers: int = PDF_EXTRACTION_WORKERS, pages_per_task: int = PDF_PAGES_PER_TASK):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        with self._lock:
+            if self._executor is None:
+                try:
+                    # Spawned workers, forking is unsafe from the multi-threaded ingestion workers
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(f"Process pool unavailable ({e}), extracting PDFs serially")
+                    self.max_workers = 1
+            return self._executor
+
+    def _page_ranges(self, page_count: int) -> list[tuple[int, int]]:
+        return [(start, min(start + self.pages_per_task, page_count)) for start in range(0, page_count, self.pages_per_task)]
+
+    @staticmethod
+    def _extract_serial(pdf_files: Sequence[Path | DocumentSource]) -> Iterator[PdfPage]:
+        for pdf_file in pdf_files:
+            reader = _reader(_pdf_input(pdf_file))
+            for index, page in enumerate(reader.pages):
+                yield PdfPage(pdf_file, index, page.extract_text() or "")
+
+    def extract(self, pdf_files: Sequence[Path | DocumentSource]) -> Iterator[PdfPage]:
+        """
+        Extract the text of every page of the PDF files.
+        Args:
+            pdf_files: The PDF files, or uploaded documents, to extract.
+        Returns:
+            An iterator of (file, page, text) records in file and page order. Every task is submitted
+            up front, so the workers keep extracting while the caller consumes (e.g. embeds) the records.
+        """
+        executor = self._get_executor() if self.max_workers > 1 else None
+        if executor is None:
+            yield from self._extract_serial(pdf_files)
+            return
+
+        tasks: list[tuple[Path | DocumentSource, int, int, Future[list[str]]]] = []
+        remaining: list[tuple[Path | DocumentSource, int, int, Future[list[str]]]] = []
+        try:
+            for pdf_file in pdf_files:
+                pdf = _pdf_input(pdf_file)
+                for start, end in self._page_ranges(len(_reader(pdf).pages)):
+                    tasks.append((pdf_file, start, end, executor.submit(extract_page_range, pdf, start, end)))
+            logger.debug(f"Extracting {len(pdf_files)} PDF(s) in {len(tasks)} task(s) on {self.max_workers} processes")
+
+            for position, (pdf_file, start, _, future) in enumerate(tasks):
+                try:
+                    texts = future.result()
+                except BrokenProcessPool as e:
+                    logger.warning(f"PDF extraction workers died ({e}), extracting the remaining pages serially")
+                    with self._lock:
+                        self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    remaining = tasks[position:]
+                    break
+                for offset, text in enumerate(texts):
+                    yield PdfPage(pdf_file, start + offset, text)
+        finally:
+            # Drop queued work when the caller stops early, e.g. because embedding failed
+            for *_, future in tasks:
+                future.cancel()
+
+        for pdf_file, start, end, _ in remaining:
+            for offset, text in enumerate(extract_page_range(_pdf_input(pdf_file), start, end)):
+                yield PdfPage(pdf_file, start + offset, text)
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
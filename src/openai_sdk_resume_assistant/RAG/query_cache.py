@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from openai_sdk_resume_assistant.RAG.embedding_cache import normalize_text
+
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "on", "yes"}
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+# Cosine similarity above which a cached result is reused for a rephrased query, 0 disables the near-duplicate tier
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.97"))
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive form of a query."""
+    return normalize_text(query).lower().rstrip("?!. ")
+
+
+@dataclass
+class _Entry:
+    result: Any
+    embedding: np.ndarray | None
+    version: str
+    expires_at: float
+
+
+class QueryCache:
+    """
+    In-memory cache of retrieval results in front of the vector store query.
+    Results are looked up by normalized query (exact tier) and, when a query embedding is given, by cosine
+    similarity to the embeddings of cached queries (near-duplicate tier). Every entry records the collection
+    version it was retrieved from, entries from an older version are never served, so ingestion invalidates
+    the cache without any explicit call.
+    Args:
+        ttl (float): Seconds an entry is served for.
+        max_entries (int): Entries kept before the least recently used ones are evicted.
+        similarity_threshold (float): Minimum cosine similarity for a near-duplicate hit, 0 disables the tier.
+    """
+
+    def __init__(
+        self,
+        ttl: float = QUERY_CACHE_TTL,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        similarity_threshold: float = QUERY_CACHE_SIMILARITY,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[tuple[str, str, int], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _valid(self, entry: _Entry, version: str, now: float) -> bool:
+        return entry.version == version and entry.expires_at > now
+
+    def get(self, collection: str, query: str, top_k: int, version: str) -> Any | None:
+        """Exact tier lookup, None on a miss."""
+        key = (collection, normalize_query(query), top_k)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._valid(entry, version, time.monotonic()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.result
+
+    def get_similar(self, collection: str, embedding: np.ndarray, top_k: int, version: str) -> Any | None:
+        """Near-duplicate tier lookup by query embedding, None on a miss. Counts the miss for both tiers."""
+        with self._lock:
+            if self.similarity_threshold > 0:
+                now = time.monotonic()
+                best_key, best_score = None, self.similarity_threshold
+                query = embedding / (np.linalg.norm(embedding) or 1.0)
+                for key, entry in self._entries.items():
+                    if key[0] != collection or key[2] != top_k or entry.embedding is None:
+                        continue
+                    if not self._valid(entry, version, now):
+                        continue
+                    score = float(np.dot(query, entry.embedding))
+                    if score >= best_score:
+                        best_key, best_score = key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return self._entries[best_key].result
+            self.misses += 1
+            return None
+
+    def put(
+        self, collection: str, query: str, top_k: int, version: str, result: Any, embedding: np.ndarray | None = None
+    ) -> None:
+        key = (collection, normalize_query(query), top_k)
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self._lock:
+            now = time.monotonic()
+            # Entries of older collection versions can never be served again
+            stale = [k for k, entry in self._entries.items() if k[0] == collection and entry.version != version]
+            for k in stale:
+                del self._entries[k]
+            self._entries[key] = _Entry(result, embedding, version, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
@@ -1,11 +1,25 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
 import numpy as np
-from agents import function_tool
+from agents import FunctionTool, RunContextWrapper, function_tool
 from loguru import logger
 from openai import AzureOpenAI
 
 from openai_sdk_resume_assistant.base_agent import AIAgent
 from openai_sdk_resume_assistant.client import AzureAIClient
 from openai_sdk_resume_assistant.mcp_params import playwright_params
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS, record_usage
+from openai_sdk_resume_assistant.RAG.context_builder import RAG_CONTEXT_TOP_K, ContextBuilder, RetrievedChunk
+from openai_sdk_resume_assistant.RAG.embedding_cache import get_embedding_cache
+from openai_sdk_resume_assistant.RAG.hybrid_retrieval import (
+    RAG_HYBRID_CANDIDATES,
+    RAG_RETRIEVAL_MODE,
+    create_reranker,
+    reciprocal_rank_fusion,
+)
+from openai_sdk_resume_assistant.RAG.query_cache import QUERY_CACHE_ENABLED, QueryCache
 from openai_sdk_resume_assistant.RAG.vector_db import VectorDB
 
 """
@@ -14,39 +28,122 @@ This file will be used to serve a RAG agent as a tool for the resume agent.
 TODO:
 - RAG tool --> Use embedding models to create vectorstore and use it to retrieve relevant information [DONE]
 - RAG Agent with tool integration [DONE]
-- RAG Agent is provided to other agents through MCP servers
+- RAG Agent is provided to other agents through MCP servers [DONE]
+- RAG tool registered directly on the resume agent for in-process retrieval [DONE]
 """
 
 
+@dataclass
+class RAGRunContext:
+    """Run context of an agent run, routing its retrieval to the collection of the caller."""
+
+    collection_name: str | None = None
+
+
 class RAGTool:
     """
     RAGTool class for connecting and retrieving from a vectorstore.
     """
 
-    def __init__(self, collection_name: str, azure_ai_client: AzureAIClient | AzureOpenAI, db_name: str = "default_vectorstore"):
+    def __init__(
+        self,
+        collection_name: str,
+        azure_ai_client: AzureAIClient | AzureOpenAI,
+        db_name: str = "default_vectorstore",
+        vector_db: VectorDB | None = None,
+    ):
         """
         Initialize RAGtool with collection and azure ai client
-        connection.
+        connection. An existing VectorDB can be passed to share its chroma client.
         """
-        self.vector_db = VectorDB(vector_db_name=db_name, azure_openai_client=azure_ai_client)
+        self.vector_db = vector_db or VectorDB(vector_db_name=db_name, azure_openai_client=azure_ai_client)
         self.collection_name = collection_name
         self.collection = self._get_chroma_collection()
         self.azure_openai_client = azure_ai_client
+        self.embedding_model = "text-embedding-ada-002"
+        self.embedding_cache = get_embedding_cache()
+        self.query_cache = QueryCache() if QUERY_CACHE_ENABLED else None
+
+        # Hybrid retrieval builds the BM25 index up front so the first question does not pay for it
+        self.retrieval_mode = RAG_RETRIEVAL_MODE
+        self.reranker = create_reranker() if self.retrieval_mode == "hybrid" else None
+        if self.retrieval_mode == "hybrid":
+            self.vector_db.bm25_index(self.collection_name)
+        self.context_builder = ContextBuilder()
 
     def _get_chroma_collection(self):
         """Get the chroma collection from the vector database."""
-        collection = self.vector_db.get_or_create_collection(collection_name=self.collection_name)
+        # Pinned, so the handle and BM25 index of the shared collection outlive idle periods
+        collection = self.vector_db.pin_collection(self.collection_name)
         logger.info(f"Using ChromaDB collection: {self.collection_name}")
         return collection
 
+    def _collection_for(self, collection_name: str | None) -> tuple[str, Any]:
+        """The collection name and handle to retrieve from, the default collection when the requested one does not exist."""
+        if collection_name and collection_name != self.collection_name:
+            if (collection := self.vector_db.get_collection(collection_name)) is not None:
+                return collection_name, collection
+            logger.debug(f"Collection {collection_name} does not exist, retrieving from {self.collection_name}")
+        return self.collection_name, self.collection
+
     def _get_embeddings(self, text_input: str) -> np.ndarray:
         """Compute the embeddings for the given text input using an
-        OpenAI model."""
+        OpenAI model. Repeated questions are served from the embedding cache."""
+        if (
+            self.embedding_cache is not None
+            and (cached := self.embedding_cache.get(self.embedding_model, text_input)) is not None
+        ):
+            return cached
 
-        response = self.azure_openai_client.embeddings.create(input=text_input, model="text-embedding-ada-002")
+        with STAGE_SECONDS.time("embedding"):
+            response = self.azure_openai_client.embeddings.create(input=text_input, model=self.embedding_model)
+        record_usage(self.embedding_model, response.usage.prompt_tokens)
         emb = np.array(response.data[0].embedding).astype("float32")
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(self.embedding_model, text_input, emb)
         return emb
 
+    def _retrieve(
+        self, text_input: str, top_k: int = RAG_CONTEXT_TOP_K, collection_name: str | None = None
+    ) -> list[RetrievedChunk]:
+        """Retrieve the chunks most relevant to the text input with their metadata and scores, best first.
+        Repeated (or, above the similarity threshold, rephrased) queries are answered from the query cache
+        until the collection changes. collection_name routes the retrieval to another collection, e.g. a user's."""
+        collection_name, collection = self._collection_for(collection_name)
+        version = self.vector_db.collection_version(collection_name) if self.query_cache is not None else ""
+        if self.query_cache is not None:
+            if (cached := self.query_cache.get(collection_name, text_input, top_k, version)) is not None:
+                logger.debug("Query served from the exact query cache")
+                return cached
+
+        embedding = self._get_embeddings(text_input=text_input)
+        if self.query_cache is not None:
+            if (cached := self.query_cache.get_similar(collection_name, embedding, top_k, version)) is not None:
+                logger.debug("Query served from the near-duplicate query cache")
+                return cached
+
+        if self.retrieval_mode == "hybrid":
+            chunks = self._hybrid_search(text_input, embedding, top_k, collection_name, collection)
+        else:
+            with STAGE_SECONDS.time("chroma_query"):
+                results = collection.query(
+                    query_embeddings=embedding.tolist(),
+                    n_results=top_k,
+                )
+            logger.debug(f"Retrieved {len(results['documents'][0])} similar documents from the collection.")  # type: ignore
+            chunks = [
+                RetrievedChunk(text=document, metadata=metadata, score=-distance)  # type: ignore
+                for document, metadata, distance in zip(
+                    results["documents"][0],  # type: ignore
+                    results["metadatas"][0],  # type: ignore
+                    results["distances"][0],  # type: ignore
+                    strict=True,
+                )
+            ]
+        if self.query_cache is not None:
+            self.query_cache.put(collection_name, text_input, top_k, version, chunks, embedding=embedding)
+        return chunks
+
     def _find_similar(self, text_input: str, top_k: int = 5) -> tuple[list[str], list[str]]:
         """Find similar documents in the collection given a text input
         :param text_input: the text we want to search the document for
@@ -54,26 +151,55 @@ class RAGTool:
 
         :return: a tuple of two lists, the first is the list of document and the other is list of pages
         """
-        results = self.collection.query(
-            query_embeddings=self._get_embeddings(text_input=text_input).tolist(),
-            n_results=top_k,
-        )
-        logger.debug(f"Retrieved {len(results['documents'][0])} similar documents from the collection.")  # type: ignore
-        documents = results["documents"][0][:]  # type: ignore
-        pages = [page["page"] for page in results["metadatas"][0][:]]  # type: ignore
-        return documents, pages  # type: ignore
+        chunks = self._retrieve(text_input, top_k=top_k)
+        return [chunk.text for chunk in chunks], [chunk.metadata["page"] for chunk in chunks]
+
+    def _hybrid_search(
+        self, text_input: str, embedding: np.ndarray, top_k: int, collection_name: str, collection: Any
+    ) -> list[RetrievedChunk]:
+        """Fuse the dense and BM25 rankings with reciprocal rank fusion, then optionally rerank the fused candidates."""
+        candidates = max(top_k, RAG_HYBRID_CANDIDATES)
+        with STAGE_SECONDS.time("chroma_query"):
+            dense = collection.query(query_embeddings=embedding.tolist(), n_results=candidates)
+        records = {
+            id_: (document, metadata)
+            for id_, document, metadata in zip(dense["ids"][0], dense["documents"][0], dense["metadatas"][0], strict=True)  # type: ignore
+        }
+        dense_ids = dense["ids"][0]
+        sparse_ids = [id_ for id_, _ in self.vector_db.bm25_index(collection_name).search(text_input, candidates)]
+
+        # Fetch the chunks only found by BM25
+        if missing := [id_ for id_ in sparse_ids if id_ not in records]:
+            found = collection.get(ids=missing, include=["documents", "metadatas"])
+            records.update(zip(found["ids"], zip(found["documents"], found["metadatas"], strict=True), strict=True))  # type: ignore
+
+        fused = [(id_, score) for id_, score in reciprocal_rank_fusion([dense_ids, sparse_ids]) if id_ in records]
+        if self.reranker is not None and fused:
+            fused = fused[:candidates]
+            rerank_scores = self.reranker.rerank(text_input, [records[id_][0] for id_, _ in fused])
+            # Fused score breaks ties between equally reranked chunks
+            order = sorted(range(len(fused)), key=lambda index: (rerank_scores[index], fused[index][1]), reverse=True)
+            fused = [(fused[index][0], rerank_scores[index]) for index in order]
+
+        logger.debug(f"Hybrid retrieval: {len(dense_ids)} dense, {len(sparse_ids)} BM25 candidates")
+        return [
+            RetrievedChunk(text=records[id_][0], metadata=records[id_][1], score=score)  # type: ignore
+            for id_, score in fused[:top_k]
+        ]
 
     # @function_tool
-    def create_rag_context(self, text_input: str) -> str:
-        """Create more context for the Rag agent based on the input text using similar documents."""
-        message = "To provide some context, here are some relevant documents:\n\n"
+    def create_rag_context(self, text_input: str, collection_name: str | None = None) -> str:
+        """Create more context for the Rag agent based on the input text using similar documents.
+        Overlapping chunks are deduplicated, consecutive ones merged and the context is kept within the token budget."""
         # Find similar documents from the vector collection
-        documents, pages = self._find_similar(text_input=text_input)
+        chunks = self._retrieve(text_input=text_input, collection_name=collection_name)
         # Create context from the documents
-        for doc, page in zip(documents, pages, strict=False):
-            message += f"Potentially related Document: {doc}\nPage number: {page}\n\n"
-        logger.info(f"RAG context created successfully. {message}")
-        return message
+        context = self.context_builder.build(chunks)
+        logger.info(
+            f"RAG context created successfully: {context.tokens_used} tokens from {context.chunks_used} chunk(s), "
+            f"{context.chunks_dropped} dropped. {context.text}"
+        )
+        return context.text
 
 
 RAG_AGENT_INSTRUCTIONS = """
@@ -84,6 +210,19 @@ Answer using only retrieved factual context; do not invent details.
 """
 
 
+def create_rag_function_tool(rag_tool: RAGTool) -> FunctionTool:
+    """Expose the RAG tool as a native agent tool, running the blocking retrieval off the event loop.
+    Runs given a RAGRunContext retrieve from its collection."""
+
+    @function_tool
+    async def create_rag_context(ctx: RunContextWrapper[Any], text_input: str) -> str:
+        """Retrieve similar resume documents for the given query."""
+        collection_name = ctx.context.collection_name if isinstance(ctx.context, RAGRunContext) else None
+        return await asyncio.to_thread(rag_tool.create_rag_context, text_input, collection_name)
+
+    return create_rag_context
+
+
 # Create the rag agent
 async def create_rag_agent(collection_name: str, db_name: str = "resume_vectorstore"):  # -> AIAgent:
     client = AzureAIClient()
@@ -95,16 +234,11 @@ async def create_rag_agent(collection_name: str, db_name: str = "resume_vectorst
         db_name=db_name,
     )
 
-    @function_tool
-    def create_rag_context(text_input: str) -> str:
-        """Retrieve similar resume documents for the given query."""
-        return rag_tool.create_rag_context(text_input)
-
     rag_agent = AIAgent(
         name="RAGAgent",
         instructions=RAG_AGENT_INSTRUCTIONS,
         model="gpt-4o",
-        tools=[create_rag_context],
+        tools=[create_rag_function_tool(rag_tool)],
         mcp_params=[playwright_params],
     )
 
@@ -112,8 +246,6 @@ async def create_rag_agent(collection_name: str, db_name: str = "resume_vectorst
 
 
 if __name__ == "__main__":
-    import asyncio
-
     COLLECTION_NAME = "ilyan_resume"
     # COLLECTION_NAME = "sample_texts"
 
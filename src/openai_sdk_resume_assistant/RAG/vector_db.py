@@ -1,16 +1,39 @@
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
 import chromadb
 import numpy as np
+from chromadb.errors import NotFoundError
 from langchain_community.document_loaders.generic import GenericLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from loguru import logger
 from openai import AzureOpenAI
-from PyPDF2 import PdfReader
 from tqdm import tqdm
 
 from openai_sdk_resume_assistant.client import AzureAIClient
+from openai_sdk_resume_assistant.RAG.collection_registry import CollectionRegistry, CollectionStats
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.embedding_cache import get_embedding_cache
+from openai_sdk_resume_assistant.RAG.embedding_pipeline import EmbeddingPipeline
+from openai_sdk_resume_assistant.RAG.hybrid_retrieval import BM25Index
+from openai_sdk_resume_assistant.RAG.ingestion_manifest import IngestionManifest, chunk_id, content_hash, file_hash
+from openai_sdk_resume_assistant.RAG.parsers import DocumentRecord, ParserEntry, default_registry
+from openai_sdk_resume_assistant.RAG.pdf_extraction import PdfExtractor
+
+# Directory holding the chroma vector databases, defaults to the RAG package directory
+VECTOR_DB_DIR = Path(os.getenv("VECTOR_DB_DIR", str(Path(__file__).parent)))
+
+# Ingestion progress callback, called with a stage ("pages_parsed", "chunks_total", "chunks_embedded") and a count
+ProgressCallback = Callable[[str, int], None]
+
+
+def tenant_collection_name(tenant_id: str, prefix: str = "tenant") -> str:
+    """Collection name of a tenant (user or profile id) within chroma's naming rules: 3-512 of [a-zA-Z0-9._-]."""
+    return f"{prefix}_{re.sub(r'[^a-zA-Z0-9._-]', '_', tenant_id)}"[:512].rstrip("._-")
 
 
 class VectorDB:
@@ -26,7 +49,7 @@ class VectorDB:
     ):
         """Initialize the vector database connection with ChromaDB client"""
         self.vector_db_name = vector_db_name
-        self.vector_db_path = Path(__file__).parent / vector_db_name
+        self.vector_db_path = VECTOR_DB_DIR / vector_db_name
         self.vector_db_client = chromadb.PersistentClient(path=self.vector_db_path)
         logger.info(f"Initialized VectorDB: {self.vector_db_path}")
 
@@ -35,157 +58,517 @@ class VectorDB:
         self.embedding_model = embedding_model
         logger.debug(f"Embedding model used: {self.embedding_model}")
 
+        # Batched, concurrent embeddings for document ingestion, re-used through the shared cache
+        self.embedding_cache = get_embedding_cache()
+        self.embedding_pipeline = EmbeddingPipeline(
+            self.azure_openai_client, embedding_model=self.embedding_model, cache=self.embedding_cache
+        )
+        # Process pool extracting PDF pages in parallel, started on the first PDF upload
+        self.pdf_extractor = PdfExtractor()
+        # Document parsers by extension and MIME type, imported on first use
+        self.parsers = default_registry()
+        self.parsers.register(ParserEntry("pdf", self._parse_pdf, (".pdf",), ("application/pdf",), split=False))
+        self._ingestion_locks: dict[str, threading.Lock] = {}
+        self._bm25_indexes: dict[str, BM25Index] = {}
+        self._bm25_lock = threading.Lock()
+        # Open collection handles and their stats, so lookups do not list every collection
+        self.collections = CollectionRegistry(self.vector_db_client, on_evict=self._close_collection)
+
     # Viewing existing collections
     @property
     def collection_list(self) -> list[str]:
-        """Get list of the existing collection in the vector database"""
+        """Get list of the existing collection in the vector database, scans the whole database (see get_collection)"""
         # Get list of existing chroma_client
         existing_collections = [collection.name for collection in self.vector_db_client.list_collections()]
-        logger.debug(f"Existing collections: {existing_collections}")
+        logger.debug(f"{len(existing_collections)} existing collection(s)")
 
         return existing_collections
 
+    def _close_collection(self, collection_name: str) -> None:
+        """Drop the BM25 index of a collection whose handle was closed, unless it is pinned."""
+        if not self.collections.is_pinned(collection_name):
+            with self._bm25_lock:
+                self._bm25_indexes.pop(collection_name, None)
+
+    def pin_collection(self, collection_name: str) -> chromadb.Collection:
+        """Get or create a collection kept open, with its BM25 index, however long it is idle."""
+        return self.collections.pin(collection_name)
+
+    def get_collection(self, collection_name: str) -> chromadb.Collection | None:
+        """Open handle of an existing collection, None when there is no such collection"""
+        return self.collections.get(collection_name)
+
     # get a collection or create a new one
-    def get_or_create_collection(self, collection_name: str) -> chromadb.Collection:
-        """Add a new collection to the vector database or get the existing one with the collection name"""
-        if collection_name not in self.collection_list:
-            collection = self.vector_db_client.create_collection(name=collection_name)
-            logger.info(f"New collection created in the vector database with name: {collection_name}")
-            return collection
-        else:
+    def get_or_create_collection(self, collection_name: str, fresh: bool = False) -> chromadb.Collection:
+        """
+        Add a new collection to the vector database or get the existing one with the collection name.
+        Args:
+            collection_name: The collection name.
+            fresh: Read the collection again instead of using the open handle, whose metadata (the
+                ingestion manifest) may be behind writes of other processes.
+        """
+        return self.collections.get_or_create(collection_name, fresh=fresh)
+
+    def collection_stats(self, collection_name: str) -> CollectionStats | None:
+        """Chunk and file counts and last ingestion time of a collection, None when it does not exist"""
+        return self.collections.stats(collection_name)
+
+    def collection_version(self, collection_name: str) -> str:
+        """
+        Token identifying the current content of a collection, it changes whenever documents are ingested
+        (by any process using the same database) or the collection is re-created.
+        """
+        try:
             collection = self.vector_db_client.get_collection(name=collection_name)
-            logger.info(f"Collection exists with name: {collection_name}, using existing collection")
-            return collection
+        except NotFoundError:
+            return "missing"
+        return self._version_of(collection)
+
+    @staticmethod
+    def _version_of(collection: chromadb.Collection) -> str:
+        return f"{collection.id}:{(collection.metadata or {}).get(IngestionManifest.VERSION_KEY, '0')}"
+
+    def bm25_index(self, collection_name: str) -> BM25Index:
+        """
+        BM25 index over the chunk texts of a collection. It is built from the stored chunks on first use,
+        kept up to date by ingestion in this process and rebuilt when another process changed the collection.
+        """
+        version = self.collection_version(collection_name)
+        index = self._bm25_indexes.get(collection_name)
+        if index is not None and index.version == version:
+            return index
+
+        with self._bm25_lock:
+            index = self._bm25_indexes.get(collection_name)
+            if index is not None and index.version == version:
+                return index
+            index = BM25Index()
+            if version != "missing":
+                collection = self.get_or_create_collection(collection_name)
+                page_size = self.vector_db_client.get_max_batch_size()
+                for offset in range(0, collection.count(), page_size):
+                    page = collection.get(include=["documents"], limit=page_size, offset=offset)
+                    index.add(page["ids"], page["documents"])  # type: ignore
+            index.version = version
+            self._bm25_indexes[collection_name] = index
+            logger.info(f"Built BM25 index of collection {collection_name} with {len(index)} chunks")
+            return index
 
     def _get_embeddings(self, text_input: str) -> np.ndarray:
         """Compute the embedding for the given text using an OpenAI embedding model."""
+        if (
+            self.embedding_cache is not None
+            and (cached := self.embedding_cache.get(self.embedding_model, text_input)) is not None
+        ):
+            return cached
         response = self.azure_openai_client.embeddings.create(input=text_input, model=self.embedding_model)
         emb = np.array(response.data[0].embedding).astype("float32")
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(self.embedding_model, text_input, emb)
         return emb
 
-    def add_pdf_to_collection(self, directory: Path | str, collection_name: str) -> None:
-        """Add PDF documents from a directory to a collection of vector database as vectors of pages"""
-
-        # Exit out if the collection_name already exists
-        if collection_name in self.collection_list:
-            logger.warning(f"Collection {collection_name} already exists. The new docs will be added to the existing collection.")
+    def _add_to_collection(
+        self,
+        collection: chromadb.Collection,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Add records to the collection in bulk calls sized to chroma's max batch size."""
+        max_batch_size = self.vector_db_client.get_max_batch_size()
+        for start in range(0, len(ids), max_batch_size):
+            end = start + max_batch_size
+            collection.add(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                embeddings=embeddings[start:end],  # type: ignore
+                metadatas=metadatas[start:end],  # type: ignore
+            )
 
-        collection = self.get_or_create_collection(collection_name=collection_name)
+    def _embed_and_add(
+        self,
+        collection: chromadb.Collection,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        desc: str,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Embed the documents in batched requests and add them to the collection."""
+        if not documents:
+            return
+        if progress:
+            progress("chunks_total", len(documents))
+        embeddings = self.embedding_pipeline.embed(
+            documents,
+            desc=desc,
+            on_embedded=(lambda count: progress("chunks_embedded", count)) if progress else None,
+        )
+        self._add_to_collection(collection, ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+
+    def _sync_document(
+        self,
+        collection: chromadb.Collection,
+        manifest: IngestionManifest,
+        document_key: str,
+        document_hash: str,
+        chunks: list[tuple[str, dict[str, Any]]],
+        desc: str,
+        progress: ProgressCallback | None = None,
+        size: int | None = None,
+    ) -> tuple[int, int]:
+        """
+        Bring the chunks of one document in the collection in line with its new content.
+        Only chunks whose content is new are embedded, chunks that disappeared are deleted
+        and the kept ones only get their metadata (e.g. page numbers) refreshed.
+        Args:
+            collection: The collection holding the document.
+            manifest: The ingestion manifest of the collection.
+            document_key: The document's file name.
+            document_hash: Content hash of the document.
+            chunks: The (text, metadata) chunks of the document.
+            desc: Description of the embedding progress bar.
+            progress: Optional callback receiving ingestion progress.
+            size: Byte size of the document, for the file inventory.
+        Returns:
+            The number of chunks added and removed.
+        """
+        records: dict[str, tuple[str, dict[str, Any]]] = {}
+        for text, metadata in chunks:
+            # Identical chunks within a document share an id, the first occurrence is kept
+            records.setdefault(chunk_id(document_key, text), (text, metadata))
+
+        existing = manifest.chunk_ids(document_key)
+        new_ids = [id_ for id_ in records if id_ not in existing]
+        kept_ids = [id_ for id_ in records if id_ in existing]
+        removed_ids = sorted(existing - records.keys())
+
+        self._embed_and_add(
+            collection,
+            ids=new_ids,
+            documents=[records[id_][0] for id_ in new_ids],
+            metadatas=[records[id_][1] for id_ in new_ids],
+            desc=desc,
+            progress=progress,
+        )
+        max_batch_size = self.vector_db_client.get_max_batch_size()
+        for start in range(0, len(kept_ids), max_batch_size):
+            batch = kept_ids[start : start + max_batch_size]
+            collection.update(ids=batch, metadatas=[records[id_][1] for id_ in batch])  # type: ignore
+        for start in range(0, len(removed_ids), max_batch_size):
+            collection.delete(ids=removed_ids[start : start + max_batch_size])
+
+        manifest.update(
+            document_key,
+            document_hash,
+            list(records),
+            source=chunks[0][1].get("source", "") if chunks else "",
+            page_count=len({metadata.get("page") for _, metadata in chunks}),
+            size=size,
+        )
+        previous_version = self._version_of(collection)
+        manifest.save()
+
+        # Update the BM25 index in place instead of rebuilding it on the next query
+        index = self._bm25_indexes.get(collection.name)
+        if index is not None and index.version == previous_version:
+            index.add(new_ids, [records[id_][0] for id_ in new_ids])
+            index.remove(removed_ids)
+            index.version = self._version_of(collection)
+        logger.debug(
+            f"Synced {document_key}: {len(new_ids)} chunk(s) added, {len(kept_ids)} unchanged, {len(removed_ids)} removed"
+        )
+        return len(new_ids), len(removed_ids)
+
+    def _ingestion_lock(self, collection_name: str) -> threading.Lock:
+        """Lock serialising ingestion into a collection, so concurrent jobs do not overwrite each other's manifest."""
+        return self._ingestion_locks.setdefault(collection_name, threading.Lock())
+
+    def add_pdf_to_collection(
+        self, directory: Path | str, collection_name: str, progress: ProgressCallback | None = None
+    ) -> dict[str, int]:
+        """
+        Add PDF documents from a directory to a collection of vector database as vectors of pages.
+        Re-uploaded files are ingested incrementally: unchanged files are skipped and only changed pages are embedded.
+        Returns:
+            The number of unchanged files skipped and of chunks added and removed.
+        """
+
+        collection = self.get_or_create_collection(collection_name=collection_name, fresh=True)
 
         if isinstance(directory, str):
             directory = Path(directory)
         logger.debug(f"Processing pdfs from directory: {directory} to collection: {collection.name} ......")
 
-        for pdf_file in directory.glob("*.pdf"):
-            logger.debug(f"Processing file: {pdf_file.name}")
-            reader = PdfReader(pdf_file)
-
-            snake_file_name = pdf_file.stem.replace(" ", "_").lower()
-            ids: list[str] = []
-            metadata: list[dict[str, Any]] = []
-            embeddings: list[np.ndarray] = []
-            documents: list[str] = []
-
-            for index, page in tqdm(
-                enumerate(reader.pages),
-                total=len(reader.pages),
-                desc=f"Processing file: {pdf_file.name}",
+        stats = {"unchanged_files": 0, "chunks_added": 0, "chunks_removed": 0}
+        with self._ingestion_lock(collection_name):
+            manifest = IngestionManifest(collection)
+            if manifest.documents:
+                logger.warning(
+                    f"Collection {collection_name} already exists. The new docs will be added to the existing collection."
+                )
+
+            changed_files: dict[Path, str] = {}
+            for pdf_file in sorted(directory.glob("*.pdf")):
+                document_hash = file_hash(pdf_file)
+                if manifest.is_unchanged(pdf_file.name, document_hash):
+                    logger.info(f"Skipping unchanged file: {pdf_file.name}")
+                    stats["unchanged_files"] += 1
+                else:
+                    changed_files[pdf_file] = document_hash
+
+            def sync(pdf_file: Path, pages: list[tuple[str, dict[str, Any]]]) -> None:
+                added, removed = self._sync_document(
+                    collection,
+                    manifest,
+                    document_key=pdf_file.name,
+                    document_hash=changed_files[pdf_file],
+                    chunks=pages,
+                    desc=f"Embedding pdf pages of: {pdf_file.name}",
+                    progress=progress,
+                    size=pdf_file.stat().st_size,
+                )
+                stats["chunks_added"] += added
+                stats["chunks_removed"] += removed
+
+            # Pages stream in from the extraction workers in file order, each file is synced once its
+            # last page arrived while the workers keep extracting the next files; only paths are extracted here
+            current_file: Path | DocumentSource | None = None
+            pages: list[tuple[str, dict[str, Any]]] = []
+            for pdf_file, index, text in tqdm(
+                self.pdf_extractor.extract(list(changed_files)), desc=f"Extracting pdf pages from dir: {directory}"
             ):
-                text = page.extract_text()
+                if progress:
+                    progress("pages_parsed", 1)
+                if pdf_file != current_file:
+                    if isinstance(current_file, Path):
+                        sync(current_file, pages)
+                    current_file, pages = pdf_file, []
                 if text:
-                    unique_id = f"{snake_file_name}_page_{index}"
-                    ids.append(unique_id)
-                    documents.append(text)
-                    embeddings.append(self._get_embeddings(text).tolist())
-                    metadata.append({"page": index, "source": str(pdf_file), "file_name": str(pdf_file.stem)})
+                    pages.append((text, {"page": index, "source": str(pdf_file), "file_name": str(pdf_file.stem)}))
+            if isinstance(current_file, Path):
+                sync(current_file, pages)
 
-            # Add the pdf data to the collection with embeddings
-            # collection = self.get_or_create_collection(collection_name=collection_name)
-            collection.add(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadata)  # type: ignore
-            logger.success(f"PDF documents added to the collection: {collection_name} successfully")
+        logger.success(f"PDF documents added to the collection: {collection_name} successfully ({stats})")
+        return stats
 
     # TODO: Create langchain based text parser from dir and add to collection [DONE]
-    def add_texts_to_collection(self, directory: Path | str, collection_name: str) -> None:
-        """Add text documents from a directory to a collection of vector database as vectors of pages"""
+    def add_texts_to_collection(
+        self, directory: Path | str, collection_name: str, progress: ProgressCallback | None = None
+    ) -> dict[str, int]:
+        """
+        Add text documents from a directory to a collection of vector database as vectors of pages.
+        Re-uploaded files are ingested incrementally: unchanged files are skipped and only changed chunks are embedded.
+        Returns:
+            The number of unchanged files skipped and of chunks added and removed.
+        """
         if isinstance(directory, str):
             directory = Path(directory)
         loader = GenericLoader.from_filesystem(str(directory), glob="**/*.txt")  # type:ignore
         documents = loader.load()  # type: ignore
+        if progress:
+            progress("pages_parsed", len(documents))
 
         # Instantiate text splitter
         text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100, separators=["\n\n", "\n", " ", ""])
-        # Create text chunks
-        chunks = text_splitter.split_documents(documents)  # type: ignore
-        # Loop over the chunks add creat a list of ids, documents, embedding
-        ids: list[str] = []
-        metadata: list[dict[str, Any]] = []
-        embeddings: list[np.ndarray] = []
-        documents: list[str] = []
-        collection = self.get_or_create_collection(collection_name=collection_name)
+        collection = self.get_or_create_collection(collection_name=collection_name, fresh=True)
         logger.debug(f"Processing texts from directory: {directory} to collection: {collection_name} ......")
-        for index, chunk in tqdm(
-            enumerate(chunks),
-            total=len(chunks),
-            desc=f"Processing text files from dir : {str(directory)}",
-        ):
-            unique_id = f"{str(directory.stem).replace(' ', '_').lower()}_chunk_{index}"
-            ids.append(unique_id)
-            documents.append(chunk.page_content)
-            embeddings.append(self._get_embeddings(chunk.page_content).tolist())
-            metadata.append(
-                {
-                    "page": index,
-                    "source": chunk.metadata.get("source", ""),  # type: ignore
-                    "file_name": Path(chunk.metadata.get("source", "")).stem,  # type: ignore
-                }
-            )
 
-        collection.add(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadata)  # type: ignore
-        logger.success(f"Text documents added to the collection: {collection_name} successfully")
+        stats = {"unchanged_files": 0, "chunks_added": 0, "chunks_removed": 0}
+        with self._ingestion_lock(collection_name):
+            manifest = IngestionManifest(collection)
+            for document in tqdm(documents, desc=f"Processing text files from dir : {str(directory)}"):
+                source = document.metadata.get("source", "")  # type: ignore
+                document_key = Path(source).relative_to(directory).as_posix()
+                document_hash = content_hash(document.page_content)
+                if manifest.is_unchanged(document_key, document_hash):
+                    logger.info(f"Skipping unchanged file: {document_key}")
+                    stats["unchanged_files"] += 1
+                    continue
+
+                # Create text chunks, numbered per file
+                chunks = [
+                    (chunk.page_content, {"page": index, "source": source, "file_name": Path(source).stem})
+                    for index, chunk in enumerate(text_splitter.split_documents([document]))  # type: ignore
+                ]
+                added, removed = self._sync_document(
+                    collection,
+                    manifest,
+                    document_key=document_key,
+                    document_hash=document_hash,
+                    chunks=chunks,
+                    desc=f"Embedding text chunks of: {document_key}",
+                    progress=progress,
+                    size=Path(source).stat().st_size,
+                )
+                stats["chunks_added"] += added
+                stats["chunks_removed"] += removed
+
+        logger.success(f"Text documents added to the collection: {collection_name} successfully ({stats})")
+        return stats
+
+    def _parse_pdf(self, document: DocumentSource) -> Iterator[DocumentRecord]:
+        """The pages of a PDF, extracted on the worker processes."""
+        for _, index, text in self.pdf_extractor.extract([document]):
+            yield DocumentRecord(document.name, index, text)
+
+    def add_documents_to_collection(
+        self, documents: Iterable[DocumentSource], collection_name: str, progress: ProgressCallback | None = None
+    ) -> dict[str, Any]:
+        """
+        Add uploaded documents to a collection as they arrive, without writing them to a directory first.
+        Each document is read by the parser of its format (see self.parsers) into (source, location, text)
+        records, PDF pages are embedded whole and the text of other formats is split into chunks.
+        Unchanged documents are recognised by the hash computed while they were uploaded and skipped unread,
+        documents of unsupported formats and those their parser fails on are skipped, the other documents are still
+        ingested. Each document is closed once ingested.
+        Args:
+            documents: The documents, consumed lazily so ingestion overlaps with the rest of the upload.
+            collection_name: The collection name.
+            progress: Optional callback receiving ingestion progress.
+        Returns:
+            The number of PDF and other files, of unchanged files skipped, of chunks added and removed,
+            the names of the unsupported files and the parse error of each file that failed.
+        """
+        collection = self.get_or_create_collection(collection_name=collection_name, fresh=True)
+        text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100, separators=["\n\n", "\n", " ", ""])
+
+        stats: dict[str, Any] = {
+            "pdf_files": 0,
+            "text_files": 0,
+            "unchanged_files": 0,
+            "chunks_added": 0,
+            "chunks_removed": 0,
+            "unsupported_files": [],
+            "failed_files": {},
+        }
+        with self._ingestion_lock(collection_name):
+            manifest = IngestionManifest(collection)
+            for document in documents:
+                try:
+                    if (parser := self.parsers.lookup(document)) is None:
+                        logger.warning(f"Skipping unsupported file: {document.name}")
+                        stats["unsupported_files"].append(document.name)
+                        continue
+                    count_key = "pdf_files" if parser.name == "pdf" else "text_files"
+                    stats[count_key] += 1
+                    if manifest.is_unchanged(document.name, document.sha256):
+                        logger.info(f"Skipping unchanged file: {document.name}")
+                        stats["unchanged_files"] += 1
+                        continue
+
+                    chunks: list[tuple[str, dict[str, Any]]] = []
+                    try:
+                        for record in parser.parser()(document):
+                            if progress:
+                                progress("pages_parsed", 1)
+                            if not record.text.strip():
+                                continue
+                            metadata: dict[str, Any] = {"source": record.source, "file_name": document.stem}
+                            if isinstance(record.location, str):
+                                metadata["location"] = record.location
+                            if parser.split:
+                                # Chunks are numbered per file, as the pages of the context
+                                for text in text_splitter.split_text(record.text):
+                                    chunks.append((text, metadata | {"page": len(chunks)}))
+                            else:
+                                chunks.append((record.text, metadata | {"page": record.location}))
+                    except Exception as e:
+                        # A malformed file is left out, its previous version (if any) stays in the collection
+                        logger.warning(f"Skipping file that failed to parse: {document.name} ({e!r})")
+                        stats["failed_files"][document.name] = str(e) or type(e).__name__
+                        stats[count_key] -= 1
+                        continue
+
+                    added, removed = self._sync_document(
+                        collection,
+                        manifest,
+                        document_key=document.name,
+                        document_hash=document.sha256,
+                        chunks=chunks,
+                        desc=f"Embedding chunks of: {document.name}",
+                        progress=progress,
+                        size=document.size,
+                    )
+                    stats["chunks_added"] += added
+                    stats["chunks_removed"] += removed
+                finally:
+                    document.close()
+
+        logger.success(f"Documents added to the collection: {collection_name} successfully ({stats})")
+        return stats
 
     # Removing collection from the vector database
     def delete_collection(self, collection_name: str) -> None:
         """Delete a collection from the vector database"""
-        if collection_name in self.collection_list:
-            self.vector_db_client.delete_collection(name=collection_name)
+        if self.collections.delete(collection_name):
             logger.info(f"Collection {collection_name} deleted from the vector database")
         else:
             logger.warning(f"Collection {collection_name} does not exist in the vector database")
 
     # New method to list all items in a collection
-    def list_collection_items(self, collection_name: str) -> dict[str, Any]:
-        """List all items in a specified collection"""
-        if collection_name not in self.collection_list:
+    def list_collection_items(self, collection_name: str, offset: int = 0, limit: int | None = None) -> dict[str, Any]:
+        """
+        List the files in a collection, sorted by name, from the file inventory kept by the ingestion manifest.
+        Collections holding chunks from before the manifest are listed with a metadata only scan instead.
+        Args:
+            collection_name: The collection name.
+            offset: Files skipped, for pagination.
+            limit: Files returned at most, all when None.
+        """
+        collection = self.get_collection(collection_name)
+        if collection is None:
             logger.warning(f"Collection {collection_name} does not exist in the vector database")
             return {"exists": False, "files": [], "count": 0}
 
-        collection = self.vector_db_client.get_collection(name=collection_name)
-
-        results = collection.get(include=["metadatas", "documents"])  # Returns a typed dict of GetResult
-
-        # Dict to hold the collection items
-        files_info: dict[str, Any] = {}
-
-        for metadata in results.get("metadatas", []):  # type: ignore
-            logger.debug(f"Metadata: {metadata}")
-            file_name: str = metadata.get("file_name", "Unknown")  # type: ignore
-            source: str = metadata.get("source", "Unknown")  # type: ignore
-
-            if file_name not in files_info:
-                files_info[file_name] = {
-                    "name": file_name,
-                    "source": source,
-                    "page_count": 0,
-                }
-            files_info[file_name]["page_count"] += 1
+        manifest = IngestionManifest(collection)
+        total_chunks = collection.count()
+        files = manifest.files() if manifest.chunk_count >= total_chunks else self._scan_files(collection, manifest)
 
         return {
             "exists": True,
-            "files": list(files_info.values()),  # making list of the the dict_values obj in python
-            "files_count": len(files_info),
-            "total_chunks": len(results.get("ids", [])),
+            "files": files[offset : None if limit is None else offset + limit],
+            "files_count": len(files),
+            "total_chunks": total_chunks,
+            "offset": offset,
+            "limit": limit,
+            "last_ingested_at": CollectionStats.from_metadata(collection.metadata).last_ingested_at,
         }
 
+    def _scan_files(self, collection: chromadb.Collection, manifest: IngestionManifest) -> list[dict[str, Any]]:
+        """The files of the collection from the chunk metadata, read in batches without the documents or embeddings."""
+        files_info: dict[str, dict[str, Any]] = {}
+        pages: dict[str, set] = {}
+        page_size = self.vector_db_client.get_max_batch_size()
+        for offset in range(0, collection.count(), page_size):
+            batch = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for metadata in batch["metadatas"] or []:
+                file_name = str(metadata.get("file_name", "Unknown"))
+                if file_name not in files_info:
+                    files_info[file_name] = {"name": file_name, "source": metadata.get("source", "Unknown"), "chunk_count": 0}
+                    pages[file_name] = set()
+                files_info[file_name]["chunk_count"] += 1
+                pages[file_name].add(metadata.get("page"))
+
+        # Size and hash are only known for files ingested with the manifest
+        tracked = {file["name"]: file for file in manifest.files()}
+        files = []
+        for file_name in sorted(files_info):
+            info = files_info[file_name]
+            files.append(
+                {
+                    "name": file_name,
+                    "file": tracked.get(file_name, {}).get("file", file_name),
+                    "source": info["source"],
+                    "page_count": len(pages[file_name]),
+                    "chunk_count": info["chunk_count"],
+                    "bytes": tracked.get(file_name, {}).get("bytes"),
+                    "hash": tracked.get(file_name, {}).get("hash"),
+                }
+            )
+        return files
+
 
 if __name__ == "__main__":
     # Example creating a vector database and adding PDF documents to it
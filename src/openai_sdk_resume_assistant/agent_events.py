@@ -0,0 +1,60 @@
+"""
+Typed events of a streamed agent run. Besides the answer text the run reports its tool calls, the
+documents retrieved by the RAG tool and agent handoffs, each with the milliseconds since the run started.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+
+@dataclass
+class TextDelta:
+    text: str
+    type: str = field(default="text", init=False)
+
+
+@dataclass
+class ToolCallStarted:
+    call_id: str
+    name: str
+    arguments: str
+    elapsed_ms: float
+    type: str = field(default="tool_call_started", init=False)
+
+
+@dataclass
+class ToolCallFinished:
+    call_id: str
+    name: str
+    duration_ms: float
+    elapsed_ms: float
+    type: str = field(default="tool_call_finished", init=False)
+
+
+@dataclass
+class RetrievalHits:
+    call_id: str
+    hits: list[dict[str, str]]  # {"source": file name, "page": page or page range}
+    elapsed_ms: float
+    type: str = field(default="retrieval_hits", init=False)
+
+
+@dataclass
+class AgentHandoff:
+    from_agent: str
+    to_agent: str
+    elapsed_ms: float
+    type: str = field(default="agent_handoff", init=False)
+
+
+AgentEvent = TextDelta | ToolCallStarted | ToolCallFinished | RetrievalHits | AgentHandoff
+
+
+def event_payload(event: AgentEvent) -> dict[str, Any]:
+    """The fields of the event without its type, rounded timings included."""
+    payload = asdict(event)
+    payload.pop("type")
+    for key in ("elapsed_ms", "duration_ms"):
+        if key in payload:
+            payload[key] = round(payload[key], 1)
+    return payload
@@ -1,21 +1,39 @@
-import json
-import shutil
-import tempfile
-from pathlib import Path
+import asyncio
 
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
-
-from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMemory, ChatNameResponse, QuestionRequest
+from loguru import logger
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import (
+    AddMessageResponse,
+    ChatMemory,
+    ChatMessage,
+    ChatMessagesPage,
+    ChatNameResponse,
+    ChatSummaryPage,
+    IngestionJob,
+    QuestionRequest,
+    UploadJobResponse,
+)
 from openai_sdk_resume_assistant.backend.app.mongodb import User
-from openai_sdk_resume_assistant.backend.app.services.chat_service import ChatService
+from openai_sdk_resume_assistant.backend.app.services.chat_service import ChatService, get_chat_service
+from openai_sdk_resume_assistant.backend.app.services.sse_stream import AnswerStream, sse_frame
+from openai_sdk_resume_assistant.backend.app.services.upload_stream import (
+    UploadError,
+    UploadQueue,
+    UploadTooLarge,
+    check_upload_size,
+    stream_uploaded_files,
+)
 from openai_sdk_resume_assistant.backend.app.users import current_active_user
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+UPLOAD_PROGRESS_INTERVAL = 0.5  # Seconds between ingestion progress checks on the events stream
+
 
 @router.post("/ask")
-async def ask_resume_question(request: QuestionRequest, service: ChatService = Depends(ChatService)):
+async def ask_resume_question(request: QuestionRequest, service: ChatService = Depends(get_chat_service)):
     response = await service.get_agent_response(request.question)
     return {"response": response}
 
@@ -25,85 +43,170 @@ async def ask_question_stream(
     request: QuestionRequest,
     fastapi_request: Request,
     user: User = Depends(current_active_user),
-    service: ChatService = Depends(ChatService),
+    service: ChatService = Depends(get_chat_service),
 ):
     """Stream responses and store in chat history"""
     # Verify chat exists
     if not request.chat_id:
         raise HTTPException(status_code=400, detail="chat_id is required")
 
-    # chat = await fastapi_request.app.mongo_dal.get_chat_memory(request.chat_id)
-    # Verify chat belongs to user
-    chat = await fastapi_request.app.mongo_dal.get_chat_memory_for_user(chat_id=request.chat_id, user_id=str(user.id))
-    if not chat:
+    # Verify chat belongs to user, loading only its last messages and summary (the client sent history is not used)
+    chat_history = await fastapi_request.app.mongo_dal.get_chat_history_for_user(chat_id=request.chat_id, user_id=str(user.id))
+    if not chat_history:
         raise HTTPException(status_code=404, detail="Chat memory not found")
 
-    # Debug log
-    print(f"[DEBUG] Received chat_history: {len(request.chat_history)} messages")
-    for msg in request.chat_history:
-        print(f"  - {msg.role}: {msg.content[:50]}...")
+    # Older turns are folded into the chat summary
+    history = await service.compact_history(chat_history)
+    if history.summary_updated:
+        await fastapi_request.app.mongo_dal.update_chat_summary(
+            request.chat_id, summary=history.summary, summarized_count=history.summarized_count
+        )
+    logger.debug(
+        f"History: {len(history.messages)} recent message(s), {history.summarized_count} summarized, ~{history.tokens} tokens"
+    )
 
-    await fastapi_request.app.mongo_dal.add_message_to_chat(request.chat_id, role="user", content=request.question)
+    user_message = ChatMessage(role="user", content=request.question)
+
+    # Deltas are coalesced into frames and tool calls, retrieval hits and handoffs are sent as named events,
+    # the stream stops the agent when the client disconnects
+    stream = AnswerStream(
+        service.get_agent_event_stream(request.question, history=history, user_id=str(user.id)),
+        is_disconnected=fastapi_request.is_disconnected,
+    )
 
     async def event_generator():
-        full_response = ""
         try:
-            async for chunk in service.get_agent_response_stream(
-                request.question,
-                chat_history=request.chat_history,
-            ):
-                full_response += chunk
-                # Send as JSON for easier parsing on frontend
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-
-            await fastapi_request.app.mongo_dal.add_message_to_chat(request.chat_id, role="assistant", content=full_response)
+            async for frame in stream.frames():
+                yield frame
 
             # Send completion signal
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            if stream.completed:
+                yield sse_frame({"done": True})
         except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield sse_frame({"error": str(e)})
+        finally:
+            # The question and the answer are stored together once the stream ends, also when it failed or
+            # the client disconnected (the generator is then cancelled, so the write is queued without awaiting)
+            assistant_message = ChatMessage(role="assistant", content=stream.text, interrupted=not stream.completed)
+            fastapi_request.app.message_writer.submit(request.chat_id, [user_message, assistant_message])
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
-@router.post("/upload_files")
+# The body is parsed as it arrives instead of through File(), so the request body is described here
+UPLOAD_FILES_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                    "required": ["files"],
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/upload_files", status_code=status.HTTP_202_ACCEPTED, openapi_extra=UPLOAD_FILES_OPENAPI)
 async def upload_resume_files(
-    files: list[UploadFile] = File(...), _user: User = Depends(current_active_user), service: ChatService = Depends(ChatService)
-):
-    """Upload files route for uploading PDFs and Text Files to the vector database"""
-
-    # Create a temporary directory for uploaded files
-    temp_dir = Path(tempfile.mkdtemp())
-
+    request: Request,
+    user: User = Depends(current_active_user),
+    service: ChatService = Depends(get_chat_service),
+) -> UploadJobResponse:
+    """
+    Upload documents (PDF, text, Markdown, HTML, DOCX, JSON Resume) and queue their ingestion into the vector database, returns the ingestion job id.
+    The ingestion job starts with the first received file while the next ones are still uploading,
+    and fails when the next file takes over UPLOAD_QUEUE_TIMEOUT seconds to arrive.
+    """
     try:
-        # Save uploaded files to temp directory
-        for file in files:
-            file_path = temp_dir / file.filename  # type: ignore
-            with open(file_path, "wb") as buffer:  # type: ignore
-                shutil.copyfileobj(file.file, buffer)
-
-        # Process files through the service
-        result = service.process_uploaded_files(temp_dir)
-
-        if not result.success:
-            raise HTTPException(status_code=500, detail="Error processing uploaded files.")
-
-        return result
+        check_upload_size(request)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
 
+    uploads = UploadQueue()
+    job = None
+    error: BaseException | None = None
+    try:
+        async for document in stream_uploaded_files(request):
+            if job is None:
+                # Parsing, embedding and chroma writes run on a worker thread, consuming the files as they arrive
+                job = request.app.ingestion_jobs.submit(
+                    user_id=str(user.id),
+                    files=[],
+                    run=lambda progress: service.process_uploaded_documents(uploads, progress=progress, user_id=str(user.id)),
+                    cleanup=uploads.discard,
+                )
+            job.files.append(document.name)
+            uploads.put(document)
+    except UploadError as e:
+        error = e
+        code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if isinstance(e, UploadTooLarge) else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=code, detail=str(e))
     except Exception as e:
+        error = e
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
-
+    except BaseException as e:
+        # The request was cancelled, e.g. on shutdown
+        error = e
+        raise
     finally:
-        # Clean up temporary directory
-        shutil.rmtree(temp_dir)
+        # The ingestion worker waits on the queue until it is closed or aborted, whatever ends the upload
+        if error is None:
+            uploads.close()
+        else:
+            # Drop the queued files, the ingestion stops with the error once the current file is done
+            uploads.discard()
+            uploads.abort(error if isinstance(error, Exception) else UploadError("Upload cancelled"))
+
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files uploaded")
+    return UploadJobResponse(job_id=job.id, status=job.status)
+
+
+@router.get("/upload_jobs/{job_id}")
+async def get_upload_job(job_id: str, request: Request, user: User = Depends(current_active_user)) -> IngestionJob:
+    """Get the status and progress of an ingestion job, with the upload result once finished"""
+    job = request.app.ingestion_jobs.get(job_id, user_id=str(user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
+
+
+@router.get("/upload_jobs/{job_id}/events")
+async def stream_upload_job(job_id: str, request: Request, user: User = Depends(current_active_user)):
+    """Stream the ingestion job progress as server-sent events until the job finishes"""
+    job = request.app.ingestion_jobs.get(job_id, user_id=str(user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+
+    async def event_generator():
+        last_snapshot = None
+        while not await request.is_disconnected():
+            snapshot = job.model_dump_json()
+            if snapshot != last_snapshot:
+                yield f"data: {snapshot}\n\n"
+                last_snapshot = snapshot
+            if job.finished:
+                break
+            await asyncio.sleep(UPLOAD_PROGRESS_INTERVAL)
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 # Endpoint for listing collection items
 @router.get("/list_collection_items")
-def list_collection_items(_user: User = Depends(current_active_user), service: ChatService = Depends(ChatService)):
-    """List all items in the resume collection"""
+def list_collection_items(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    user: User = Depends(current_active_user),
+    service: ChatService = Depends(get_chat_service),
+):
+    """List a page of the files in the resume collection of the user, with their page and chunk counts, size and hash"""
     try:
-        items = service.list_collection_items()
+        items = service.list_collection_items(user_id=str(user.id), offset=offset, limit=limit)
         return items
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -160,17 +263,46 @@ async def get_all_chats(
     return await request.app.mongo_dal.get_all_chats(user_id=str(user.id), limit=limit)
 
 
+@router.get("/chats")
+async def list_chats(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    user: User = Depends(current_active_user),
+) -> ChatSummaryPage:
+    """List the chats of the current user without their messages, newest first, paginated by cursor"""
+    try:
+        return await request.app.mongo_dal.list_chat_summaries(user_id=str(user.id), limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/chat_memory/{chat_id}/messages")
+async def get_chat_messages(
+    chat_id: str,
+    request: Request,
+    before: int | None = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    user: User = Depends(current_active_user),
+) -> ChatMessagesPage:
+    """Get a page of the messages of a chat, the newest ones or those before the `before` index"""
+    page = await request.app.mongo_dal.get_chat_messages_for_user(chat_id, user_id=str(user.id), before=before, limit=limit)
+    if not page:
+        raise HTTPException(status_code=404, detail="Chat memory not found")
+    return page
+
+
 @router.post("/chat_memory/{chat_id}/message")
 async def add_message(
     chat_id: str, role: str, content: str, request: Request, user: User = Depends(current_active_user)
-) -> ChatMemory:
+) -> AddMessageResponse:
     """Add a message to an existing chat"""
     # First verify the chat belongs to user
-    chat = await request.app.mongo_dal.get_chat_memory_for_user(chat_id=chat_id, user_id=str(user.id))
+    chat = await request.app.mongo_dal.get_chat_history_for_user(chat_id=chat_id, user_id=str(user.id), limit=1)
     if not chat:
         raise HTTPException(status_code=404, detail="Chat memory not found")
 
-    updated_chat = await request.app.mongo_dal.add_message_to_chat(chat_id, role, content)
-    if not updated_chat:
+    message_id = await request.app.mongo_dal.add_message_to_chat(chat_id, role, content)
+    if not message_id:
         raise HTTPException(status_code=404, detail="Chat memory not found")
-    return updated_chat
+    return AddMessageResponse(chat_id=chat_id, message_id=message_id)
@@ -1,14 +1,19 @@
 import os
+import secrets
 import sys
+from collections.abc import Iterator
 
 import uvicorn
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from openai_sdk_resume_assistant.backend.app.api.chat import router
 from openai_sdk_resume_assistant.backend.app.models.user_schemas import UserCreate, UserRead, UserUpdate
 from openai_sdk_resume_assistant.backend.app.mongodb import DEBUG, User, lifespan
 from openai_sdk_resume_assistant.backend.app.users import auth_backend, current_active_user, fastapi_users
+from openai_sdk_resume_assistant.mcp_pool import mcp_session_manager
+from openai_sdk_resume_assistant.metrics import CONTENT_TYPE, escape_label_value, render_metrics
 
 APP_TITLE = "CV API"
 APP_VERSION = "1.0.0"
@@ -16,6 +21,8 @@ app = FastAPI(title=APP_TITLE, version=APP_VERSION, lifespan=lifespan, debug=DEB
 
 # FRONTEND_URL from env or hardcoded for CORS
 FRONTEND_URL = os.getenv("FRONTEND_URL", "https://openai-sdk-resume-assistant.vercel.app")
+# Bearer token the Prometheus scraper sends to /metrics, the endpoint is disabled when unset
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
 
 ALLOWED_ORIGINS = [
@@ -72,6 +79,39 @@ def health():
     return {"status": "ok", "app": APP_TITLE, "version": APP_VERSION}
 
 
+def _mcp_pool_metrics() -> Iterator[str]:
+    stats = mcp_session_manager.stats()
+    for name, kind, description in (
+        ("ready", "gauge", "MCP servers of the pool ready to be leased."),
+        ("restarts", "counter", "Restarts of the MCP servers of the pool."),
+    ):
+        metric = f"resume_assistant_mcp_pool_{name}" + ("_total" if kind == "counter" else "")
+        yield f"# HELP {metric} {description}"
+        yield f"# TYPE {metric} {kind}"
+        for server, server_stats in stats.items():
+            yield f'{metric}{{server="{escape_label_value(server)}"}} {server_stats[name]}'
+
+
+def require_metrics_token(authorization: str = Header("")) -> None:
+    """Only serve the metrics, which reveal usage, cost and internals, to a scraper holding METRICS_TOKEN"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+def metrics(request: Request):
+    """Stage latencies, token usage and cost per model, cache hit ratios and MCP pool state in the Prometheus text format"""
+    cache_stats = {}
+    if chat_service := getattr(request.app, "chat_service", None):
+        cache_stats.update(chat_service.cache_stats())
+    if (mongo_dal := getattr(request.app, "mongo_dal", None)) and mongo_dal.history_cache:
+        cache_stats["chat_history"] = mongo_dal.history_cache.stats()
+    return PlainTextResponse(render_metrics(cache_stats, collectors=[_mcp_pool_metrics]), media_type=CONTENT_TYPE)
+
+
 def main(_argv=sys.argv[1:]):
     try:
         uvicorn.run("openai_sdk_resume_assistant.app.main:app", host="127.0.0.1", port=8000, reload=DEBUG)
@@ -1,27 +1,62 @@
 from datetime import datetime
+from typing import Literal
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
 
+def legacy_message_id(chat_id: str, index: int) -> str:
+    """Id of a message stored before messages had one, see MongoDAL.ensure_indexes"""
+    return f"{chat_id}-{index}"
+
+
 class ChatMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     role: str = Field(..., description="Role of the message sender, e.g., 'user' or 'agent'")
     content: str
-    timestamp: datetime = datetime.utcnow()  # type: ignore
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    interrupted: bool = False  # Partial answer, the stream failed or the client disconnected
 
 
 class QuestionRequest(BaseModel):
     question: str
     chat_id: str | None = None
-    chat_history: list[ChatMessage] = Field(default_factory=list)
+    chat_history: list[ChatMessage] | None = None  # Ignored by ask_stream, which loads the stored chat history
 
 
 class UploadFilesResponse(BaseModel):
     pdf_count: int
-    text_count: int
+    text_count: int  # Text, Markdown, HTML, DOCX and JSON Resume files
     errors: list[str]
     success: bool
+    unchanged_files: int = 0  # Re-uploaded files skipped because their content did not change
+    chunks_added: int = 0
+    chunks_removed: int = 0
+
+
+class IngestionJob(BaseModel):
+    """Background ingestion of uploaded files, its progress and final result"""
+
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    user_id: str
+    status: Literal["queued", "running", "completed", "failed"] = "queued"
+    files: list[str] = Field(default_factory=list)
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    errors: list[str] = Field(default_factory=list)
+    result: UploadFilesResponse | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+
+class UploadJobResponse(BaseModel):
+    job_id: str
+    status: str
 
 
 class ChatMemory(BaseModel):
@@ -30,6 +65,8 @@ class ChatMemory(BaseModel):
     user_id: str
     chat_messages: list[ChatMessage] = Field(default_factory=list)
     created_at: datetime | None = None
+    summary: str = ""  # Rolling summary of the older messages, see HistoryCompactor
+    summarized_count: int = 0  # Leading chat messages covered by the summary
 
     @staticmethod
     def from_doc(doc) -> "ChatMemory":  # To convert back to pydantic model
@@ -39,9 +76,53 @@ class ChatMemory(BaseModel):
             user_id=doc.get("user_id", ""),
             chat_messages=[ChatMessage(**msg) for msg in doc.get("chat_messages", [])],
             created_at=doc.get("created_at"),
+            summary=doc.get("summary", ""),
+            summarized_count=doc.get("summarized_count", 0),
         )
 
 
+class ChatHistory(BaseModel):
+    """The last messages of a chat and its rolling summary, what a question needs of the chat"""
+
+    chat_id: str
+    user_id: str
+    messages: list[ChatMessage] = Field(default_factory=list)  # Newest messages, oldest first
+    message_count: int = 0  # Messages in the whole chat
+    summary: str = ""
+    summarized_count: int = 0
+
+    @property
+    def offset(self) -> int:
+        """Index of the first loaded message in the whole chat"""
+        return self.message_count - len(self.messages)
+
+
+class ChatSummary(BaseModel):
+    """A chat without its messages, for the chat list"""
+
+    id: str
+    chat_name: str
+    created_at: datetime | None = None
+    message_count: int = 0
+
+
+class ChatSummaryPage(BaseModel):
+    chats: list[ChatSummary] = Field(default_factory=list)
+    next_cursor: str | None = None  # Cursor of the next page, None on the last page
+
+
+class ChatMessagesPage(BaseModel):
+    chat_id: str
+    messages: list[ChatMessage] = Field(default_factory=list)
+    start: int = 0  # Index of the first returned message in the chat, pass it as `before` for the previous page
+    message_count: int = 0
+
+
+class AddMessageResponse(BaseModel):
+    chat_id: str
+    message_id: str
+
+
 class ChatNameResponse(BaseModel):
     id: str
     chat_name: str
@@ -8,7 +8,13 @@ from fastapi_users.db import BeanieBaseUser
 from fastapi_users_db_beanie import BeanieUserDatabase
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from openai_sdk_resume_assistant.backend.app.services.chat_service import ChatService
 from openai_sdk_resume_assistant.backend.app.services.data_access_layer import MongoDAL
+from openai_sdk_resume_assistant.backend.app.services.history_cache import CHAT_HISTORY_CACHE_ENABLED, ChatHistoryCache
+from openai_sdk_resume_assistant.backend.app.services.ingestion_jobs import IngestionJobManager
+from openai_sdk_resume_assistant.backend.app.services.message_writer import MessageWriter
+from openai_sdk_resume_assistant.mcp_pool import MCP_POOL_SIZE, mcp_session_manager
+from openai_sdk_resume_assistant.resume_agent import mcp_params_list
 
 load_dotenv()
 
@@ -40,10 +46,27 @@ async def lifespan(app: FastAPI):
     )
 
     chat_mem_collection = database.get_collection(COLLECTION_NAME)
-    app.mongo_dal = MongoDAL(chat_mem_collection)  # type: ignore
+    history_cache = ChatHistoryCache() if CHAT_HISTORY_CACHE_ENABLED else None
+    app.mongo_dal = MongoDAL(chat_mem_collection, history_cache=history_cache)  # type: ignore
+    await app.mongo_dal.ensure_indexes()  # type: ignore
+    # Chat turns are written behind the streamed answers
+    app.message_writer = MessageWriter(app.mongo_dal)  # type: ignore
+    app.message_writer.start()  # type: ignore
+
+    # One chat service, with its clients and connection pools, shared by all requests
+    app.chat_service = ChatService()  # type: ignore
+    app.ingestion_jobs = IngestionJobManager()  # type: ignore
+
+    # Keep the agent's MCP servers warm so requests lease them instead of spawning subprocesses
+    for params in mcp_params_list:
+        mcp_session_manager.add_server(params, pool_size=MCP_POOL_SIZE)
 
     yield
 
+    await app.ingestion_jobs.shutdown()  # type: ignore
+    await mcp_session_manager.close()
+    await app.chat_service.aclose()  # type: ignore
+    await app.message_writer.close()  # type: ignore
     client.close()
 
 
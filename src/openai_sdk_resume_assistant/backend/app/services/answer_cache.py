@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+
+from openai_sdk_resume_assistant.RAG.query_cache import normalize_query
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").strip().lower() in {"1", "true", "on", "yes"}
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+# Characters per chunk when a cached answer is replayed on the stream
+ANSWER_CACHE_REPLAY_CHUNK_SIZE = int(os.getenv("ANSWER_CACHE_REPLAY_CHUNK_SIZE", "64"))
+
+
+def answer_cache_key(instructions: str, collection_version: str, question: str, history: list[tuple[str, str]]) -> str:
+    """
+    Key of a cached answer.
+    Args:
+        instructions: The agent instructions (and model), answers change when they do.
+        collection_version: Version of the retrieval collection, answers change when documents are uploaded.
+        question: The user question, normalized before hashing.
+        history: The (role, content) messages sent along with the question, empty for context-free questions.
+    """
+    instructions_hash = hashlib.sha256(instructions.encode()).hexdigest()
+    history_fingerprint = hashlib.sha256(
+        json.dumps([(role, normalize_query(content)) for role, content in history]).encode()
+    ).hexdigest()
+    key = "\0".join([instructions_hash, collection_version, normalize_query(question), history_fingerprint])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class AnswerCache:
+    """
+    In-memory cache of complete agent answers with a TTL and least recently used eviction.
+    Args:
+        ttl (float): Seconds an answer is served for.
+        max_entries (int): Answers kept before the least recently used ones are evicted.
+    """
+
+    def __init__(self, ttl: float = ANSWER_CACHE_TTL, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, answer: str) -> None:
+        if not answer:
+            return
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def replay(answer: str, chunk_size: int = ANSWER_CACHE_REPLAY_CHUNK_SIZE) -> Iterator[str]:
+        """Split a cached answer into chunks for the stream."""
+        for start in range(0, len(answer), chunk_size):
+            yield answer[start : start + chunk_size]
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,117 +1,293 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import os
+from collections.abc import AsyncGenerator, Iterable
 from pathlib import Path
 from typing import Any
 
-from openai_sdk_resume_assistant.backend.app.models.chat_schemas import UploadFilesResponse
+from fastapi import Request
+from loguru import logger
+
+from openai_sdk_resume_assistant.agent_events import AgentEvent, TextDelta
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatHistory, UploadFilesResponse
+from openai_sdk_resume_assistant.backend.app.services.answer_cache import ANSWER_CACHE_ENABLED, AnswerCache, answer_cache_key
+from openai_sdk_resume_assistant.backend.app.services.history_compaction import (
+    CHAT_SUMMARY_ENABLED,
+    CompactedHistory,
+    HistoryCompactor,
+    speaker,
+)
 from openai_sdk_resume_assistant.client import AzureAIClient
-from openai_sdk_resume_assistant.RAG.vector_db import VectorDB  # type: ignore
-from openai_sdk_resume_assistant.resume_agent import resume_agent
+from openai_sdk_resume_assistant.RAG.document_source import DocumentSource
+from openai_sdk_resume_assistant.RAG.rag_agent import RAGRunContext, RAGTool
+from openai_sdk_resume_assistant.RAG.vector_db import ProgressCallback, VectorDB, tenant_collection_name  # type: ignore
+from openai_sdk_resume_assistant.resume_agent import RAG_MODE, create_resume_agent, resume_agent
+
+# Uploads go to a collection of the user and questions retrieve from it, falling back to the shared
+# collection until the user uploads. Only the in-process RAG tool is routed, the MCP RAG agent stays shared.
+RAG_PER_USER_COLLECTIONS = os.getenv("RAG_PER_USER_COLLECTIONS", "false").strip().lower() in {"1", "true", "on", "yes"}
 
 
 class ChatService:
+    """
+    Chat service holding the Azure clients, vector database and resume agent.
+    It is built once in the app lifespan and shared by all requests through get_chat_service.
+    """
+
     VECTORSTORE = "resume_vectorstore"  # Some defaults
     COLLECTION_NAME = "ilyan_resume"
 
     def __init__(self):
         # Set the AzureAI client defaults
         client = AzureAIClient()
+        self._client = client
         self._openai_client = client.set_openai_client_defaults()
-        self.agent = resume_agent
 
         # Initialize the vector database
-        self.vector_db = VectorDB(self.VECTORSTORE)
+        self.vector_db = VectorDB(self.VECTORSTORE, azure_openai_client=client)
+
+        self.rag_tool: RAGTool | None = None
+        if RAG_MODE == "mcp":
+            self.agent = resume_agent
+        else:
+            # Retrieve in-process from the same vector database instead of a nested agent behind MCP
+            self.rag_tool = RAGTool(collection_name=self.COLLECTION_NAME, azure_ai_client=client, vector_db=self.vector_db)
+            self.agent = create_resume_agent(rag_tool=self.rag_tool)
+
+        # Opt-in cache of complete answers, see _answer_cache_key
+        self.answer_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
+
+        # Keeps the history sent with a question within a token budget, summarizing older turns
+        self.history_compactor = HistoryCompactor(self._openai_client if CHAT_SUMMARY_ENABLED else None)
 
-    async def get_agent_response(self, question: str) -> str:
+    def collection_name(self, user_id: str | None = None) -> str:
+        """The collection of the user with per-user collections enabled, the shared collection otherwise."""
+        if RAG_PER_USER_COLLECTIONS and user_id:
+            return tenant_collection_name(user_id, prefix="user")
+        return self.COLLECTION_NAME
+
+    def _retrieval_collection(self, user_id: str | None = None) -> str:
+        """The collection questions of the user retrieve from, the shared one until the user has uploaded."""
+        collection_name = self.collection_name(user_id)
+        if collection_name != self.COLLECTION_NAME and self.vector_db.get_collection(collection_name) is None:
+            return self.COLLECTION_NAME
+        return collection_name
+
+    def _run_context(self, user_id: str | None = None) -> RAGRunContext | None:
+        if self.rag_tool is None or not RAG_PER_USER_COLLECTIONS:
+            return None
+        return RAGRunContext(collection_name=self.collection_name(user_id))
+
+    async def _answer_cache_key(self, question: str, history: list[tuple[str, str]], user_id: str | None = None) -> str | None:
+        """Answer cache key for the question, None when the cache is disabled."""
+        if self.answer_cache is None:
+            return None
+        collection_name = self._retrieval_collection(user_id) if self.rag_tool is not None else self.COLLECTION_NAME
+        collection_version = await asyncio.to_thread(self.vector_db.collection_version, collection_name)
+        return answer_cache_key(
+            f"{self.agent.model_name}\0{self.agent.instructions}\0{collection_name}", collection_version, question, history
+        )
+
+    async def get_agent_response(self, question: str, user_id: str | None = None) -> str:
         """
         Get a response from the resume agent for the given question.
         Args:
             question: The question to ask the resume agent.
+            user_id: The user asking, routes the retrieval to the user's collection.
 
         Returns:
             The response from the resume agent.
         """
-        return await self.agent.run_agent_with_mcp(question)
+        cache_key = await self._answer_cache_key(question, [], user_id=user_id)
+        if cache_key and (cached := self.answer_cache.get(cache_key)) is not None:  # type: ignore
+            return cached
+
+        response = await self.agent.run_agent_with_mcp(question, context=self._run_context(user_id))
+        if cache_key:
+            self.answer_cache.put(cache_key, response)  # type: ignore
+        return response
 
     # Add agent chat response streaming support
-    async def get_agent_response_stream(self, question: str, chat_history: list | None = None) -> AsyncGenerator[str, None]:
+    async def get_agent_response_stream(
+        self,
+        question: str,
+        chat_history: list | None = None,
+        history: CompactedHistory | None = None,
+        user_id: str | None = None,
+    ) -> AsyncGenerator[str, None]:
         """
         Stream the agent response as it's generated.
         Args:
             question: The question to ask the resume agent.
+            chat_history: Messages of the chat, sent as a sliding window within the token budget.
+            history: Already compacted history (see compact_history), used instead of chat_history.
+            user_id: The user asking, routes the retrieval to the user's collection.
 
         Yields:
-            Text chunks as they are generated.
+            Text chunks as they are generated, or the chunks of a cached answer.
         """
+        async for event in self.get_agent_event_stream(question, chat_history=chat_history, history=history, user_id=user_id):
+            if isinstance(event, TextDelta):
+                yield event.text
+
+    async def get_agent_event_stream(
+        self,
+        question: str,
+        chat_history: list | None = None,
+        history: CompactedHistory | None = None,
+        user_id: str | None = None,
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """
+        Stream the typed events of the agent run: text deltas, tool calls, retrieval hits and handoffs.
+        Args:
+            question: The question to ask the resume agent.
+            chat_history: Messages of the chat, sent as a sliding window within the token budget.
+            history: Already compacted history (see compact_history), used instead of chat_history.
+            user_id: The user asking, routes the retrieval to the user's collection.
+
+        Yields:
+            The events as they happen, a cached answer is replayed as text deltas only.
+        """
+        if history is None:
+            history = self.history_compactor.window(self._history_pairs(chat_history))
+        cache_key = await self._answer_cache_key(question, history.fingerprint, user_id=user_id)
+        if cache_key and (cached := self.answer_cache.get(cache_key)) is not None:  # type: ignore
+            for chunk in self.answer_cache.replay(cached):  # type: ignore
+                yield TextDelta(chunk)
+            return
+
         # Build context string from chat history
-        prompt = self._build_prompt_with_history(question, chat_history)
+        prompt = self._build_prompt_with_history(question, history)
 
-        # Debug logging
-        print("[DEBUG] Final prompt being sent to agent:")
-        print(prompt)
-        print("-" * 50)
+        logger.debug(f"Final prompt being sent to agent:\n{prompt}")
 
-        async for chunk in self.agent.run_agent_with_mcp_stream(prompt):
-            yield chunk
+        chunks: list[str] = []
+        async for event in self.agent.run_agent_with_mcp_events(prompt, context=self._run_context(user_id)):
+            if isinstance(event, TextDelta):
+                chunks.append(event.text)
+            yield event
 
-    def _build_prompt_with_history(self, question: str, chat_history: list | None = None) -> str:
-        """Build a prompt string that includes chat history for context."""
-        # No history - just return the question
-        if not chat_history or len(chat_history) == 0:
-            return question
+        # Only complete answers are cached, an interrupted stream never gets here
+        if cache_key:
+            self.answer_cache.put(cache_key, "".join(chunks))  # type: ignore
 
-        # Limit to last 6 messages
-        recent_history = chat_history[-6:]
+    async def compact_history(self, chat_history: ChatHistory) -> CompactedHistory:
+        """
+        Fit the chat history into the history token budget, folding older turns into the chat summary.
+        Args:
+            chat_history: The last messages and the stored summary of the chat.
+        Returns:
+            The compacted history, store its summary on the chat when summary_updated is set.
+        """
+        return await self.history_compactor.compact(
+            self._history_pairs(chat_history.messages),
+            summary=chat_history.summary,
+            summarized_count=chat_history.summarized_count,
+            offset=chat_history.offset,
+        )
 
-        # Build simple history format
-        history_lines = []
-        for msg in recent_history:
+    @staticmethod
+    def _history_pairs(chat_history: list | None = None) -> list[tuple[str, str]]:
+        """The (role, content) of the history messages."""
+        history = []
+        for msg in chat_history or []:
             role = msg.role if hasattr(msg, "role") else msg.get("role", "user")
             content = msg.content if hasattr(msg, "content") else msg.get("content", "")
-            prefix = "User" if role == "user" else "Assistant"
-            history_lines.append(f"{prefix}: {content}")
+            history.append((role, content))
+        return history
 
-        # Keep prompt simple - don't override agent instructions
-        prompt = f"""Conversation history:
-        {chr(10).join(history_lines)}
+    def _build_prompt_with_history(self, question: str, history: CompactedHistory) -> str:
+        """Build a prompt string that includes the summary and recent messages of the chat for context."""
+        # No history - just return the question
+        if not history.summary and not history.messages:
+            return question
 
-        Current question: {question}"""
+        sections = []
+        if history.summary:
+            sections.append(f"Summary of the earlier conversation:\n{history.summary}")
+        if history.messages:
+            history_lines = [f"{speaker(role)}: {content}" for role, content in history.messages]
+            sections.append(f"Conversation history:\n{chr(10).join(history_lines)}")
 
-        print(f"[DEBUG] Built prompt:\n{prompt}")
-        return prompt
+        # Keep prompt simple - don't override agent instructions
+        sections.append(f"Current question: {question}")
+        return "\n\n".join(sections)
 
-    def process_uploaded_files(self, files_directory: Path | str) -> UploadFilesResponse:  # dict:
+    def process_uploaded_files(
+        self, files_directory: Path | str, progress: ProgressCallback | None = None, user_id: str | None = None
+    ) -> UploadFilesResponse:  # dict:
         """
-        Process uploaded files and add them to the vector database.
-        Automatically detects PDFs and text files and processes them accordingly.
+        Process the files of a directory and add them to the vector database, see process_uploaded_documents.
         Args:
             files_directory: Directory containing the uploaded files
+            progress: Optional callback receiving ingestion progress
+            user_id: The uploading user, the files go to the user's collection with per-user collections
         Returns:
             UploadFilesResponse with processing status and details
         """
         if isinstance(files_directory, str):
             files_directory = Path(files_directory)
+        # Opened one at a time as the ingestion gets to them
+        documents = (DocumentSource.from_path(path) for path in sorted(files_directory.iterdir()) if path.is_file())
+        return self.process_uploaded_documents(documents, progress=progress, user_id=user_id)
 
+    def process_uploaded_documents(
+        self, documents: Iterable[DocumentSource], progress: ProgressCallback | None = None, user_id: str | None = None
+    ) -> UploadFilesResponse:
+        """
+        Add uploaded documents to the vector database as they arrive, see VectorDB.add_documents_to_collection.
+        PDF, text, Markdown, HTML, DOCX and JSON Resume files are parsed, other files and those that fail to parse
+        are reported in the errors while the rest of the batch is ingested.
+        Re-uploaded files are ingested incrementally, unchanged files are skipped.
+        Runs synchronously, the upload route calls it from an ingestion job worker thread while the
+        rest of the upload is still being received.
+        Args:
+            documents: The uploaded documents
+            progress: Optional callback receiving ingestion progress
+            user_id: The uploading user, the files go to the user's collection with per-user collections
+        Returns:
+            UploadFilesResponse with processing status and details
+        """
         result = UploadFilesResponse(pdf_count=0, text_count=0, errors=[], success=False)
-
         try:
-            # Check for PDF files
-            pdf_files = list(files_directory.glob("*.pdf"))
-            if pdf_files:
-                self.vector_db.add_pdf_to_collection(directory=files_directory, collection_name=self.COLLECTION_NAME)
-                result.pdf_count = len(pdf_files)
-
-            # Check for text files
-            text_files = list(files_directory.glob("*.txt"))
-            if text_files:
-                self.vector_db.add_texts_to_collection(directory=files_directory, collection_name=self.COLLECTION_NAME)
-                result.text_count = len(text_files)
-
+            stats = self.vector_db.add_documents_to_collection(
+                documents, collection_name=self.collection_name(user_id), progress=progress
+            )
+            self._add_ingestion_stats(result, stats)
+            result.pdf_count = stats["pdf_files"]
+            result.text_count = stats["text_files"]
+            result.errors.extend(f"Unsupported file type: {name}" for name in stats["unsupported_files"])
+            result.errors.extend(f"Could not parse {name}: {error}" for name, error in stats["failed_files"].items())
             result.success = True
-            return result
-
         except Exception as e:
             result.errors.append(str(e))
-            return result
+        return result
+
+    @staticmethod
+    def _add_ingestion_stats(result: UploadFilesResponse, stats: dict[str, int]) -> None:
+        result.unchanged_files += stats["unchanged_files"]
+        result.chunks_added += stats["chunks_added"]
+        result.chunks_removed += stats["chunks_removed"]
+
+    def cache_stats(self) -> dict[str, dict[str, Any]]:
+        """The stats of the enabled answer, query and embedding caches by cache name."""
+        caches = {
+            "answer": self.answer_cache,
+            "query": self.rag_tool.query_cache if self.rag_tool else None,
+            "embedding": self.vector_db.embedding_cache,
+        }
+        return {name: cache.stats() for name, cache in caches.items() if cache is not None}
+
+    def list_collection_items(self, user_id: str | None = None, offset: int = 0, limit: int | None = None) -> dict[str, Any]:
+        return self.vector_db.list_collection_items(
+            collection_name=self._retrieval_collection(user_id), offset=offset, limit=limit
+        )
+
+    async def aclose(self) -> None:
+        """Release the HTTP connection pools of the Azure clients and stop the PDF extraction workers."""
+        await self._client.aclose()
+        await asyncio.to_thread(self.vector_db.pdf_extractor.close)
+
 
-    def list_collection_items(self) -> dict[str, Any]:
-        return self.vector_db.list_collection_items(collection_name=self.COLLECTION_NAME)
+def get_chat_service(request: Request) -> ChatService:
+    """Dependency returning the app-scoped ChatService created in the lifespan."""
+    return request.app.chat_service
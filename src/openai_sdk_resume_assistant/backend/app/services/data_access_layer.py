@@ -3,19 +3,75 @@
 from datetime import datetime
 
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ReturnDocument
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 
-from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMemory, ChatMessage
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import (
+    ChatHistory,
+    ChatMemory,
+    ChatMessage,
+    ChatMessagesPage,
+    ChatSummary,
+    ChatSummaryPage,
+    legacy_message_id,
+)
+from openai_sdk_resume_assistant.backend.app.services.history_cache import CHAT_HISTORY_TAIL_MESSAGES, ChatHistoryCache
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS
 
 
 class MongoDAL:
-    def __init__(self, mongo_mem_collection: AsyncIOMotorClient):
+    def __init__(self, mongo_mem_collection: AsyncIOMotorCollection, history_cache: ChatHistoryCache | None = None):
         self._mongo_mem_collection = mongo_mem_collection
+        # Message tails of active chats, kept in step with the writes below
+        self._history_cache = history_cache
+
+    @property
+    def history_cache(self) -> ChatHistoryCache | None:
+        return self._history_cache
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes of the chat queries, a no-op when they already exist"""
+        # Chats of a user, newest first, with _id breaking ties of the pagination cursor
+        await self._mongo_mem_collection.create_index(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_id_created_at"
+        )
+        # Chats stored before message_count was kept, counted once on the server
+        result = await self._mongo_mem_collection.update_many(
+            {"message_count": {"$exists": False}},
+            [{"$set": {"message_count": {"$size": {"$ifNull": ["$chat_messages", []]}}}}],
+        )
+        if result.modified_count:
+            logger.info(f"Added message_count to {result.modified_count} chat(s)")
+        await self._backfill_message_ids()
+
+    async def _backfill_message_ids(self) -> None:
+        """Give the messages stored before messages had an id a stable one, derived from the chat id and their index"""
+        updated = 0
+        async for doc in self._mongo_mem_collection.find(
+            {"chat_messages": {"$elemMatch": {"id": {"$exists": False}}}}, {"chat_messages.id": 1}
+        ):
+            ids = {
+                f"chat_messages.{index}.id": legacy_message_id(str(doc["_id"]), index)
+                for index, message in enumerate(doc.get("chat_messages", []))
+                if "id" not in message
+            }
+            # Messages are only ever appended, so the indexes stay valid while other requests write
+            await self._mongo_mem_collection.update_one({"_id": doc["_id"]}, {"$set": ids})
+            updated += 1
+        if updated:
+            logger.info(f"Added message ids to {updated} chat(s)")
 
     async def create_chat_memory(self, chat_name: str, user_id: str, session=None) -> str:
         response = await self._mongo_mem_collection.insert_one(
-            {"chat_name": chat_name, "user_id": user_id, "chat_messages": [], "created_at": datetime.utcnow()}, session=session
+            {
+                "chat_name": chat_name,
+                "user_id": user_id,
+                "chat_messages": [],
+                "message_count": 0,
+                "created_at": datetime.utcnow(),
+            },
+            session=session,
         )
         return str(response.inserted_id)
 
@@ -35,16 +91,116 @@ class MongoDAL:
         )
         return ChatMemory.from_doc(doc) if doc else None
 
-    async def add_message_to_chat(self, chat_id: str | ObjectId, role: str, content: str, session=None) -> ChatMemory | None:
-        """Add a new message to an existing chat"""
+    async def get_chat_history_for_user(
+        self, chat_id: str, user_id: str, limit: int = CHAT_HISTORY_TAIL_MESSAGES, session=None
+    ) -> ChatHistory | None:
+        """Get the last messages and the summary of a chat only if it belongs to the user, without loading older messages"""
+        cache = self._history_cache if self._history_cache and limit <= self._history_cache.max_messages else None
+        if cache and (cached := cache.get(chat_id, user_id)) is not None:
+            cached.messages = cached.messages[-limit:]
+            return cached
+
+        doc = await self._mongo_mem_collection.find_one(
+            {"_id": ObjectId(chat_id), "user_id": user_id},
+            {
+                "summary": 1,
+                "summarized_count": 1,
+                "message_count": 1,
+                "chat_messages": {"$slice": -(cache.max_messages if cache else limit)},
+            },
+            session=session,
+        )
+        if not doc:
+            return None
+        history = ChatHistory(
+            chat_id=str(doc["_id"]),
+            user_id=user_id,
+            messages=[ChatMessage(**msg) for msg in doc.get("chat_messages", [])],
+            message_count=doc.get("message_count", 0),
+            summary=doc.get("summary", ""),
+            summarized_count=doc.get("summarized_count", 0),
+        )
+        if cache:
+            # Cached with the full tail, whatever the limit of this call
+            cache.put(history)
+            history.messages = history.messages[-limit:]
+        return history
+
+    async def add_message_to_chat(self, chat_id: str | ObjectId, role: str, content: str, session=None) -> str | None:
+        """Add a new message to an existing chat, returns the id of the message"""
         message = ChatMessage(role=role, content=content)
-        doc = await self._mongo_mem_collection.find_one_and_update(
-            {"_id": ObjectId(chat_id)},
-            {"$push": {"chat_messages": message.model_dump()}},
-            return_document=ReturnDocument.AFTER,
+        added = await self.add_messages_to_chats({str(chat_id): [message]}, session=session)
+        return message.id if added else None
+
+    async def add_messages_to_chats(self, messages_by_chat: dict[str, list[ChatMessage]], session=None) -> int:
+        """
+        Append messages to several chats in one bulk write, one atomic $push per chat, returns the chats appended to.
+        Idempotent, so a failed write can be retried as a whole: a chat already holding the first message of its
+        batch is not matched again.
+        """
+        if not messages_by_chat:
+            return 0
+        updates = [
+            (
+                {"_id": ObjectId(chat_id), "chat_messages.id": {"$ne": messages[0].id}},
+                {
+                    "$push": {"chat_messages": {"$each": [message.model_dump() for message in messages]}},
+                    "$inc": {"message_count": len(messages)},
+                },
+            )
+            for chat_id, messages in messages_by_chat.items()
+        ]
+        with STAGE_SECONDS.time("mongo_write"):
+            if len(updates) == 1:
+                result = await self._mongo_mem_collection.update_one(*updates[0], session=session)
+            else:
+                result = await self._mongo_mem_collection.bulk_write(
+                    [UpdateOne(query, update) for query, update in updates], ordered=False, session=session
+                )
+        if self._history_cache:
+            for chat_id, messages in messages_by_chat.items():
+                self._history_cache.append(chat_id, messages)
+        return result.matched_count
+
+    async def get_chat_messages_for_user(
+        self, chat_id: str, user_id: str, before: int | None = None, limit: int = 50, session=None
+    ) -> ChatMessagesPage | None:
+        """Get a page of the messages of a chat only if it belongs to the user, the newest ones or those before an index"""
+        if before is None:
+            messages = {"$slice": -limit}
+        else:
+            start = max(before - limit, 0)
+            messages = {"$slice": [start, max(before - start, 1)]}
+        doc = await self._mongo_mem_collection.find_one(
+            {"_id": ObjectId(chat_id), "user_id": user_id},
+            {"chat_messages": messages, "message_count": 1},
             session=session,
         )
-        return ChatMemory.from_doc(doc) if doc else None
+        if not doc:
+            return None
+        chat_messages = doc.get("chat_messages", [])
+        if before is None:
+            start = doc.get("message_count", 0) - len(chat_messages)
+        elif before <= 0:
+            # $slice needs a positive count, the message loaded for the empty page before the first one is dropped
+            chat_messages = []
+        return ChatMessagesPage(
+            chat_id=str(doc["_id"]),
+            messages=[ChatMessage(**msg) for msg in chat_messages],
+            start=start,
+            message_count=doc.get("message_count", 0),
+        )
+
+    async def update_chat_summary(self, chat_id: str | ObjectId, summary: str, summarized_count: int, session=None) -> bool:
+        """Store the rolling history summary, unless a concurrent request already stored one covering more messages"""
+        result = await self._mongo_mem_collection.update_one(
+            {"_id": ObjectId(chat_id), "summarized_count": {"$not": {"$gte": summarized_count}}},
+            {"$set": {"summary": summary, "summarized_count": summarized_count}},
+            session=session,
+        )
+        if self._history_cache:
+            self._history_cache.set_summary(str(chat_id), summary, summarized_count)
+        return result.modified_count > 0
 
     async def get_all_chats(self, user_id: str, limit: int = 50, session=None) -> list[ChatMemory]:
         """Get all chat memories"""
@@ -52,7 +208,56 @@ class MongoDAL:
         docs = await cursor.to_list(length=limit)
         return [ChatMemory.from_doc(doc) for doc in docs]
 
+    async def list_chat_summaries(
+        self, user_id: str, limit: int = 50, cursor: str | None = None, session=None
+    ) -> ChatSummaryPage:
+        """
+        List the chats of a user without their messages, newest first.
+        Args:
+            user_id: Owner of the chats.
+            limit: Chats per page.
+            cursor: The next_cursor of the previous page, None for the first page.
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        match = {"user_id": user_id}
+        if cursor:
+            created_at, last_id = self._decode_cursor(cursor)
+            match["$or"] = [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "_id": {"$lt": last_id}}]
+        cursor = (
+            self._mongo_mem_collection.find(match, {"chat_name": 1, "created_at": 1, "message_count": 1}, session=session)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+        )
+        docs = await cursor.to_list(length=limit + 1)
+
+        chats = [
+            ChatSummary(
+                id=str(doc["_id"]),
+                chat_name=doc["chat_name"],
+                created_at=doc.get("created_at"),
+                message_count=doc.get("message_count", 0),
+            )
+            for doc in docs[:limit]
+        ]
+        next_cursor = self._encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return ChatSummaryPage(chats=chats, next_cursor=next_cursor)
+
+    @staticmethod
+    def _encode_cursor(doc: dict) -> str:
+        return f"{doc['created_at'].isoformat()}_{doc['_id']}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+        created_at, _, last_id = cursor.rpartition("_")
+        try:
+            return datetime.fromisoformat(created_at), ObjectId(last_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
     async def delete_chat_memory(self, chat_id: str, user_id: str, session=None) -> bool:
         """Delete a chat memory by ID only if it belongs to the user"""
         result = await self._mongo_mem_collection.delete_one({"_id": ObjectId(chat_id), "user_id": user_id}, session=session)
+        if self._history_cache:
+            self._history_cache.invalidate(chat_id)
         return result.deleted_count > 0
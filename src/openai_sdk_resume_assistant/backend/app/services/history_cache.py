@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatHistory, ChatMessage
+
+# Newest messages of a chat loaded for a question, older ones are covered by the chat summary
+CHAT_HISTORY_TAIL_MESSAGES = int(os.getenv("CHAT_HISTORY_TAIL_MESSAGES", "40"))
+CHAT_HISTORY_CACHE_ENABLED = os.getenv("CHAT_HISTORY_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "on", "yes"}
+# Seconds a cached tail is trusted, bounds staleness when another process writes to the same chat
+CHAT_HISTORY_CACHE_TTL = float(os.getenv("CHAT_HISTORY_CACHE_TTL", "300"))
+CHAT_HISTORY_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_HISTORY_CACHE_MAX_ENTRIES", "1024"))
+
+
+class ChatHistoryCache:
+    """
+    In-memory cache of the message tails of recently active chats, so consecutive turns skip the Mongo read.
+    The MongoDAL keeps the tails in step with its own writes.
+    Args:
+        max_messages (int): Messages kept per chat, the newest ones.
+        ttl (float): Seconds a tail is served before it is read again.
+        max_entries (int): Chats kept before the least recently used ones are evicted.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = CHAT_HISTORY_TAIL_MESSAGES,
+        ttl: float = CHAT_HISTORY_CACHE_TTL,
+        max_entries: int = CHAT_HISTORY_CACHE_MAX_ENTRIES,
+    ):
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[ChatHistory, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chat_id: str, user_id: str) -> ChatHistory | None:
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(chat_id, None)
+                self.misses += 1
+                return None
+            if entry[0].user_id != user_id:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(chat_id)
+            self.hits += 1
+            return entry[0].model_copy(deep=True)
+
+    def put(self, history: ChatHistory) -> None:
+        history = history.model_copy(deep=True)
+        history.messages = history.messages[-self.max_messages :]
+        with self._lock:
+            self._entries[history.chat_id] = (history, time.monotonic() + self.ttl)
+            self._entries.move_to_end(history.chat_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def append(self, chat_id: str, messages: list[ChatMessage]) -> None:
+        """Add stored messages to the cached tail of the chat, if it is cached."""
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is None:
+                return
+            history = entry[0]
+            history.messages = (history.messages + [message.model_copy() for message in messages])[-self.max_messages :]
+            history.message_count += len(messages)
+
+    def set_summary(self, chat_id: str, summary: str, summarized_count: int) -> None:
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is not None and entry[0].summarized_count < summarized_count:
+                entry[0].summary = summary
+                entry[0].summarized_count = summarized_count
+
+    def invalidate(self, chat_id: str) -> None:
+        with self._lock:
+            self._entries.pop(chat_id, None)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
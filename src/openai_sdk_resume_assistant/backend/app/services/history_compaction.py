@@ -0,0 +1,163 @@
+"""
+Token-aware compaction of the chat history sent along with a question. The newest messages are kept
+verbatim within a token budget, older ones are folded into a rolling summary that is stored on the chat.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from loguru import logger
+from openai import AsyncAzureOpenAI
+
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS, record_usage
+from openai_sdk_resume_assistant.RAG.embedding_pipeline import estimate_tokens
+
+# Estimated tokens of history (summary and verbatim messages) sent with a question
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+# Longer messages are cut to this many tokens in the prompt
+CHAT_HISTORY_MESSAGE_TOKENS = int(os.getenv("CHAT_HISTORY_MESSAGE_TOKENS", "400"))
+# Newest messages that are never folded into the summary
+CHAT_HISTORY_MIN_RECENT = int(os.getenv("CHAT_HISTORY_MIN_RECENT", "2"))
+CHAT_SUMMARY_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "true").strip().lower() in {"1", "true", "on", "yes"}
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", "gpt-4o-mini")
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+# Messages folded at once when the summary is updated, so it is not rewritten on every turn
+CHAT_SUMMARY_BATCH_MESSAGES = int(os.getenv("CHAT_SUMMARY_BATCH_MESSAGES", "6"))
+
+SUMMARY_INSTRUCTIONS = """
+You maintain a running summary of a conversation between a user and an assistant answering questions
+about a resume. Update the current summary with the new messages. Keep the facts, names, numbers and
+open questions that later questions may refer to, drop pleasantries. Answer with the updated summary only.
+"""
+
+
+def speaker(role: str) -> str:
+    return "User" if role == "user" else "Assistant"
+
+
+def clip_message(content: str, tokens: int) -> str:
+    """Cut a message to roughly the given number of tokens at a word boundary."""
+    if estimate_tokens(content) <= tokens:
+        return content
+    cut = content[: tokens * 4]
+    if " " in cut:
+        cut = cut[: cut.rindex(" ")]
+    return cut.rstrip() + " ..."
+
+
+@dataclass
+class CompactedHistory:
+    messages: list[tuple[str, str]] = field(default_factory=list)  # Verbatim (role, content) window, oldest first
+    summary: str = ""
+    summarized_count: int = 0  # Leading chat messages covered by the summary
+    summary_updated: bool = False  # The summary changed and should be stored on the chat
+
+    @property
+    def fingerprint(self) -> list[tuple[str, str]]:
+        """The (role, content) pairs sent with the question, used in the answer cache key."""
+        return ([("summary", self.summary)] if self.summary else []) + self.messages
+
+    @property
+    def tokens(self) -> int:
+        return sum(estimate_tokens(content) for _, content in self.fingerprint)
+
+
+class HistoryCompactor:
+    """
+    Fits the chat history into a token budget. Messages are taken newest first while they fit, the ones
+    that fall out of the window are folded into the stored summary together with a few more, so the
+    (incremental) summary update runs every few turns instead of on each one.
+    Args:
+        client (AsyncAzureOpenAI | None): Client used to summarize, None keeps a plain sliding window.
+        model (str): Deployment used to summarize.
+        token_budget (int): Estimated tokens of the summary and the verbatim messages.
+        message_tokens (int): Tokens a single message is cut to.
+        min_recent (int): Newest messages never folded into the summary.
+        batch_messages (int): Messages folded at once when the summary is updated.
+        summary_tokens (int): Maximum tokens of the summary, reserved in the budget.
+    """
+
+    def __init__(
+        self,
+        client: AsyncAzureOpenAI | None,
+        model: str = CHAT_SUMMARY_MODEL,
+        token_budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+        message_tokens: int = CHAT_HISTORY_MESSAGE_TOKENS,
+        min_recent: int = CHAT_HISTORY_MIN_RECENT,
+        batch_messages: int = CHAT_SUMMARY_BATCH_MESSAGES,
+        summary_tokens: int = CHAT_SUMMARY_MAX_TOKENS,
+    ):
+        self.client = client
+        self.model = model
+        self.token_budget = token_budget
+        self.message_tokens = message_tokens
+        self.min_recent = min_recent
+        self.batch_messages = batch_messages
+        self.summary_tokens = summary_tokens
+
+    def _window_start(self, history: list[tuple[str, str]], floor: int, budget: int) -> int:
+        """Index of the oldest message, not before floor, of the newest messages fitting the budget."""
+        used = 0
+        start = len(history)
+        for index in range(len(history) - 1, floor - 1, -1):
+            used += estimate_tokens(history[index][1])
+            if used > budget:
+                break
+            start = index
+        return start
+
+    def window(self, history: list[tuple[str, str]]) -> CompactedHistory:
+        """Sliding window of the newest messages within the budget, for history without a stored summary."""
+        clipped = [(role, clip_message(content, self.message_tokens)) for role, content in history]
+        return CompactedHistory(clipped[self._window_start(clipped, 0, self.token_budget) :])
+
+    async def compact(
+        self, history: list[tuple[str, str]], summary: str = "", summarized_count: int = 0, offset: int = 0
+    ) -> CompactedHistory:
+        """
+        Compact the history of a chat.
+        Args:
+            history: The (role, content) messages of the chat, oldest first.
+            summary: The summary stored on the chat.
+            summarized_count: Number of leading messages of the chat the stored summary covers.
+            offset: Index of the first history message in the chat, when only its last messages are loaded.
+        Returns:
+            The verbatim window and the summary, with summary_updated set when it has to be stored.
+        """
+        if self.client is None:
+            return self.window(history)
+
+        clipped = [(role, clip_message(content, self.message_tokens)) for role, content in history]
+        # Position of the summary in the loaded messages
+        folded = min(max(summarized_count - offset, 0), len(clipped))
+        start = self._window_start(clipped, folded, self.token_budget - self.summary_tokens)
+        if start == folded:
+            return CompactedHistory(clipped[start:], summary, summarized_count)
+
+        # Fold ahead of the window, the freed budget absorbs the next turns without another update
+        fold_to = max(start, min(folded + self.batch_messages, len(clipped) - self.min_recent))
+        try:
+            updated = await self._summarize(summary, clipped[folded:fold_to])
+        except Exception as e:
+            logger.warning(f"Chat summary update failed ({e}), older messages are left out of the prompt")
+            return CompactedHistory(clipped[start:], summary, summarized_count)
+
+        logger.debug(f"Folded messages {offset + folded}-{offset + fold_to} of {offset + len(clipped)} into the chat summary")
+        return CompactedHistory(clipped[fold_to:], updated, offset + fold_to, summary_updated=True)
+
+    async def _summarize(self, summary: str, messages: list[tuple[str, str]]) -> str:
+        """Fold the messages into the summary, only the new messages are sent along with it."""
+        lines = "\n".join(f"{speaker(role)}: {content}" for role, content in messages)
+        with STAGE_SECONDS.time("history_summary"):
+            response = await self.client.chat.completions.create(  # type: ignore
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{lines}"},
+                ],
+                max_tokens=self.summary_tokens,
+                temperature=0,
+            )
+        if response.usage is not None:
+            record_usage(self.model, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return clip_message((response.choices[0].message.content or "").strip(), self.summary_tokens)
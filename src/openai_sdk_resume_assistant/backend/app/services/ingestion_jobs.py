@@ -0,0 +1,91 @@
+import asyncio
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from loguru import logger
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import IngestionJob, UploadFilesResponse
+from openai_sdk_resume_assistant.RAG.vector_db import ProgressCallback
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_JOBS_RETAINED = int(os.getenv("INGESTION_JOBS_RETAINED", "500"))
+
+
+class IngestionJobManager:
+    """
+    Runs file ingestion jobs on a worker thread pool so uploads return immediately and the
+    event loop is never blocked by PDF parsing, embedding or chroma writes.
+    Args:
+        max_workers (int): Number of ingestion jobs running at once, further jobs are queued.
+        max_jobs (int): Number of jobs remembered for status requests, the oldest finished ones are dropped.
+    """
+
+    def __init__(self, max_workers: int = INGESTION_WORKERS, max_jobs: int = INGESTION_JOBS_RETAINED):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion")
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self.max_jobs = max_jobs
+
+    def submit(
+        self,
+        user_id: str,
+        files: list[str],
+        run: Callable[[ProgressCallback], UploadFilesResponse],
+        cleanup: Callable[[], None] | None = None,
+    ) -> IngestionJob:
+        """
+        Queue an ingestion job.
+        Args:
+            user_id: Owner of the job, the only user allowed to see its status.
+            files: Names of the files being ingested.
+            run: Function doing the ingestion, called with a progress callback.
+            cleanup: Optional function called once the job has finished, e.g. to remove temp files.
+        Returns:
+            The queued job.
+        """
+        job = IngestionJob(user_id=user_id, files=files)
+        self._jobs[job.id] = job
+        self._drop_old_jobs()
+        self._executor.submit(self._run_job, job, run, cleanup)
+        logger.info(f"Queued ingestion job {job.id} for {len(files)} file(s)")
+        return job
+
+    @staticmethod
+    def _run_job(
+        job: IngestionJob, run: Callable[[ProgressCallback], UploadFilesResponse], cleanup: Callable[[], None] | None
+    ) -> None:
+        def progress(stage: str, count: int) -> None:
+            setattr(job, stage, getattr(job, stage) + count)
+
+        job.status = "running"
+        try:
+            job.result = run(progress)
+            job.errors.extend(job.result.errors)
+            job.status = "completed" if job.result.success else "failed"
+        except Exception as e:
+            logger.exception(f"Ingestion job {job.id} failed")
+            job.errors.append(str(e))
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+            if cleanup:
+                cleanup()
+        logger.info(f"Ingestion job {job.id} {job.status}")
+
+    def _drop_old_jobs(self) -> None:
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+
+    def get(self, job_id: str, user_id: str) -> IngestionJob | None:
+        """Get a job only if it belongs to the user"""
+        job = self._jobs.get(job_id)
+        return job if job and job.user_id == user_id else None
+
+    async def shutdown(self) -> None:
+        """Drop queued jobs and wait for the running ones to finish."""
+        await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+from loguru import logger
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMessage
+from openai_sdk_resume_assistant.backend.app.services.data_access_layer import MongoDAL
+
+# Chat turns waiting to be written, further turns are written directly instead of buffered
+CHAT_WRITE_QUEUE_SIZE = int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "1000"))
+# Turns coalesced into one bulk write
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+# Seconds the writer waits for more turns before writing a batch
+CHAT_WRITE_LINGER = float(os.getenv("CHAT_WRITE_LINGER", "0.02"))
+CHAT_WRITE_MAX_RETRIES = int(os.getenv("CHAT_WRITE_MAX_RETRIES", "3"))
+
+
+class MessageWriter:
+    """
+    Write-behind persistence of chat messages. Routes submit the messages of a turn without waiting,
+    a background task coalesces the queued turns into one bulk write with a single $push per chat.
+    Args:
+        dal (MongoDAL): Data access layer doing the writes.
+        max_pending (int): Turns buffered before submits bypass the queue.
+        batch_size (int): Turns written per bulk write.
+        linger (float): Seconds to wait for more turns before writing.
+        max_retries (int): Retries with backoff of a failed bulk write.
+    """
+
+    def __init__(
+        self,
+        dal: MongoDAL,
+        max_pending: int = CHAT_WRITE_QUEUE_SIZE,
+        batch_size: int = CHAT_WRITE_BATCH_SIZE,
+        linger: float = CHAT_WRITE_LINGER,
+        max_retries: int = CHAT_WRITE_MAX_RETRIES,
+    ):
+        self.dal = dal
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue[tuple[str, list[ChatMessage]]] = asyncio.Queue(maxsize=max_pending)
+        self._task: asyncio.Task | None = None
+        self._direct_writes: set[asyncio.Task] = set()
+        self._closed = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="chat-message-writer")
+
+    def submit(self, chat_id: str, messages: list[ChatMessage]) -> None:
+        """
+        Queue messages to be appended to a chat. Never blocks or awaits, so it is safe in the cleanup
+        of a cancelled stream.
+        Args:
+            chat_id: The chat to append to.
+            messages: The messages, appended in order and atomically.
+        """
+        if not messages:
+            return
+        if not self._closed and self._task is not None:
+            try:
+                self._queue.put_nowait((chat_id, messages))
+                return
+            except asyncio.QueueFull:
+                logger.warning("Chat write queue full, writing the turn directly")
+        task = asyncio.create_task(self._write({chat_id: messages}))
+        self._direct_writes.add(task)
+        task.add_done_callback(self._direct_writes.discard)
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self.linger > 0:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            messages_by_chat: dict[str, list[ChatMessage]] = {}
+            for chat_id, messages in batch:
+                messages_by_chat.setdefault(chat_id, []).extend(messages)
+            try:
+                await self._write(messages_by_chat)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, messages_by_chat: dict[str, list[ChatMessage]]) -> None:
+        # Retrying the whole batch is safe, chats the failed attempt already wrote are skipped
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.dal.add_messages_to_chats(messages_by_chat)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    count = sum(len(messages) for messages in messages_by_chat.values())
+                    logger.error(
+                        f"Dropping {count} chat message(s) of {len(messages_by_chat)} chat(s) after {attempt} retries: {e}"
+                    )
+                    return
+                await asyncio.sleep(0.1 * 2**attempt)
+
+    async def close(self) -> None:
+        """Write the buffered messages and stop the writer."""
+        self._closed = True
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._direct_writes:
+            await asyncio.gather(*self._direct_writes, return_exceptions=True)
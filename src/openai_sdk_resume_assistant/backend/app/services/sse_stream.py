@@ -0,0 +1,167 @@
+"""
+Server-sent events framing of streamed answers. Text deltas are coalesced into frames by size or time,
+agent events (tool calls, retrieval hits, handoffs) are sent as named SSE events in order with the text,
+heartbeat comments keep the connection alive while tools run, and a client disconnect stops the
+upstream generation.
+"""
+
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from openai_sdk_resume_assistant.agent_events import AgentEvent, TextDelta, event_payload
+
+# A frame is sent once this many characters are buffered, 0 sends the deltas as soon as they arrive
+SSE_COALESCE_CHARS = int(os.getenv("SSE_COALESCE_CHARS", "64"))
+# Seconds a buffered delta waits at most for more text
+SSE_COALESCE_INTERVAL = float(os.getenv("SSE_COALESCE_INTERVAL", "0.05"))
+# Seconds without a frame before a heartbeat comment is sent
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "10"))
+# Seconds between client disconnect checks
+SSE_DISCONNECT_POLL_INTERVAL = float(os.getenv("SSE_DISCONNECT_POLL_INTERVAL", "1"))
+
+HEARTBEAT = ": ping\n\n"
+
+
+def sse_frame(data: dict[str, Any]) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+def sse_event(name: str, data: dict[str, Any]) -> str:
+    """A named SSE event, clients without a listener for it ignore it."""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class AnswerStream:
+    """
+    Turns the text deltas of an answer into SSE frames and keeps the full text.
+    Other agent events are sent as named events, after the text received before them.
+    Args:
+        chunks: The text deltas of the answer, or the agent events of the run.
+        is_disconnected: Checks whether the client went away, e.g. Request.is_disconnected.
+        max_chars (int): Buffered characters that trigger a frame.
+        max_delay (float): Seconds a buffered delta waits at most.
+        heartbeat_interval (float): Seconds without a frame before a heartbeat comment.
+        poll_interval (float): Seconds between disconnect checks.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[str] | AsyncIterator[str | AgentEvent],
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+        max_chars: int = SSE_COALESCE_CHARS,
+        max_delay: float = SSE_COALESCE_INTERVAL,
+        heartbeat_interval: float = SSE_HEARTBEAT_INTERVAL,
+        poll_interval: float = SSE_DISCONNECT_POLL_INTERVAL,
+    ):
+        self.chunks = chunks
+        self.is_disconnected = is_disconnected
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.completed = False
+        self.disconnected = False
+        self.frames_sent = 0
+        self._parts: list[str] = []
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._ready: list[str] = []  # Frames of agent events, and of the text before them
+        self._error: Exception | None = None
+        self._wake = asyncio.Event()
+
+    @property
+    def text(self) -> str:
+        """The answer text received so far."""
+        return "".join(self._parts)
+
+    async def _produce(self) -> None:
+        # Deltas are only buffered here, the consumer is woken for the first delta of a frame and once the
+        # frame is full, so a frame costs a couple of wake-ups instead of one per delta
+        try:
+            async for chunk in self.chunks:
+                if isinstance(chunk, TextDelta):
+                    chunk = chunk.text
+                elif not isinstance(chunk, str):
+                    if self._pending:
+                        self._ready.append(sse_frame({"chunk": self._take_pending()}))
+                    self._ready.append(sse_event(chunk.type, event_payload(chunk)))
+                    self._wake.set()
+                    continue
+                self._parts.append(chunk)
+                self._pending.append(chunk)
+                self._pending_chars += len(chunk)
+                if len(self._pending) == 1 or self._pending_chars >= self.max_chars:
+                    self._wake.set()
+        except Exception as e:
+            self._error = e
+        else:
+            self.completed = True
+        self._wake.set()
+
+    def _take_pending(self) -> str:
+        text = "".join(self._pending)
+        self._pending, self._pending_chars = [], 0
+        return text
+
+    async def frames(self) -> AsyncIterator[str]:
+        """
+        Yield the SSE frames of the answer, heartbeats included.
+        Returns early, stopping the upstream generation, when the client disconnects.
+        Raises:
+            Exception: The error of the upstream generation, after the text received before it was sent.
+        """
+        loop = asyncio.get_running_loop()
+        producer = asyncio.create_task(self._produce())
+        flush_at: float | None = None
+        last_sent = loop.time()
+        next_poll = last_sent + self.poll_interval
+        try:
+            while True:
+                deadlines = [last_sent + self.heartbeat_interval]
+                if self.is_disconnected is not None:
+                    deadlines.append(next_poll)
+                if flush_at is not None:
+                    deadlines.append(flush_at)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(min(deadlines) - loop.time(), 0))
+                except TimeoutError:
+                    pass
+                self._wake.clear()
+                now = loop.time()
+                finished = producer.done()
+
+                if self._ready:
+                    ready, self._ready = self._ready, []
+                    for frame in ready:
+                        yield frame
+                    self.frames_sent += len(ready)
+                    last_sent = now
+                    if not self._pending:
+                        flush_at = None
+
+                if self._pending and flush_at is None:
+                    flush_at = now + self.max_delay
+                if self._pending and (finished or self._pending_chars >= self.max_chars or now >= flush_at):  # type: ignore
+                    yield sse_frame({"chunk": self._take_pending()})
+                    self.frames_sent += 1
+                    flush_at, last_sent = None, now
+                elif now >= last_sent + self.heartbeat_interval:
+                    yield HEARTBEAT
+                    last_sent = now
+
+                if finished:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                if self.is_disconnected is not None and now >= next_poll:
+                    next_poll = now + self.poll_interval
+                    if await self.is_disconnected():
+                        self.disconnected = True
+                        return
+        finally:
+            # Stops the agent run (and releases its MCP servers) when the client left or the stream failed
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import queue
+import threading
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+from fastapi import Request
+from loguru import logger
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from openai_sdk_resume_assistant.RAG.document_source import DocumentBuffer, DocumentSource
+
+# Largest uploaded file and largest upload request, checked against Content-Length before reading the body
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+# Seconds an ingestion job waits for the next file of a running upload, so a stalled client does not hold a worker
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", "30"))
+
+
+class UploadError(Exception):
+    """Malformed upload request."""
+
+
+class UploadTooLarge(UploadError):
+    """Upload over UPLOAD_MAX_FILE_BYTES or UPLOAD_MAX_REQUEST_BYTES."""
+
+
+def check_upload_size(request: Request, max_request_bytes: int = UPLOAD_MAX_REQUEST_BYTES) -> None:
+    """Reject a request announcing a body over the limit before any of it is read."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_request_bytes:
+        raise UploadTooLarge(f"Upload of {content_length} bytes exceeds the {max_request_bytes} bytes limit")
+
+
+async def stream_uploaded_files(
+    request: Request,
+    field_name: str = "files",
+    max_file_bytes: int = UPLOAD_MAX_FILE_BYTES,
+    max_request_bytes: int = UPLOAD_MAX_REQUEST_BYTES,
+) -> AsyncIterator[DocumentSource]:
+    """
+    Parse a multipart/form-data body as it is received, yielding each uploaded file once its last byte arrived.
+    Files are buffered in memory, or spilled to a temp file above DOCUMENT_SPOOL_MAX_MEMORY, and the size limits
+    are enforced while reading so an oversized upload is cut off early.
+    Args:
+        request: The upload request.
+        field_name: Form field of the files, other fields are ignored.
+        max_file_bytes: Largest file.
+        max_request_bytes: Largest request body.
+    Raises:
+        UploadTooLarge: A file or the request exceeds its limit.
+        UploadError: The body is not multipart/form-data.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Expected a multipart/form-data body")
+
+    # The parser callbacks only record events, they are handled between the writes of the received chunks
+    events: list[tuple[str, bytes]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    part_headers: dict[bytes, bytes] = {}
+
+    def on_header_end() -> None:
+        part_headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        events.append(("headers", part_headers.get(b"content-disposition", b"")))
+        events.append(("content_type", part_headers.get(b"content-type", b"")))
+        part_headers.clear()
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": lambda: events.append(("begin", b"")),
+            "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+            "on_part_end": lambda: events.append(("end", b"")),
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        },
+    )
+
+    buffer: DocumentBuffer | None = None
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise UploadTooLarge(f"Upload exceeds the {max_request_bytes} bytes limit")
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise UploadError(f"Malformed multipart body: {e}") from e
+            for event, data in events:
+                if event == "begin":
+                    if buffer is not None:
+                        buffer.close()
+                    buffer = None
+                elif event == "headers":
+                    _, options = parse_options_header(data)
+                    filename = options.get(b"filename")
+                    if options.get(b"name") == field_name.encode() and filename:
+                        # Only the base name, the upload must not pick its own path
+                        buffer = DocumentBuffer(Path(filename.decode(errors="replace")).name)
+                elif event == "content_type" and buffer is not None:
+                    buffer.content_type = data.decode(errors="replace") or None
+                elif event == "data" and buffer is not None:
+                    if buffer.size + len(data) > max_file_bytes:
+                        raise UploadTooLarge(f"{buffer.name} exceeds the {max_file_bytes} bytes limit")
+                    # Disk writes, the one spilling the buffer included, run off the event loop
+                    if buffer.on_disk or buffer.size + len(data) > buffer.max_memory:
+                        await asyncio.to_thread(buffer.write, data)
+                    else:
+                        buffer.write(data)
+                elif event == "end" and buffer is not None:
+                    document, buffer = buffer.finish(), None
+                    logger.debug(f"Received {document}")
+                    yield document
+            events.clear()
+        parser.finalize()
+    finally:
+        if buffer is not None:
+            buffer.close()
+
+
+class UploadQueue:
+    """
+    Hands the uploaded files from the request to the ingestion worker thread as they arrive.
+    Iterating it blocks until the next file, ends once the upload is complete and raises the
+    error of an aborted upload.
+    Args:
+        timeout (float): Seconds to wait for the next file before the ingestion fails with an UploadError.
+    """
+
+    _DONE = object()
+
+    def __init__(self, timeout: float = UPLOAD_QUEUE_TIMEOUT):
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue()
+        self._discarded = False
+        self._lock = threading.Lock()
+
+    def put(self, document: DocumentSource) -> None:
+        with self._lock:
+            if self._discarded:
+                document.close()
+                return
+            self._queue.put(document)
+
+    def close(self) -> None:
+        """The upload is complete."""
+        self._queue.put(self._DONE)
+
+    def abort(self, error: Exception) -> None:
+        """The upload failed, the ingestion stops with the error."""
+        self._queue.put(error)
+
+    def __iter__(self) -> Iterator[DocumentSource]:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.timeout)
+            except queue.Empty:
+                raise UploadError(f"No file received for {self.timeout:g} seconds, the upload stalled") from None
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def discard(self) -> None:
+        """Close the files left over by an ingestion that stopped early, and those still arriving."""
+        with self._lock:
+            self._discarded = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                if isinstance(item, DocumentSource):
+                    item.close()
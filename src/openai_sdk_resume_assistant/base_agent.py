@@ -1,13 +1,32 @@
 # type: ignore
-import os
+import time
 from collections.abc import AsyncGenerator
 from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Any
 
-from agents import Agent, Runner
+from agents import Agent, Model, Runner, Usage
 from agents.mcp import MCPServerStdio
 from openai.types.responses import ResponseTextDeltaEvent
 
+from openai_sdk_resume_assistant.agent_events import (
+    AgentEvent,
+    AgentHandoff,
+    RetrievalHits,
+    TextDelta,
+    ToolCallFinished,
+    ToolCallStarted,
+)
+from openai_sdk_resume_assistant.mcp_pool import MCPSessionManager, merge_env_with_params
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS, record_usage
+from openai_sdk_resume_assistant.RAG.context_builder import parse_context_sources
+
+
+def _raw_field(raw_item: Any, key: str) -> Any:
+    """Field of the raw item of a run item, a pydantic model for tool calls and a TypedDict for tool outputs."""
+    if isinstance(raw_item, dict):
+        return raw_item.get(key)
+    return getattr(raw_item, key, None)
+
 
 class AIAgent:
     """
@@ -15,8 +34,10 @@ class AIAgent:
     Args:
         name (str): The name of the agent.
         instructions (str): The instructions for the agent.
-        model (str): The model to use for the agent.
+        model (str | Model): The model name, or a Model instance, to use for the agent.
         mcp_params (List[Dict[str, Any]] | Dict[str, Any]): MCP server parameters.
+        session_manager (MCPSessionManager | None): Pool of long-lived MCP servers to lease from.
+            When the pool serves all the agent's MCP servers no subprocesses are spawned per run.
         **agent_kwargs: Additional keyword arguments passed to the Agent class.
             See agents.Agent class documentation for all available parameters including:
             - handoff_description: Description used when agent is used as handoff
@@ -32,12 +53,19 @@ class AIAgent:
     """
 
     def __init__(
-        self, name: str, instructions: str, model: str, mcp_params: list[dict[str, Any]] | dict[str, Any], **agent_kwargs
+        self,
+        name: str,
+        instructions: str,
+        model: str | Model,
+        mcp_params: list[dict[str, Any]] | dict[str, Any],
+        session_manager: MCPSessionManager | None = None,
+        **agent_kwargs,
     ):
         self.name = name
         self.instructions = instructions
         self.model = model
         self.mcp_params_list = self._create_mcp_params_list(mcp_params)
+        self.session_manager = session_manager
         self.agent_kwargs = agent_kwargs
 
     # Internal converter for the params
@@ -53,10 +81,18 @@ class AIAgent:
     @staticmethod
     def _merge_env_with_params(params: dict[str, Any]) -> dict[str, Any]:
         """Merge os.environ as base with any extra env from params."""
-        return {**params, "env": {**os.environ, **params.get("env", {})}}
+        return merge_env_with_params(params)
 
     @asynccontextmanager
     async def _get_mcp_servers(self):  # -> List[MCPServerStdio]:  # type:ignore
+        # Reuse already initialized servers from the pool when it is running
+        start = time.perf_counter()
+        if self.session_manager is not None and self.session_manager.serves(self.mcp_params_list):
+            async with self.session_manager.lease(self.mcp_params_list) as pooled_servers:
+                STAGE_SECONDS.observe(time.perf_counter() - start, "mcp_lease")
+                yield pooled_servers
+            return
+
         async with AsyncExitStack() as stack:
             tool_mcp_servers = [
                 await stack.enter_async_context(
@@ -64,6 +100,7 @@ class AIAgent:
                 )  # type:ignore
                 for params in self.mcp_params_list
             ]
+            STAGE_SECONDS.observe(time.perf_counter() - start, "mcp_startup")
             yield tool_mcp_servers
 
     async def _create_agent(self, mcp_servers_list: list[MCPServerStdio] | None) -> Agent:
@@ -79,25 +116,91 @@ class AIAgent:
         )
         return agent
 
-    async def run_agent_with_mcp(self, user_input: str):
+    async def run_agent_with_mcp(self, user_input: str, context: Any = None):
         """
         Create agents with MCP servers and run with the provided user input
+        Args:
+            user_input: The user input.
+            context: Run context passed to the tools, e.g. the collection to retrieve from.
         """
         async with self._get_mcp_servers() as servers:
             active_agent = await self._create_agent(servers)
-            response = await Runner.run(active_agent, input=user_input)
+            with STAGE_SECONDS.time("agent_run"):
+                response = await Runner.run(active_agent, input=user_input, context=context)
+            self._record_usage(response.context_wrapper.usage)
 
         return response.final_output
 
+    @property
+    def model_name(self) -> str:
+        """Name of the model, for the usage metrics and cache keys."""
+        if isinstance(self.model, str):
+            return self.model
+        return str(getattr(self.model, "model", type(self.model).__name__))
+
+    def _record_usage(self, usage: Usage) -> None:
+        record_usage(self.model_name, usage.input_tokens, usage.output_tokens, requests=usage.requests)
+
     # Add streaming support as per the agents sdk docs
-    async def run_agent_with_mcp_stream(self, user_input: str) -> AsyncGenerator[str, None]:
+    async def run_agent_with_mcp_stream(self, user_input: str, context: Any = None) -> AsyncGenerator[str, None]:
         """
         Stream agent responses as they are generated
         """
+        async for event in self.run_agent_with_mcp_events(user_input, context=context):
+            if isinstance(event, TextDelta):
+                yield event.text
+
+    async def run_agent_with_mcp_events(self, user_input: str, context: Any = None) -> AsyncGenerator[AgentEvent, None]:
+        """
+        Stream the typed events of an agent run: text deltas, tool calls with their duration, the documents
+        retrieved by the RAG tool and handoffs between agents, timed from the start of the run.
+        Args:
+            user_input: The user input.
+            context: Run context passed to the tools, e.g. the collection to retrieve from.
+        """
+        start = time.perf_counter()
+        tool_calls: dict[str, tuple[str, float]] = {}  # call_id -> (tool name, start)
+        first_token = True
+
+        def elapsed_ms() -> float:
+            return (time.perf_counter() - start) * 1000
+
         async with self._get_mcp_servers() as servers:
             active_agent = await self._create_agent(servers)
-            result = Runner.run_streamed(active_agent, input=user_input)
+            result = Runner.run_streamed(active_agent, input=user_input, context=context)
 
-            async for event in result.stream_events():
-                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-                    yield event.data.delta
+            try:
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event":
+                        if isinstance(event.data, ResponseTextDeltaEvent):
+                            if first_token:
+                                # Includes leasing the MCP servers and the tool calls before the answer
+                                STAGE_SECONDS.observe(time.perf_counter() - start, "first_token")
+                                first_token = False
+                            yield TextDelta(event.data.delta)
+                    elif event.type == "run_item_stream_event":
+                        if event.name == "tool_called":
+                            raw_item = event.item.raw_item
+                            # Hosted MCP calls have no call_id, fall back to their item id
+                            call_id = _raw_field(raw_item, "call_id") or _raw_field(raw_item, "id") or ""
+                            name = _raw_field(raw_item, "name") or ""
+                            tool_calls[call_id] = (name, time.perf_counter())
+                            arguments = _raw_field(raw_item, "arguments") or ""
+                            yield ToolCallStarted(call_id, name, arguments, elapsed_ms())
+                        elif event.name == "tool_output":
+                            call_id = _raw_field(event.item.raw_item, "call_id") or ""
+                            name, called_at = tool_calls.pop(call_id, ("", time.perf_counter()))
+                            yield ToolCallFinished(call_id, name, (time.perf_counter() - called_at) * 1000, elapsed_ms())
+                            # Only the in-process RAG tool returns the built context, the MCP RAG agent answers in prose
+                            if isinstance(event.item.output, str) and (hits := parse_context_sources(event.item.output)):
+                                yield RetrievalHits(call_id, hits, elapsed_ms())
+                        elif event.name == "handoff_occured":
+                            yield AgentHandoff(event.item.source_agent.name, event.item.target_agent.name, elapsed_ms())
+            finally:
+                # The consumer stopped early (client disconnected), stop the model and tool calls too
+                if not result.is_complete:
+                    result.cancel()
+                else:
+                    STAGE_SECONDS.observe(time.perf_counter() - start, "agent_run")
+                # Tokens of an interrupted run are billed too
+                self._record_usage(result.context_wrapper.usage)
@@ -1,5 +1,6 @@
 import os
 
+import httpx
 from agents import set_default_openai_api, set_default_openai_client, set_tracing_disabled
 from azure.identity import InteractiveBrowserCredential, get_bearer_token_provider
 from dotenv import load_dotenv
@@ -8,6 +9,20 @@ from openai import AsyncAzureOpenAI, AzureOpenAI
 
 load_dotenv(override=True)
 
+# Keep-alive connection pool shared by every request made through one client
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+
+def http_client_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
 """
 If using Azure DefaultAzureCredential,
 Set up Azure CLI (add to system path)
@@ -27,6 +42,7 @@ class AzureAIClient(AzureOpenAI):
             raise ValueError("Azure OpenAI endpoint is not set. Please set the AZURE_OPENAI_ENDPOINT environment variable.")
 
         self.api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        self.async_client: AsyncAzureOpenAI | None = None
         if not self.api_key:
             self.credential = credential or InteractiveBrowserCredential()
             self.token_provider = self._get_token_provider
@@ -35,12 +51,14 @@ class AzureAIClient(AzureOpenAI):
                 azure_endpoint=self.azure_endpoint,
                 azure_ad_token_provider=self.token_provider,
                 api_version=self.api_version,
+                http_client=httpx.Client(limits=http_client_limits()),
             )
         else:
             super().__init__(
                 azure_endpoint=self.azure_endpoint,
                 api_key=self.api_key,
                 api_version=self.api_version,
+                http_client=httpx.Client(limits=http_client_limits()),
             )
 
     @property
@@ -59,14 +77,25 @@ class AzureAIClient(AzureOpenAI):
         # make available the LLM
         load_dotenv(override=True)
 
-        if self.api_key:
+        # Reuse the async client, and its connection pool, when called again
+        if self.async_client is not None:
+            openai_client = self.async_client
+        elif self.api_key:
             openai_client = AsyncAzureOpenAI(
-                azure_endpoint=self.azure_endpoint, api_version=self.api_version, api_key=self.api_key
+                azure_endpoint=self.azure_endpoint,
+                api_version=self.api_version,
+                api_key=self.api_key,
+                http_client=httpx.AsyncClient(limits=http_client_limits()),
             )
         else:
             openai_client = AsyncAzureOpenAI(
-                azure_endpoint=self.azure_endpoint, api_version=self.api_version, azure_ad_token_provider=self.token_provider
+                azure_endpoint=self.azure_endpoint,
+                api_version=self.api_version,
+                azure_ad_token_provider=self.token_provider,
+                http_client=httpx.AsyncClient(limits=http_client_limits()),
             )
+        self.async_client = openai_client
+
         # Set default client and configs
         set_default_openai_client(openai_client)
         set_default_openai_api("chat_completions")
@@ -74,6 +103,12 @@ class AzureAIClient(AzureOpenAI):
 
         return openai_client
 
+    async def aclose(self) -> None:
+        """Close the connection pools of the sync and async clients."""
+        self.close()
+        if self.async_client is not None:
+            await self.async_client.close()
+
 
 class AzureAIChatModel(AzureAIClient):
     def __init__(self, model: str, *args, **kwargs):
@@ -0,0 +1,220 @@
+"""
+Long-lived pool of MCP stdio servers that agents lease per run instead of
+spawning a fresh subprocess for every request.
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any
+
+from agents.mcp import MCPServerStdio
+from loguru import logger
+
+from openai_sdk_resume_assistant.metrics import STAGE_SECONDS
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+MCP_LEASE_TIMEOUT = float(os.getenv("MCP_LEASE_TIMEOUT", "60"))
+
+MAX_RESTART_BACKOFF = 30.0
+
+
+def merge_env_with_params(params: dict[str, Any]) -> dict[str, Any]:
+    """Merge os.environ as base with any extra env from params."""
+    return {**params, "env": {**os.environ, **params.get("env", {})}}
+
+
+def mcp_server_key(params: dict[str, Any]) -> str:
+    """Identify an MCP server by the command line used to launch it."""
+    return " ".join([params["command"], *params.get("args", [])])
+
+
+class PooledMCPServer:
+    """
+    A single MCP server subprocess kept alive by its own owner task.
+    The stdio transport has to be closed from the task that opened it, so the owner task
+    enters the server context, waits for a restart or stop signal and then exits it again.
+    """
+
+    def __init__(self, params: dict[str, Any], client_session_timeout_seconds: float = 60):
+        self.key = mcp_server_key(params)
+        self.params = merge_env_with_params(params)
+        self.client_session_timeout_seconds = client_session_timeout_seconds
+        self.server: MCPServerStdio | None = None
+        self.last_checked = 0.0
+        self.restarts = 0
+        self._ready = asyncio.Event()
+        self._restart = asyncio.Event()
+        self._stopped = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"mcp-pool: {self.key}")
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while not self._stopped:
+            self._restart.clear()
+            started = time.perf_counter()
+            try:
+                async with MCPServerStdio(
+                    params=self.params,  # type: ignore
+                    cache_tools_list=True,
+                    client_session_timeout_seconds=self.client_session_timeout_seconds,
+                ) as server:
+                    self.server = server
+                    self.last_checked = time.monotonic()
+                    STAGE_SECONDS.observe(time.perf_counter() - started, "mcp_startup")
+                    self._ready.set()
+                    backoff = 1.0
+                    logger.info(f"MCP server ready: {self.key}")
+                    await self._restart.wait()
+            except Exception as e:
+                logger.error(f"MCP server '{self.key}' failed: {e}. Restarting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+            finally:
+                self.server = None
+                self._ready.clear()
+
+            if not self._stopped:
+                self.restarts += 1
+
+    def restart(self) -> None:
+        """Ask the owner task to tear down the current subprocess and start a new one."""
+        self._ready.clear()
+        self._restart.set()
+
+    async def ensure_healthy(self, health_check_interval: float, timeout: float) -> MCPServerStdio:
+        """Wait until the server is up and ping it when the last check is older than the interval."""
+        for _ in range(2):
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            server = self.server
+            if server is None:
+                continue
+            if time.monotonic() - self.last_checked < health_check_interval:
+                return server
+            try:
+                await asyncio.wait_for(server.session.list_tools(), timeout=timeout)  # type: ignore
+                self.last_checked = time.monotonic()
+                return server
+            except Exception as e:
+                logger.warning(f"MCP server '{self.key}' failed health check: {e}")
+                self.restart()
+
+        raise RuntimeError(f"MCP server '{self.key}' is not available")
+
+    async def stop(self, timeout: float = 10) -> None:
+        self._stopped = True
+        self._restart.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except (TimeoutError, asyncio.CancelledError):
+            self._task.cancel()
+
+
+class MCPServerPool:
+    """A fixed number of identical MCP servers handed out one request at a time."""
+
+    def __init__(self, params: dict[str, Any], size: int, client_session_timeout_seconds: float = 60):
+        if size < 1:
+            raise ValueError("MCP pool size must be at least 1.")
+        self.key = mcp_server_key(params)
+        self.members = [PooledMCPServer(params, client_session_timeout_seconds) for _ in range(size)]
+        self._idle: asyncio.Queue[PooledMCPServer] = asyncio.Queue()
+
+    def start(self) -> None:
+        for member in self.members:
+            member.start()
+            self._idle.put_nowait(member)
+
+    @asynccontextmanager
+    async def lease(self, health_check_interval: float, timeout: float) -> AsyncIterator[MCPServerStdio]:
+        member = await asyncio.wait_for(self._idle.get(), timeout=timeout)
+        try:
+            server = await member.ensure_healthy(health_check_interval, timeout)
+            try:
+                yield server
+            except Exception:
+                # The failure may have come from the server itself, check it before the next lease
+                member.last_checked = 0.0
+                raise
+        finally:
+            self._idle.put_nowait(member)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(member.stop() for member in self.members))
+
+
+class MCPSessionManager:
+    """
+    Owns one MCPServerPool per MCP server command and leases initialized servers to agent runs.
+    Args:
+        pool_size (int): Default number of subprocesses kept per server.
+        client_session_timeout_seconds (float): Read timeout for each MCP client session.
+        health_check_interval (float): Seconds after which a leased server is pinged before use.
+        lease_timeout (float): Seconds to wait for a free, healthy server before giving up.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = MCP_POOL_SIZE,
+        client_session_timeout_seconds: float = 60,
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+        lease_timeout: float = MCP_LEASE_TIMEOUT,
+    ):
+        self.pool_size = pool_size
+        self.client_session_timeout_seconds = client_session_timeout_seconds
+        self.health_check_interval = health_check_interval
+        self.lease_timeout = lease_timeout
+        self._pools: dict[str, MCPServerPool] = {}
+
+    def add_server(self, params: dict[str, Any], pool_size: int | None = None) -> None:
+        """Start a pool for the server unless one is already running. Must be called inside the event loop."""
+        key = mcp_server_key(params)
+        if key in self._pools:
+            return
+        pool = MCPServerPool(params, pool_size or self.pool_size, self.client_session_timeout_seconds)
+        pool.start()
+        self._pools[key] = pool
+        logger.info(f"Started MCP server pool '{key}' with {len(pool.members)} server(s)")
+
+    def serves(self, mcp_params_list: list[dict[str, Any]]) -> bool:
+        """Whether every server in the list has a running pool."""
+        return all(mcp_server_key(params) in self._pools for params in mcp_params_list)
+
+    @asynccontextmanager
+    async def lease(self, mcp_params_list: list[dict[str, Any]]) -> AsyncIterator[list[MCPServerStdio]]:
+        """Lease one server from each pool for the duration of an agent run."""
+        keys = [mcp_server_key(params) for params in mcp_params_list]
+        leased: dict[str, MCPServerStdio] = {}
+        async with AsyncExitStack() as stack:
+            # Always acquire in the same order so concurrent runs cannot deadlock on each other
+            for key in sorted(set(keys)):
+                leased[key] = await stack.enter_async_context(
+                    self._pools[key].lease(self.health_check_interval, self.lease_timeout)
+                )
+            yield [leased[key] for key in keys]
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            key: {
+                "size": len(pool.members),
+                "ready": sum(member.server is not None for member in pool.members),
+                "restarts": sum(member.restarts for member in pool.members),
+            }
+            for key, pool in self._pools.items()
+        }
+
+    async def close(self) -> None:
+        await asyncio.gather(*(pool.close() for pool in self._pools.values()))
+        self._pools.clear()
+
+
+# Shared manager started and stopped by the FastAPI lifespan
+mcp_session_manager = MCPSessionManager()
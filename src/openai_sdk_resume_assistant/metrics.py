@@ -0,0 +1,179 @@
+"""
+In-process metrics rendered in the Prometheus text format: latency histograms of the request stages,
+token and cost counters per model and cache hit ratios. Recording is a lock and a few additions,
+so it stays on the hot path, rendering only happens when /metrics is scraped.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from typing import Any
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").strip().lower() in {"1", "true", "on", "yes"}
+# USD per million input and output tokens by model, merged over the defaults below
+MODEL_PRICES: dict[str, list[float]] = {
+    "gpt-4o": [2.50, 10.00],
+    "gpt-4o-mini": [0.15, 0.60],
+    "text-embedding-ada-002": [0.10, 0.0],
+    "text-embedding-3-small": [0.02, 0.0],
+    "text-embedding-3-large": [0.13, 0.0],
+} | json.loads(os.getenv("MODEL_PRICES", "{}"))
+
+# Seconds, from cache hits and local calls up to whole agent runs
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = STAGE_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: observations per bucket (the last one is +Inf), count and sum
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the seconds spent in the block, also when it raises."""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[1] if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series_list = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for labels, buckets, count, total in series_list:
+            cumulative = 0
+            for bound, observations in zip((*self.buckets, "+Inf"), buckets, strict=True):
+                cumulative += observations
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, f'le="{bound}"')} {cumulative}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+
+
+class _Timer:
+    # A plain class instead of @contextmanager, which costs a generator per block
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+# Stages: mcp_startup, mcp_lease, embedding, chroma_query, first_token, agent_run, history_summary, mongo_write
+STAGE_SECONDS = Histogram("resume_assistant_stage_seconds", "Latency of the request stages.", ("stage",))
+LLM_TOKENS = Counter("resume_assistant_llm_tokens_total", "Tokens used by model and kind (input, output).", ("model", "kind"))
+LLM_COST = Counter("resume_assistant_llm_cost_usd_total", "Estimated cost in USD by model, see MODEL_PRICES.", ("model",))
+LLM_REQUESTS = Counter("resume_assistant_llm_requests_total", "Model requests by model.", ("model",))
+
+
+def record_usage(model: str, input_tokens: int, output_tokens: int = 0, requests: int = 1) -> None:
+    """Count the tokens of model requests and their estimated cost."""
+    if not METRICS_ENABLED:
+        return
+    LLM_REQUESTS.inc(requests, model)
+    LLM_TOKENS.inc(input_tokens, model, "input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, model, "output")
+    if (prices := MODEL_PRICES.get(model)) is not None:
+        LLM_COST.inc((input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000, model)
+
+
+def _cache_metrics(cache_stats: dict[str, dict[str, Any]]) -> Iterator[str]:
+    """Hits, misses and hit ratio of each cache from its stats(), hits of all tiers (memory, disk, similar) summed."""
+    names = ("cache",)
+    yield "# HELP resume_assistant_cache_hits_total Cache lookups answered by the cache."
+    yield "# TYPE resume_assistant_cache_hits_total counter"
+    for cache, stats in cache_stats.items():
+        hits = sum(value for key, value in stats.items() if key == "hits" or key.endswith("_hits"))
+        yield f"resume_assistant_cache_hits_total{_labels(names, (cache,))} {hits}"
+    yield "# HELP resume_assistant_cache_misses_total Cache lookups missed."
+    yield "# TYPE resume_assistant_cache_misses_total counter"
+    for cache, stats in cache_stats.items():
+        yield f"resume_assistant_cache_misses_total{_labels(names, (cache,))} {stats['misses']}"
+    yield "# HELP resume_assistant_cache_hit_ratio Share of the cache lookups answered by the cache."
+    yield "# TYPE resume_assistant_cache_hit_ratio gauge"
+    for cache, stats in cache_stats.items():
+        yield f"resume_assistant_cache_hit_ratio{_labels(names, (cache,))} {stats['hit_ratio']}"
+
+
+def render_metrics(
+    cache_stats: dict[str, dict[str, Any]] | None = None, collectors: list[Callable[[], Iterator[str]]] | None = None
+) -> str:
+    """
+    The metrics in the Prometheus text format.
+    Args:
+        cache_stats: The stats() of each cache by name, rendered as hits, misses and hit ratio.
+        collectors: Extra functions yielding lines of the text format.
+    """
+    lines: list[str] = []
+    for metric in (STAGE_SECONDS, LLM_TOKENS, LLM_COST, LLM_REQUESTS):
+        lines.extend(metric.render())
+    if cache_stats:
+        lines.extend(_cache_metrics(cache_stats))
+    for collector in collectors or []:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
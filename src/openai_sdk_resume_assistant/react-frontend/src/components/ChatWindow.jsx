@@ -9,7 +9,7 @@ import '../styles/ChatPage.css';
 const ChatWindow = ({ chatId }) => {
   const navigate = useNavigate();
   // const { messages, loading, streaming,error, sendChat, clearChat, loadChatHistory} = useChat(chatId);
-  const { messages, loading, streaming,error, sendChat, loadChatHistory} = useChat(chatId);
+  const { messages, loading, streaming,error, progress, sendChat, loadChatHistory} = useChat(chatId);
 
   useEffect(() => {
     // If no chatId, redirect to chat list
@@ -33,7 +33,7 @@ const ChatWindow = ({ chatId }) => {
         </button>
       </div>
       <ChatMessages messages={messages} loading={loading} streaming={streaming} />
-      <StatusMessage loading={loading} error={error} />
+      <StatusMessage loading={loading} error={error} progress={progress} />
       {/* <ChatInput onSend={sendChat} onClear={clearChat} disabled={loading || streaming} /> */}
       <ChatInput onSend={sendChat} disabled={loading || streaming} />
     </div>
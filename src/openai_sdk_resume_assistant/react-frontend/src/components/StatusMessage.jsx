@@ -1,7 +1,8 @@
 import React from 'react';
 
-const StatusMessage = ({ loading, error }) => {
+const StatusMessage = ({ loading, error, progress }) => {
   if (error) return <div className="error">{error}</div>;
+  if (progress) return <div className="status">{progress}</div>;
   return null;
 };
 
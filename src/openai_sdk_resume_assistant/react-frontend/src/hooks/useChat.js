@@ -7,6 +7,7 @@ export const useChat = (chatId) => {
   const [loading, setLoading] = useState(false);
   const [streaming, setStreaming] = useState(false); // State for streaming
   const [error, setError] = useState(null);
+  const [progress, setProgress] = useState(null); // What the agent is doing, from the stream events
 
   const loadChatHistory = useCallback(async (id) => {
     if (!id) return;
@@ -64,13 +65,7 @@ export const useChat = (chatId) => {
     //   return next;
     // });
 
-    // Build chat history for context BEFORE adding new message
-    const chatHistory = messages.map(msg => ({
-      role: msg.isUser ? 'user' : 'assistant',
-      content: msg.text
-    }));
-
-    console.log('[DEBUG] Sending chat history:', chatHistory);
+    // Chat history is loaded by the backend from the stored chat, only the question is sent
 
     // Add user message (removed persist call)
     setMessages(prev => [...prev, { text: trimmed, isUser: true }]);
@@ -82,14 +77,15 @@ export const useChat = (chatId) => {
     setLoading(true);
     setStreaming(true);
     setError(null);
+    setProgress(null);
 
     await sendMessageStream(
       trimmed,
       chatId,
       // onChunk: Append text to the last message
-      chatHistory,
       (chunk) => {
         setLoading(false); // Hide loading dots once streaming starts
+        setProgress(null);
         setMessages(prev => {
           const updated = [...prev];
           const lastIndex = updated.length - 1;
@@ -104,6 +100,7 @@ export const useChat = (chatId) => {
       () => {
         setLoading(false);
         setStreaming(false);
+        setProgress(null);
         // setMessages(prev => {
         //   persist(prev);
         //   return prev;
@@ -114,8 +111,22 @@ export const useChat = (chatId) => {
         setError('Error: ' + errorMsg);
         setLoading(false);
         setStreaming(false);
+        setProgress(null);
         // Remove the empty assistant message
         setMessages(prev => prev.slice(0, -1));
+      },
+      // onEvent: Show the tool calls and retrieved documents while the answer is prepared
+      (name, data) => {
+        if (name === 'tool_call_started') {
+          setProgress(`Running ${data.name}...`);
+        } else if (name === 'tool_call_finished') {
+          setProgress(`${data.name} finished in ${Math.round(data.duration_ms)} ms`);
+        } else if (name === 'retrieval_hits') {
+          const sources = [...new Set(data.hits.map(hit => `${hit.source} (p. ${hit.page})`))];
+          setProgress(`Found ${data.hits.length} document(s): ${sources.join(', ')}`);
+        } else if (name === 'agent_handoff') {
+          setProgress(`Handed off to ${data.to_agent}`);
+        }
       }
     );
 
@@ -127,6 +138,7 @@ export const useChat = (chatId) => {
     loading, 
     streaming, 
     error, 
+    progress, 
     sendChat, 
     loadChatHistory 
   };
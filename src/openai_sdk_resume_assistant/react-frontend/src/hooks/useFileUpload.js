@@ -1,18 +1,37 @@
 import { useState } from 'react';
-import { uploadFiles } from '../services/api';
+import { getUploadJob, uploadFiles } from '../services/api';
+
+const JOB_POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
 export const useFileUpload = () => {
     const [uploading, setUploading] = useState(false);
     const [error, setError] = useState(null);
     const [uploadResult, setUploadResult] = useState(null);
+    const [progress, setProgress] = useState(null);
 
     const upload = async (files) => {
         setUploading(true);
         setError(null);
         setUploadResult(null);
+        setProgress(null);
 
         try {
-            const result = await uploadFiles(files);
+            // The upload returns a job id right away, poll the job until ingestion has finished
+            const { job_id: jobId } = await uploadFiles(files);
+            let job = await getUploadJob(jobId);
+            while (job.status === 'queued' || job.status === 'running') {
+                setProgress(job);
+                await sleep(JOB_POLL_INTERVAL_MS);
+                job = await getUploadJob(jobId);
+            }
+            setProgress(job);
+
+            if (job.status === 'failed') {
+                throw new Error(job.errors.join(', ') || 'Error processing uploaded files.');
+            }
+            const result = job.result;
             setUploadResult(result);
             return result;
         } catch (err) {
@@ -27,6 +46,7 @@ export const useFileUpload = () => {
     const reset = () => {
         setError(null);
         setUploadResult(null);
+        setProgress(null);
         setUploading(false);
     };
 
@@ -35,6 +55,7 @@ export const useFileUpload = () => {
         uploading,
         error,
         uploadResult,
+        progress,
         reset,
     };
 };
\ No newline at end of file
@@ -1,10 +1,11 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { createChat, getAllChats, deleteChatMemory } from '../services/api';
+import { createChat, getChatSummaries, deleteChatMemory } from '../services/api';
 import '../styles/ChatListPage.css';
 
 const ChatListPage = () => {
   const [chats, setChats] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [newChatName, setNewChatName] = useState('');
   const [loading, setLoading] = useState(false);
   const [deleting, setDeleting] = useState(null);
@@ -15,11 +16,12 @@ const ChatListPage = () => {
     loadChats();
   }, []);
 
-  const loadChats = async () => {
+  const loadChats = async (cursor = null) => {
     try {
       setLoading(true);
-      const allChats = await getAllChats();
-      setChats(allChats);
+      const page = await getChatSummaries(cursor);
+      setChats(prev => (cursor ? [...prev, ...page.chats] : page.chats));
+      setNextCursor(page.next_cursor);
     } catch (err) {
       setError('Failed to load chats');
     } finally {
@@ -123,7 +125,7 @@ const ChatListPage = () => {
                 </button>
                 <h3>{chat.chat_name}</h3>
                 <p className="chat-info">
-                  {chat.chat_messages.length} message{chat.chat_messages.length !== 1 ? 's' : ''}
+                  {chat.message_count} message{chat.message_count !== 1 ? 's' : ''}
                 </p>
                 {chat.created_at && (
                   <p className="chat-date">
@@ -133,6 +135,12 @@ const ChatListPage = () => {
               </div>
             ))}
           </div>
+
+          {!loading && nextCursor && (
+            <button className="load-more-button" onClick={() => loadChats(nextCursor)}>
+              Load more
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -9,7 +9,7 @@ const UploadPage = () => {
   const [activeTab, setActiveTab] = useState('upload'); // 'upload' or 'database'
   const [refreshTrigger, setRefreshTrigger] = useState(0);
 
-  const { upload, uploading, error, uploadResult, reset } = useFileUpload();
+  const { upload, uploading, error, uploadResult, progress, reset } = useFileUpload();
   const { collectionItems, loading, error: listError, refetch } = useListCollectionItems(refreshTrigger);
 
   const handleFileSelect = (e) => {
@@ -30,7 +30,10 @@ const UploadPage = () => {
     try {
       const result = await upload(selectedFiles);
       // Create success message with details
-      const successMsg = `Successfully uploaded ${result.pdf_count} PDF(s) and ${result.text_count} text file(s)!`;
+      let successMsg = `Successfully uploaded ${result.pdf_count} PDF(s) and ${result.text_count} other document(s)!`;
+      if (result.unchanged_files > 0) {
+        successMsg += ` ${result.unchanged_files} unchanged file(s) skipped.`;
+      }
       
       // Add any errors or warnings if they exist
       if (result.errors && result.errors.length > 0) {
@@ -92,12 +95,12 @@ return (
                 className="file-input"
                 multiple
                 onChange={handleFileSelect}
-                accept=".pdf,.txt"
+                accept=".pdf,.txt,.md,.markdown,.html,.htm,.docx,.json"
               />
               <label htmlFor="file-input" className="file-label">
                 <div className="upload-icon">📁</div>
                 <span>Click to select files or drag and drop</span>
-                <span className="file-types">PDF, TXT</span>
+                <span className="file-types">PDF, TXT, Markdown, HTML, DOCX, JSON Resume</span>
               </label>
             </div>
 
@@ -129,7 +132,11 @@ return (
               onClick={handleUpload}
               disabled={uploading || selectedFiles.length === 0}
             >
-              {uploading ? 'Uploading...' : 'Upload Files'}
+              {uploading
+                ? progress
+                  ? `Processing... ${progress.pages_parsed} pages parsed, ${progress.chunks_embedded}/${progress.chunks_total} chunks embedded`
+                  : 'Uploading...'
+                : 'Upload Files'}
             </button>
 
             {message && (
@@ -168,7 +175,7 @@ return (
               <div className="database-info">
                 <div className="stats-container">
                   <div className="stat-card">
-                    <div className="stat-value">{collectionItems.files?.length || 0}</div>
+                    <div className="stat-value">{collectionItems.files_count ?? collectionItems.files?.length ?? 0}</div>
                     <div className="stat-label">Total Documents</div>
                   </div>
                 </div>
@@ -183,7 +190,7 @@ return (
                           <div className="file-details">
                             <div className="file-name">{file.name}</div>
                             <div className="file-meta">
-                              {file.page_count} chunk{file.page_count !== 1 ? 's' : ''}
+                              {file.chunk_count ?? file.page_count} chunk{(file.chunk_count ?? file.page_count) !== 1 ? 's' : ''}
                               {file.source && (
                                 <span className="file-source"> • {file.source}</span>
                               )}
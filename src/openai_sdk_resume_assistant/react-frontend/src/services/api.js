@@ -17,9 +17,11 @@ export const createChat = async (chatName) => {
     return response.data;
 };
 
-// Get all chats
-export const getAllChats = async () => {
-    const response = await api.get('/api/chat/all_chats');
+// Get a page of chat summaries (name, date and message count), pass next_cursor for the next page
+export const getChatSummaries = async (cursor = null) => {
+    const response = await api.get('/api/chat/chats', {
+        params: cursor ? { cursor } : {}
+    });
     return response.data;
 };
 
@@ -40,7 +42,8 @@ export const sendMessage = async(message) => {
 };
 
 // New function to send message and receive streaming response
-export const sendMessageStream = async(message, chatId, chatHistory, onChunk, onComplete, onError) => {
+// onEvent receives the named agent events: tool_call_started, tool_call_finished, retrieval_hits, agent_handoff
+export const sendMessageStream = async(message, chatId, onChunk, onComplete, onError, onEvent) => {
     try {
         // Get the token from localStorage
         const token = localStorage.getItem('access_token');
@@ -61,8 +64,7 @@ export const sendMessageStream = async(message, chatId, chatHistory, onChunk, on
             headers: headers,
             body: JSON.stringify({ 
                 question: message, 
-                chat_id: chatId,
-                chat_history: chatHistory || []
+                chat_id: chatId
             }),
         });
         if (!response.ok) {
@@ -70,16 +72,28 @@ export const sendMessageStream = async(message, chatId, chatHistory, onChunk, on
         }
         const reader = response.body.getReader();
         const decoder = new TextDecoder('utf-8');
+        let buffer = '';
+        let eventName = null;
 
         while (true) { // Read the stream until done 
             const { done, value } = await reader.read();
             if (done) break;
 
-            const chunk = decoder.decode(value);
-            const lines = chunk.split('\n');
+            // A frame can be split across reads, keep the incomplete last line for the next read
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
 
             for (const line of lines) {
-                if (line.startsWith('data: ')) {
+                if (line.startsWith('event: ')) {
+                    eventName = line.slice(7);
+                } else if (line === '') {
+                    eventName = null;
+                } else if (line.startsWith('data: ') && eventName) {
+                    if (onEvent) {
+                        onEvent(eventName, JSON.parse(line.slice(6)));
+                    }
+                } else if (line.startsWith('data: ')) {
                     const data = JSON.parse(line.slice(6));
                     if (data.error) {
                         onError(data.error);
@@ -116,6 +130,12 @@ export const uploadFiles = async(files) => {
     return response.data;
 }
 
+// Get the status and progress of a background upload (ingestion) job
+export const getUploadJob = async(jobId) => {
+    const response = await api.get(`/api/chat/upload_jobs/${jobId}`);
+    return response.data;
+}
+
 export const listCollectionItems = async() => {
     const response = await api.get('/api/chat/list_collection_items');
     return response.data;
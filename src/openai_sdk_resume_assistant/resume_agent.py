@@ -1,6 +1,10 @@
+import os
+
 from openai_sdk_resume_assistant.base_agent import AIAgent
 from openai_sdk_resume_assistant.client import AzureAIClient
 from openai_sdk_resume_assistant.mcp_params import playwright_params, rag_agent_params
+from openai_sdk_resume_assistant.mcp_pool import mcp_session_manager
+from openai_sdk_resume_assistant.RAG.rag_agent import RAGTool, create_rag_function_tool
 
 NAME = "Mohamed Ilyan"
 
@@ -18,9 +22,40 @@ Be professional and engaging, as if talking to a potential client or future empl
 who came across the resume or profile.
 """  # TODO: To be added with new tools to record unknown questions and send emails
 
-mcp_params_list = [playwright_params, rag_agent_params]
+# "direct" retrieves in-process through a native tool, "mcp" goes through the RAG agent MCP server
+RAG_MODE = os.getenv("RAG_MODE", "direct").strip().lower()
+
+direct_mcp_params_list = [playwright_params]
+rag_server_mcp_params_list = [playwright_params, rag_agent_params]
+mcp_params_list = rag_server_mcp_params_list if RAG_MODE == "mcp" else direct_mcp_params_list
+
+
+def create_resume_agent(rag_tool: RAGTool | None = None) -> AIAgent:
+    """
+    Create the resume agent. With a rag_tool the retrieval is registered as a native function tool,
+    otherwise it is served by the RAG agent MCP server.
+    """
+    if rag_tool is None:
+        return AIAgent(
+            name="ResumeAgent",
+            instructions=RESUME_AGENT_INSTRUCTIONS,
+            model="gpt-4o",
+            mcp_params=rag_server_mcp_params_list,
+            session_manager=mcp_session_manager,
+        )
 
-resume_agent = AIAgent(name="ResumeAgent", instructions=RESUME_AGENT_INSTRUCTIONS, model="gpt-4o", mcp_params=mcp_params_list)
+    return AIAgent(
+        name="ResumeAgent",
+        instructions=RESUME_AGENT_INSTRUCTIONS,
+        model="gpt-4o",
+        mcp_params=direct_mcp_params_list,
+        session_manager=mcp_session_manager,
+        tools=[create_rag_function_tool(rag_tool)],
+    )
+
+
+# Resume agent for the MCP topology, the direct one needs a RAGTool and is built by its owner
+resume_agent = create_resume_agent()
 
 if __name__ == "__main__":
     import asyncio
@@ -29,11 +64,15 @@ if __name__ == "__main__":
     client = AzureAIClient()
     _openai_client = client.set_openai_client_defaults()
 
+    agent = resume_agent
+    if RAG_MODE != "mcp":
+        agent = create_resume_agent(RAGTool(collection_name="ilyan_resume", azure_ai_client=client, db_name="resume_vectorstore"))
+
     async def main(user_input: str):
         """
         Run the research agent with the provided user input.
         """
-        response = await resume_agent.run_agent_with_mcp(user_input)
+        response = await agent.run_agent_with_mcp(user_input)
         return response
 
     while True:
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+from stubs import LocalEmbeddingClient
+
+from openai_sdk_resume_assistant.RAG import vector_db as vector_db_module
+from openai_sdk_resume_assistant.RAG.vector_db import VectorDB
+
+# The backend app refuses to import without it, the tests never connect
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    """VectorDB in a temp directory, with local embeddings and without the shared embedding cache."""
+    monkeypatch.setattr(vector_db_module, "VECTOR_DB_DIR", tmp_path)
+    monkeypatch.setattr(vector_db_module, "get_embedding_cache", lambda: None)
+    db = VectorDB("test_vectorstore", azure_openai_client=LocalEmbeddingClient())  # type: ignore
+    yield db
+    db.pdf_extractor.close()
@@ -0,0 +1,47 @@
+from agents import function_tool
+from stubs import StubModel
+
+from openai_sdk_resume_assistant.agent_events import RetrievalHits, TextDelta, ToolCallFinished, ToolCallStarted
+from openai_sdk_resume_assistant.base_agent import AIAgent
+
+
+@function_tool
+def search_resumes(query: str) -> str:
+    """Search the resumes."""
+    return f"Potentially related Document (source: resume.pdf): Skills for {query}\nPage number: 2\n\n"
+
+
+def create_agent() -> AIAgent:
+    return AIAgent(
+        name="Resume agent",
+        instructions="Answer with the resumes.",
+        model=StubModel(latency=0),
+        mcp_params=[],
+        tools=[search_resumes],
+    )
+
+
+async def test_events_of_a_tool_calling_run():
+    events = [event async for event in create_agent().run_agent_with_mcp_events("python")]
+
+    started = [event for event in events if isinstance(event, ToolCallStarted)]
+    finished = [event for event in events if isinstance(event, ToolCallFinished)]
+    assert len(started) == len(finished) == 1
+    assert started[0].call_id.startswith("call_")
+    assert started[0].name == "search_resumes"
+    assert (finished[0].call_id, finished[0].name) == (started[0].call_id, started[0].name)
+    assert started[0].arguments == '{"query": "python"}'
+    assert finished[0].duration_ms >= 0
+
+    hits = [event for event in events if isinstance(event, RetrievalHits)]
+    assert [(hit.call_id, hit.hits) for hit in hits] == [(started[0].call_id, [{"source": "resume.pdf", "page": "2"}])]
+
+    # The answer comes after the tool call
+    text = "".join(event.text for event in events if isinstance(event, TextDelta))
+    assert text == "Answer: Potentially related Document (source: resume.pdf): Skills for python\nPage number: 2\n\n"
+    assert events.index(finished[0]) < next(index for index, event in enumerate(events) if isinstance(event, TextDelta))
+
+
+async def test_text_stream_of_a_tool_calling_run():
+    text = "".join([chunk async for chunk in create_agent().run_agent_with_mcp_stream("python")])
+    assert text.startswith("Answer: Potentially related Document")
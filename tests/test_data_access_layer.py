@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMessage
+from openai_sdk_resume_assistant.backend.app.services.data_access_layer import MongoDAL
+
+CREATED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def collection():
+    return AsyncMongoMockClient()["resume_assistant"]["chat_memory"]
+
+
+@pytest.fixture
+def dal(collection) -> MongoDAL:
+    return MongoDAL(collection)
+
+
+async def insert_chats(collection, created_at: list[datetime]) -> list[str]:
+    """Chats of one user, returns their ids newest first, as listed"""
+    ids = []
+    for index, timestamp in enumerate(created_at):
+        result = await collection.insert_one(
+            {"chat_name": f"chat {index}", "user_id": "user", "chat_messages": [], "message_count": 0, "created_at": timestamp}
+        )
+        ids.append((timestamp, result.inserted_id))
+    return [str(id_) for _, id_ in sorted(ids, reverse=True)]
+
+
+async def list_all(dal: MongoDAL, limit: int) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        page = await dal.list_chat_summaries("user", limit=limit, cursor=cursor)
+        pages.append([chat.id for chat in page.chats])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_cursor_round_trip():
+    doc = {"created_at": CREATED_AT, "_id": ObjectId()}
+    assert MongoDAL._decode_cursor(MongoDAL._encode_cursor(doc)) == (doc["created_at"], doc["_id"])
+
+
+@pytest.mark.parametrize("cursor", ["", "nonsense", "2025-01-01T12:00:00_not-an-id", f"yesterday_{ObjectId()}"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        MongoDAL._decode_cursor(cursor)
+
+
+async def test_pages_cover_every_chat_once_newest_first(dal, collection):
+    # Chats created at the same time are ordered by id, so no page boundary skips or repeats one
+    ids = await insert_chats(collection, [CREATED_AT, CREATED_AT, CREATED_AT, CREATED_AT - timedelta(hours=1), CREATED_AT])
+
+    pages = await list_all(dal, limit=2)
+
+    assert pages == [ids[0:2], ids[2:4], ids[4:5]]
+
+
+async def test_full_last_page_has_no_next_cursor(dal, collection):
+    ids = await insert_chats(collection, [CREATED_AT + timedelta(minutes=index) for index in range(4)])
+
+    assert await list_all(dal, limit=2) == [ids[0:2], ids[2:4]]
+    assert await list_all(dal, limit=4) == [ids]
+
+
+async def test_chats_of_other_users_are_not_listed(dal, collection):
+    await insert_chats(collection, [CREATED_AT])
+    page = await dal.list_chat_summaries("someone else")
+    assert page.chats == [] and page.next_cursor is None
+
+
+async def test_message_pages(dal):
+    chat_id = await dal.create_chat_memory("chat", "user")
+    await dal.add_messages_to_chats({chat_id: [ChatMessage(role="user", content=str(index)) for index in range(5)]})
+
+    async def page(before: int | None) -> tuple[int, list[str]]:
+        result = await dal.get_chat_messages_for_user(chat_id, "user", before=before, limit=2)
+        return result.start, [message.content for message in result.messages]
+
+    assert await page(None) == (3, ["3", "4"])
+    assert await page(3) == (1, ["1", "2"])
+    assert await page(1) == (0, ["0"])
+    assert await page(0) == (0, [])
+    assert await dal.get_chat_messages_for_user(chat_id, "someone else") is None
+
+
+async def test_legacy_messages_get_stable_ids(dal, collection):
+    legacy = [
+        {"role": "user", "content": "question", "timestamp": CREATED_AT},
+        {"id": "kept", "role": "agent", "content": "answer"},
+    ]
+    result = await collection.insert_one({"chat_name": "old chat", "user_id": "user", "chat_messages": legacy})
+    chat_id = str(result.inserted_id)
+
+    await dal.ensure_indexes()
+
+    first = await dal.get_chat_memory_for_user(chat_id, "user")
+    again = await dal.get_chat_memory_for_user(chat_id, "user")
+    assert [message.id for message in first.chat_messages] == [f"{chat_id}-0", "kept"]
+    assert [message.id for message in again.chat_messages] == [f"{chat_id}-0", "kept"]
+    history = await dal.get_chat_history_for_user(chat_id, "user")
+    assert history.message_count == 2
+
+
+async def test_appending_the_same_messages_again_is_a_no_op(dal, collection):
+    chat_id = await dal.create_chat_memory("chat", "user")
+    messages = [ChatMessage(role="user", content="question"), ChatMessage(role="agent", content="answer")]
+
+    assert await dal.add_messages_to_chats({chat_id: messages}) == 1
+    # A retry of a write that reached the server
+    assert await dal.add_messages_to_chats({chat_id: messages}) == 0
+
+    doc = await collection.find_one({"_id": ObjectId(chat_id)})
+    assert [message["content"] for message in doc["chat_messages"]] == ["question", "answer"]
+    assert doc["message_count"] == 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from openai_sdk_resume_assistant.RAG import embedding_cache
+from openai_sdk_resume_assistant.RAG.embedding_cache import EmbeddingCache
+
+MODEL = "text-embedding-test"
+DIM = 8
+ENTRY_BYTES = DIM * 4
+
+
+def vector(value: float) -> list[float]:
+    return [value] * DIM
+
+
+@pytest.fixture
+def cache(tmp_path) -> EmbeddingCache:
+    # Memory tier of one entry, so lookups go to disk
+    return EmbeddingCache(tmp_path, max_bytes=3 * ENTRY_BYTES, memory_entries=1)
+
+
+def test_put_then_get(cache):
+    cache.put_many(MODEL, ["a", "b"], [vector(1.0), np.full(DIM, 2.0)])
+
+    found = cache.get_many(MODEL, ["a", "b", "missing"])
+
+    np.testing.assert_array_equal(found[0], vector(1.0))
+    np.testing.assert_array_equal(found[1], vector(2.0))
+    assert found[2] is None
+    assert cache.get("other-model", "a") is None
+
+
+def test_texts_are_normalized(cache):
+    cache.put(MODEL, "senior   python\ndeveloper", vector(1.0))
+    assert cache.get(MODEL, "senior python developer") is not None
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(cache, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(clock)))
+    cache.put_many(MODEL, ["a", "b", "c"], [vector(1.0), vector(2.0), vector(3.0)])
+    # "a" is used again, "b" becomes the least recently used
+    assert cache.get(MODEL, "a") is not None
+
+    cache.put(MODEL, "d", vector(4.0))
+
+    assert cache.stats()["bytes"] == 3 * ENTRY_BYTES
+    assert cache.evictions == 1
+    cache._memory.clear()
+    assert [text for text in "abcd" if cache.get(MODEL, text) is not None] == ["a", "c", "d"]
+
+
+def test_eviction_is_bounded_by_bytes_across_dimensions(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_bytes=2 * ENTRY_BYTES, memory_entries=1)
+    cache.put(MODEL, "small", vector(1.0))
+    cache.put(MODEL, "large", [1.0] * (2 * DIM))
+
+    # The large vector alone fills the budget
+    assert cache.stats()["bytes"] == 2 * ENTRY_BYTES
+    assert cache.get(MODEL, "small") is None
+
+
+def test_lookups_do_not_write_to_the_index(cache):
+    cache.put_many(MODEL, ["a", "b"], [vector(1.0), vector(2.0)])
+    changes = cache._db.total_changes
+
+    for _ in range(10):
+        cache.get_many(MODEL, ["a", "b", "missing"])
+
+    assert cache._db.total_changes == changes
+
+
+def test_touches_are_written_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_TOUCH_BATCH", 2)
+    cache.put_many(MODEL, ["a", "b"], [vector(1.0), vector(2.0)])
+    changes = cache._db.total_changes
+
+    cache.get(MODEL, "a")
+    assert cache._db.total_changes == changes
+    cache.get(MODEL, "b")
+    assert cache._db.total_changes == changes + 2
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from openai_sdk_resume_assistant.RAG import embedding_pipeline
+from openai_sdk_resume_assistant.RAG.embedding_pipeline import EmbeddingPipeline
+
+
+class FakeEmbeddingsClient:
+    """Client whose embeddings.create returns len(text) vectors, or raises the queued errors first."""
+
+    def __init__(self, errors: list[Exception] | None = None):
+        self.errors = list(errors or [])
+        self.requests: list[list[str]] = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, input: list[str], model: str):
+        self.requests.append(list(input))
+        if self.errors:
+            raise self.errors.pop(0)
+        # Out of order on purpose, the pipeline sorts by index
+        data = [SimpleNamespace(index=index, embedding=[float(len(text))]) for index, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1], usage=SimpleNamespace(prompt_tokens=len(input)))
+
+
+def rate_limit_error(retry_after: str | None = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://example.test/embeddings"))
+    return openai.RateLimitError("Too many requests", response=response, body=None)
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    delays: list[float] = []
+    monkeypatch.setattr(embedding_pipeline.time, "sleep", delays.append)
+    return delays
+
+
+def test_make_batches_respects_batch_size():
+    pipeline = EmbeddingPipeline(FakeEmbeddingsClient(), batch_size=2, max_batch_tokens=10_000)
+    assert pipeline.make_batches(["a", "b", "c", "d", "e"]) == [[0, 1], [2, 3], [4]]
+
+
+def test_make_batches_respects_token_budget():
+    # 40 characters are ~11 tokens, two of them exceed the budget of 20
+    pipeline = EmbeddingPipeline(FakeEmbeddingsClient(), batch_size=100, max_batch_tokens=20)
+    texts = ["x" * 40, "x" * 40, "short", "x" * 400]
+    assert pipeline.make_batches(texts) == [[0], [1, 2], [3]]
+
+
+def test_embed_keeps_order_and_requests_duplicates_once():
+    client = FakeEmbeddingsClient()
+    pipeline = EmbeddingPipeline(client, batch_size=2, max_concurrency=2)
+    embedded: list[int] = []
+
+    embeddings = pipeline.embed(["aa", "b", "aa", "cccc"], on_embedded=embedded.append)
+
+    assert embeddings == [[2.0], [1.0], [2.0], [4.0]]
+    assert sorted(text for request in client.requests for text in request) == ["aa", "b", "cccc"]
+    assert sum(embedded) == 4
+
+
+def test_embed_of_nothing_makes_no_request():
+    client = FakeEmbeddingsClient()
+    assert EmbeddingPipeline(client).embed([]) == []
+    assert client.requests == []
+
+
+def test_retry_honours_retry_after(sleeps):
+    client = FakeEmbeddingsClient(errors=[rate_limit_error("2.5")])
+    pipeline = EmbeddingPipeline(client, max_retries=3)
+
+    assert pipeline.embed(["abc"]) == [[3.0]]
+    assert sleeps == [2.5]
+    assert len(client.requests) == 2
+
+
+def test_retry_backs_off_exponentially_without_retry_after(sleeps):
+    client = FakeEmbeddingsClient(errors=[rate_limit_error(), rate_limit_error(), rate_limit_error("soon")])
+    pipeline = EmbeddingPipeline(client, max_retries=3, backoff_base=1.0)
+
+    pipeline.embed(["abc"])
+
+    # Base * 2**attempt with a jitter of 0.5-1.5, an unparsable retry-after falls back to the backoff
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        assert 0.5 * 2**attempt <= delay <= 1.5 * 2**attempt
+
+
+def test_retry_gives_up_after_max_retries(sleeps):
+    client = FakeEmbeddingsClient(errors=[rate_limit_error("0")] * 3)
+    pipeline = EmbeddingPipeline(client, max_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        pipeline.embed(["abc"])
+    assert len(client.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    response = httpx.Response(400, request=httpx.Request("POST", "https://example.test/embeddings"))
+    client = FakeEmbeddingsClient(errors=[openai.BadRequestError("Bad input", response=response, body=None)])
+
+    with pytest.raises(openai.BadRequestError):
+        EmbeddingPipeline(client).embed(["abc"])
+    assert len(client.requests) == 1
+    assert sleeps == []
@@ -0,0 +1,108 @@
+import pytest
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatHistory, ChatMessage
+from openai_sdk_resume_assistant.backend.app.services import history_cache
+from openai_sdk_resume_assistant.backend.app.services.history_cache import ChatHistoryCache
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    now = [0.0]
+    monkeypatch.setattr(history_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def history(chat_id: str = "chat", user_id: str = "user", count: int = 2) -> ChatHistory:
+    messages = [ChatMessage(role="user", content=f"message {index}") for index in range(count)]
+    return ChatHistory(chat_id=chat_id, user_id=user_id, messages=messages, message_count=count)
+
+
+def contents(cached: ChatHistory | None) -> list[str]:
+    assert cached is not None
+    return [message.content for message in cached.messages]
+
+
+def test_get_returns_a_copy():
+    cache = ChatHistoryCache()
+    cache.put(history())
+
+    cache.get("chat", "user").messages.clear()  # type: ignore
+
+    assert contents(cache.get("chat", "user")) == ["message 0", "message 1"]
+    assert cache.stats()["hits"] == 2
+
+
+def test_other_users_miss():
+    cache = ChatHistoryCache()
+    cache.put(history())
+
+    assert cache.get("chat", "someone else") is None
+    assert cache.get("missing", "user") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_put_keeps_the_newest_messages():
+    cache = ChatHistoryCache(max_messages=3)
+    cache.put(history(count=5))
+
+    cached = cache.get("chat", "user")
+    assert contents(cached) == ["message 2", "message 3", "message 4"]
+    assert cached.message_count == 5  # type: ignore
+    assert cached.offset == 2  # type: ignore
+
+
+def test_append_extends_the_tail_of_cached_chats_only():
+    cache = ChatHistoryCache(max_messages=3)
+    cache.put(history(count=2))
+
+    cache.append("chat", [ChatMessage(role="user", content="question"), ChatMessage(role="agent", content="answer")])
+    cache.append("missing", [ChatMessage(role="user", content="question")])
+
+    cached = cache.get("chat", "user")
+    assert contents(cached) == ["message 1", "question", "answer"]
+    assert cached.message_count == 4  # type: ignore
+    assert cache.get("missing", "user") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ChatHistoryCache(ttl=10)
+    cache.put(history())
+
+    clock[0] = 9.9
+    assert cache.get("chat", "user") is not None
+    clock[0] = 10.0
+    assert cache.get("chat", "user") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used():
+    cache = ChatHistoryCache(max_entries=2)
+    cache.put(history("a"))
+    cache.put(history("b"))
+    cache.get("a", "user")
+
+    cache.put(history("c"))
+
+    assert cache.get("b", "user") is None
+    assert cache.get("a", "user") is not None
+    assert cache.get("c", "user") is not None
+
+
+def test_set_summary_only_moves_forward():
+    cache = ChatHistoryCache()
+    cache.put(history())
+
+    cache.set_summary("chat", "newer", 4)
+    cache.set_summary("chat", "older", 2)
+
+    cached = cache.get("chat", "user")
+    assert (cached.summary, cached.summarized_count) == ("newer", 4)  # type: ignore
+
+
+def test_invalidate():
+    cache = ChatHistoryCache()
+    cache.put(history())
+
+    cache.invalidate("chat")
+
+    assert cache.get("chat", "user") is None
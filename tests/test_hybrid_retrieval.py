@@ -0,0 +1,77 @@
+import pytest
+
+from openai_sdk_resume_assistant.RAG.hybrid_retrieval import (
+    BM25Index,
+    LexicalReranker,
+    create_reranker,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+def test_rrf_scores_are_summed_over_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]], k=60)
+
+    assert [id_ for id_, _ in fused] == ["b", "c", "a", "d"]
+    assert dict(fused)["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert dict(fused)["d"] == pytest.approx(1 / 63)
+
+
+def test_rrf_favours_agreement_over_a_single_top_rank():
+    # "x" is first in one list only, "y" is second in both
+    fused = reciprocal_rank_fusion([["x", "y"], ["z", "y"]])
+    assert fused[0][0] == "y"
+
+
+def test_rrf_keeps_the_order_of_a_single_ranking():
+    assert [id_ for id_, _ in reciprocal_rank_fusion([["c", "a", "b"]])] == ["c", "a", "b"]
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_rrf_k_flattens_the_rank_weights():
+    # "a" is first in one list and missing from the other, "b" is fourth in both
+    rankings = [["a", "w", "x", "b"], ["y", "z", "v", "b"]]
+    assert reciprocal_rank_fusion(rankings, k=1)[0][0] == "a"
+    assert reciprocal_rank_fusion(rankings, k=60)[0][0] == "b"
+
+
+def test_tokenize_keeps_technical_terms():
+    assert tokenize("He knows C++, C#, Node.js and CI/CD") == ["knows", "c++", "c#", "node.js", "ci/cd"]
+
+
+def test_bm25_ranks_rarer_and_more_frequent_terms_higher():
+    index = BM25Index()
+    index.add(
+        ["python", "java", "both"],
+        ["python python developer", "java developer", "python and java developer"],
+    )
+
+    assert [id_ for id_, _ in index.search("python", top_k=3)] == ["python", "both"]
+    assert index.search("kotlin", top_k=3) == []
+
+
+def test_bm25_updates_incrementally():
+    index = BM25Index()
+    index.add(["a", "b"], ["python developer", "java developer"])
+    index.remove(["a"])
+    index.add(["b"], ["kotlin developer"])
+
+    assert len(index) == 1
+    assert index.search("python", top_k=3) == []
+    assert index.search("java", top_k=3) == []
+    assert [id_ for id_, _ in index.search("kotlin", top_k=3)] == ["b"]
+
+
+def test_lexical_reranker_prefers_coverage_then_proximity():
+    scores = LexicalReranker().rerank(
+        "python fastapi",
+        ["python developer", "python and fastapi", "python with many other skills then fastapi"],
+    )
+
+    assert scores[1] > scores[2] > scores[0]
+
+
+def test_create_reranker():
+    assert create_reranker("none") is None
+    assert isinstance(create_reranker("lexical"), LexicalReranker)
+    assert create_reranker("unknown") is None
@@ -0,0 +1,102 @@
+import chromadb
+import pytest
+
+from openai_sdk_resume_assistant.RAG.collection_registry import CollectionStats
+from openai_sdk_resume_assistant.RAG.ingestion_manifest import IngestionManifest, chunk_id
+
+
+@pytest.fixture
+def collection():
+    client = chromadb.EphemeralClient()
+    yield client.get_or_create_collection("manifest_test")
+    client.delete_collection("manifest_test")
+
+
+def reloaded(collection) -> IngestionManifest:
+    return IngestionManifest(collection._client.get_collection(collection.name))
+
+
+def test_chunk_id_is_content_addressed():
+    assert chunk_id("My Resume.pdf", "Python developer") == chunk_id("My Resume.pdf", "Python developer")
+    assert chunk_id("My Resume.pdf", "Python developer").startswith("my_resume_")
+    assert chunk_id("My Resume.pdf", "Python developer") != chunk_id("My Resume.pdf", "Java developer")
+    # The same text in another document is another chunk
+    assert chunk_id("My Resume.pdf", "Python developer") != chunk_id("Cover Letter.pdf", "Python developer")
+
+
+def test_manifest_round_trip(collection):
+    manifest = IngestionManifest(collection)
+    manifest.update("resume.pdf", "hash-1", ["a", "b"], source="resume.pdf", page_count=1, size=1234)
+    manifest.save()
+
+    manifest = reloaded(collection)
+    assert manifest.is_unchanged("resume.pdf", "hash-1")
+    assert not manifest.is_unchanged("resume.pdf", "hash-2")
+    assert not manifest.is_unchanged("other.pdf", "hash-1")
+    assert manifest.chunk_ids("resume.pdf") == {"a", "b"}
+    assert manifest.chunk_count == 2
+    assert manifest.files() == [
+        {
+            "name": "resume",
+            "file": "resume.pdf",
+            "source": "resume.pdf",
+            "page_count": 1,
+            "chunk_count": 2,
+            "bytes": 1234,
+            "hash": "hash-1",
+        }
+    ]
+
+
+def test_save_changes_the_version_and_keeps_other_metadata(collection):
+    collection.modify(metadata={"owner": "tenant-1"})
+    manifest = IngestionManifest(collection)
+    manifest.save()
+    first = collection.metadata[IngestionManifest.VERSION_KEY]
+    manifest.save()
+
+    assert collection.metadata[IngestionManifest.VERSION_KEY] != first
+    assert collection.metadata["owner"] == "tenant-1"
+
+
+def test_save_records_the_collection_stats(collection):
+    collection.add(ids=["a", "b", "c"], documents=["a", "b", "c"], embeddings=[[1.0, 0.0]] * 3)
+    manifest = IngestionManifest(collection)
+    manifest.update("resume.pdf", "hash-1", ["a", "b", "c"])
+    manifest.save()
+
+    stats = CollectionStats.from_metadata(reloaded(collection).collection.metadata)
+    assert (stats.chunk_count, stats.file_count) == (3, 1)
+    assert stats.last_ingested_at is not None
+
+
+def test_chunk_ids_of_documents_ingested_before_the_manifest(collection):
+    collection.add(
+        ids=["resume_0", "resume_1", "tracked"],
+        documents=["a", "b", "c"],
+        embeddings=[[1.0, 0.0]] * 3,
+        metadatas=[{"file_name": "resume"}] * 3,
+    )
+    manifest = IngestionManifest(collection)
+    manifest.update("resume_v2.pdf", "hash", ["tracked"])
+
+    # Found by file name, without the chunks another document of the manifest owns
+    assert manifest.chunk_ids("resume.pdf") == {"resume_0", "resume_1"}
+
+
+def test_reingestion_only_embeds_changed_chunks(vector_db):
+    collection = vector_db.get_or_create_collection("resumes")
+    manifest = IngestionManifest(collection)
+    chunks = [("Python developer", {"page": 0}), ("Led a team of five", {"page": 1})]
+    assert vector_db._sync_document(collection, manifest, "resume.pdf", "v1", chunks, desc="v1") == (2, 0)
+
+    # One chunk kept (on another page), one replaced
+    chunks = [("Led a team of five", {"page": 0}), ("Azure and FastAPI", {"page": 1})]
+    assert vector_db._sync_document(collection, manifest, "resume.pdf", "v2", chunks, desc="v2") == (1, 1)
+
+    stored = collection.get(include=["documents", "metadatas"])
+    assert sorted(zip(stored["documents"], [m["page"] for m in stored["metadatas"]], strict=True)) == [
+        ("Azure and FastAPI", 1),
+        ("Led a team of five", 0),
+    ]
+    assert reloaded(collection).chunk_ids("resume.pdf") == set(stored["ids"])
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from openai_sdk_resume_assistant.backend.app.models.chat_schemas import ChatMessage
+from openai_sdk_resume_assistant.backend.app.services.message_writer import MessageWriter
+
+
+class FakeDAL:
+    """Records the bulk writes, failing the first ones when asked to."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.writes: list[dict[str, list[str]]] = []
+
+    async def add_messages_to_chats(self, messages_by_chat: dict[str, list[ChatMessage]]) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Mongo unavailable")
+        self.writes.append({chat_id: [message.content for message in messages] for chat_id, messages in messages_by_chat.items()})
+        return len(messages_by_chat)
+
+
+def turn(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(role="user", content=content) for content in contents]
+
+
+@pytest.fixture
+async def writer_factory():
+    writers: list[MessageWriter] = []
+
+    def create(dal: FakeDAL, **kwargs) -> MessageWriter:
+        writer = MessageWriter(dal, **kwargs)  # type: ignore
+        writer.start()
+        writers.append(writer)
+        return writer
+
+    yield create
+    for writer in writers:
+        await writer.close()
+
+
+async def test_queued_turns_are_coalesced_per_chat(writer_factory):
+    dal = FakeDAL()
+    writer = writer_factory(dal, linger=0.01)
+
+    writer.submit("a", turn("q1", "a1"))
+    writer.submit("b", turn("q2", "a2"))
+    writer.submit("a", turn("q3", "a3"))
+    await writer.close()
+
+    assert dal.writes == [{"a": ["q1", "a1", "q3", "a3"], "b": ["q2", "a2"]}]
+
+
+async def test_batches_are_bounded(writer_factory):
+    dal = FakeDAL()
+    writer = writer_factory(dal, batch_size=2, linger=0.01)
+
+    for index in range(5):
+        writer.submit("a", turn(str(index)))
+    await writer.close()
+
+    assert dal.writes == [{"a": ["0", "1"]}, {"a": ["2", "3"]}, {"a": ["4"]}]
+
+
+async def test_close_flushes_pending_turns(writer_factory):
+    dal = FakeDAL()
+    # A long linger, only close writes the turn in time
+    writer = writer_factory(dal, linger=0.2)
+
+    writer.submit("a", turn("q", "a"))
+    assert dal.writes == []
+    await writer.close()
+
+    assert dal.writes == [{"a": ["q", "a"]}]
+
+
+async def test_submit_after_close_writes_directly(writer_factory):
+    dal = FakeDAL()
+    writer = writer_factory(dal)
+    await writer.close()
+
+    writer.submit("a", turn("late"))
+    writer.submit("a", [])
+    await writer.close()
+
+    assert dal.writes == [{"a": ["late"]}]
+
+
+async def test_full_queue_writes_directly(writer_factory):
+    dal = FakeDAL()
+    writer = writer_factory(dal, max_pending=1, linger=0.01)
+
+    writer.submit("a", turn("queued"))
+    writer.submit("b", turn("direct"))
+    await writer.close()
+
+    assert sorted(dal.writes, key=str) == [{"a": ["queued"]}, {"b": ["direct"]}]
+
+
+async def test_failed_writes_are_retried(writer_factory):
+    dal = FakeDAL(failures=2)
+    writer = writer_factory(dal, linger=0, max_retries=2)
+
+    writer.submit("a", turn("q"))
+    await writer.close()
+
+    assert dal.writes == [{"a": ["q"]}]
+
+
+async def test_writes_are_dropped_after_max_retries(writer_factory):
+    dal = FakeDAL(failures=2)
+    writer = writer_factory(dal, linger=0, max_retries=1)
+
+    writer.submit("a", turn("dropped"))
+    await asyncio.sleep(0.2)
+    # The writer keeps going after dropping a batch
+    writer.submit("a", turn("written"))
+    await asyncio.wait_for(writer.close(), timeout=1)
+
+    assert dal.writes == [{"a": ["written"]}]
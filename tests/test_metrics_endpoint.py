@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from openai_sdk_resume_assistant.backend.app import main
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # Without the lifespan, nothing connects to Mongo or starts the MCP servers
+    return TestClient(main.app)
+
+
+def test_metrics_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "")
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "secret")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Basic secret"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "resume_assistant_" in response.text
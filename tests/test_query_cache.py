@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from openai_sdk_resume_assistant.RAG import query_cache
+from openai_sdk_resume_assistant.RAG.query_cache import QueryCache, normalize_query
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    now = [0.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_normalize_query():
+    assert normalize_query("  What   are his SKILLS?? ") == "what are his skills"
+
+
+def test_exact_hit_ignores_case_whitespace_and_punctuation():
+    cache = QueryCache()
+    cache.put("resumes", "What are his skills?", 5, "v1", ["chunk"])
+
+    assert cache.get("resumes", "what are  his skills", 5, "v1") == ["chunk"]
+    assert cache.get("resumes", "what are his skills", 3, "v1") is None
+    assert cache.get("other", "what are his skills", 5, "v1") is None
+    assert cache.exact_hits == 1
+
+
+def test_new_collection_version_invalidates_exact_hits():
+    cache = QueryCache()
+    cache.put("resumes", "skills", 5, "v1", ["old"])
+
+    assert cache.get("resumes", "skills", 5, "v2") is None
+    # The stale entry is dropped on the lookup
+    assert cache.stats()["entries"] == 0
+
+
+def test_put_drops_entries_of_older_versions_of_the_collection():
+    cache = QueryCache()
+    cache.put("resumes", "skills", 5, "v1", ["old"])
+    cache.put("letters", "skills", 5, "v1", ["letter"])
+
+    cache.put("resumes", "experience", 5, "v2", ["new"])
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("letters", "skills", 5, "v1") == ["letter"]
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(ttl=10)
+    cache.put("resumes", "skills", 5, "v1", ["chunk"])
+
+    clock[0] = 9.9
+    assert cache.get("resumes", "skills", 5, "v1") == ["chunk"]
+    clock[0] = 10.0
+    assert cache.get("resumes", "skills", 5, "v1") is None
+
+
+def test_near_duplicate_hit_above_threshold():
+    cache = QueryCache(similarity_threshold=0.95)
+    cache.put("resumes", "what are his skills", 5, "v1", ["chunk"], embedding=np.array([1.0, 0.0]))
+
+    # Not normalized on purpose, cosine similarity 0.99
+    assert cache.get_similar("resumes", np.array([2.0, 0.28]), 5, "v1") == ["chunk"]
+    # Cosine similarity 0.71
+    assert cache.get_similar("resumes", np.array([1.0, 1.0]), 5, "v1") is None
+    assert (cache.similar_hits, cache.misses) == (1, 1)
+
+
+def test_near_duplicate_picks_the_most_similar_entry():
+    cache = QueryCache(similarity_threshold=0.9)
+    cache.put("resumes", "a", 5, "v1", ["a"], embedding=np.array([1.0, 0.3]))
+    cache.put("resumes", "b", 5, "v1", ["b"], embedding=np.array([1.0, 0.1]))
+
+    assert cache.get_similar("resumes", np.array([1.0, 0.0]), 5, "v1") == ["b"]
+
+
+def test_new_collection_version_invalidates_near_duplicate_hits():
+    cache = QueryCache(similarity_threshold=0.9)
+    cache.put("resumes", "skills", 5, "v1", ["old"], embedding=np.array([1.0, 0.0]))
+
+    assert cache.get_similar("resumes", np.array([1.0, 0.0]), 5, "v2") is None
+    assert cache.get_similar("resumes", np.array([1.0, 0.0]), 3, "v1") is None
+    assert cache.get_similar("other", np.array([1.0, 0.0]), 5, "v1") is None
+
+
+def test_threshold_of_zero_disables_near_duplicate_tier():
+    cache = QueryCache(similarity_threshold=0)
+    cache.put("resumes", "skills", 5, "v1", ["chunk"], embedding=np.array([1.0, 0.0]))
+
+    assert cache.get_similar("resumes", np.array([1.0, 0.0]), 5, "v1") is None
+
+
+def test_evicts_least_recently_used():
+    cache = QueryCache(max_entries=2)
+    cache.put("resumes", "a", 5, "v1", ["a"])
+    cache.put("resumes", "b", 5, "v1", ["b"])
+    cache.get("resumes", "a", 5, "v1")
+
+    cache.put("resumes", "c", 5, "v1", ["c"])
+
+    assert cache.evictions == 1
+    assert cache.get("resumes", "b", 5, "v1") is None
+    assert cache.get("resumes", "a", 5, "v1") == ["a"]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from openai_sdk_resume_assistant.agent_events import TextDelta, ToolCallStarted
+from openai_sdk_resume_assistant.backend.app.services.sse_stream import HEARTBEAT, AnswerStream
+
+
+async def deltas(*items, delay: float = 0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def collect(stream: AnswerStream) -> list[str]:
+    return [frame async for frame in stream.frames()]
+
+
+def chunks(frames: list[str]) -> list[str]:
+    return [json.loads(frame.removeprefix("data: "))["chunk"] for frame in frames if frame.startswith("data: ")]
+
+
+async def test_deltas_are_coalesced_up_to_max_chars():
+    stream = AnswerStream(deltas(*"abcdefgh", delay=0.01), max_chars=4, max_delay=10)
+
+    frames = await collect(stream)
+
+    assert chunks(frames) == ["abcd", "efgh"]
+    assert stream.frames_sent == 2
+    assert stream.completed and stream.text == "abcdefgh"
+
+
+async def test_buffered_text_is_sent_after_max_delay():
+    # The second delta arrives long after the first, which must not wait for it
+    stream = AnswerStream(deltas("Hello", " world", delay=0.2), max_chars=100, max_delay=0.01)
+
+    frames = await collect(stream)
+
+    assert chunks(frames) == ["Hello", " world"]
+
+
+async def test_zero_max_chars_sends_every_delta():
+    stream = AnswerStream(deltas("a", "b", "c", delay=0.01), max_chars=0)
+    assert chunks(await collect(stream)) == ["a", "b", "c"]
+
+
+async def test_agent_events_are_named_events_after_the_text_before_them():
+    events = deltas("Looking", " up", ToolCallStarted("call-1", "rag", "{}", 12.34), TextDelta("Done"))
+    stream = AnswerStream(events, max_chars=100, max_delay=10)
+
+    frames = await collect(stream)
+
+    assert frames[0] == 'data: {"chunk": "Looking up"}\n\n'
+    assert frames[1].startswith("event: tool_call_started\n")
+    assert json.loads(frames[1].split("data: ", 1)[1]) == {
+        "call_id": "call-1",
+        "name": "rag",
+        "arguments": "{}",
+        "elapsed_ms": 12.3,
+    }
+    assert chunks(frames[2:]) == ["Done"]
+    assert stream.text == "Looking upDone"
+
+
+async def test_heartbeats_while_waiting():
+    stream = AnswerStream(deltas("slow", delay=0.12), heartbeat_interval=0.05)
+
+    frames = await collect(stream)
+
+    assert frames.count(HEARTBEAT) >= 1
+    assert chunks(frames) == ["slow"]
+
+
+async def test_disconnect_stops_the_upstream_generation():
+    cancelled = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield "x"
+                await asyncio.sleep(0.01)
+        finally:
+            cancelled.set()
+
+    async def is_disconnected() -> bool:
+        return True
+
+    stream = AnswerStream(endless(), is_disconnected=is_disconnected, poll_interval=0.05)
+
+    await asyncio.wait_for(collect(stream), timeout=1)
+
+    assert stream.disconnected and not stream.completed
+    assert cancelled.is_set()
+
+
+async def test_upstream_error_is_raised_after_the_text_before_it():
+    async def failing():
+        yield "partial"
+        raise RuntimeError("model failed")
+
+    stream = AnswerStream(failing(), max_chars=100, max_delay=10)
+    frames = []
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        async for frame in stream.frames():
+            frames.append(frame)
+
+    assert chunks(frames) == ["partial"]
+    assert not stream.completed
@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import io
+import threading
+
+import pytest
+from starlette.requests import Request
+
+from openai_sdk_resume_assistant.backend.app.services import upload_stream
+from openai_sdk_resume_assistant.backend.app.services.upload_stream import UploadError, UploadQueue, stream_uploaded_files
+from openai_sdk_resume_assistant.RAG.document_source import DocumentBuffer, DocumentSource
+
+BOUNDARY = "test-boundary"
+
+
+def multipart(*files: tuple[str, bytes]) -> bytes:
+    body = b""
+    for name, content in files:
+        body += (
+            (
+                f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+                "Content-Type: text/plain\r\n\r\n"
+            ).encode()
+            + content
+            + b"\r\n"
+        )
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def upload_request(body: bytes, chunk_size: int = 64 * 1024) -> Request:
+    chunks = [body[start : start + chunk_size] for start in range(0, len(body), chunk_size)]
+
+    async def receive():
+        return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/chat/upload_files",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def document(name: str = "resume.txt") -> DocumentSource:
+    return DocumentSource(name, io.BytesIO(b"Python developer"), 16, "hash")
+
+
+async def test_files_are_streamed_with_their_content():
+    documents = [
+        document async for document in stream_uploaded_files(upload_request(multipart(("a.txt", b"A"), ("b.txt", b"B"))))
+    ]
+
+    assert [(document.name, document.content_type, document.read_bytes()) for document in documents] == [
+        ("a.txt", "text/plain", b"A"),
+        ("b.txt", "text/plain", b"B"),
+    ]
+    for document in documents:
+        document.close()
+
+
+async def test_spilling_writes_run_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(upload_stream, "DocumentBuffer", functools.partial(DocumentBuffer, max_memory=100))
+    threaded: list[int] = []
+    to_thread = asyncio.to_thread
+
+    async def record_to_thread(function, data):
+        threaded.append(len(data))
+        return await to_thread(function, data)
+
+    monkeypatch.setattr(upload_stream.asyncio, "to_thread", record_to_thread)
+    content = b"x" * 1000
+
+    documents = [
+        document async for document in stream_uploaded_files(upload_request(multipart(("big.txt", content)), chunk_size=80))
+    ]
+
+    assert documents[0].read_bytes() == content
+    assert documents[0].path is not None
+    # Every write from the one spilling the buffer on, none of those kept in memory
+    assert sum(threaded) > len(content) - 100
+    documents[0].close()
+
+
+def test_queue_yields_the_files_until_closed():
+    uploads = UploadQueue(timeout=1)
+    uploads.put(document("a.txt"))
+    uploads.put(document("b.txt"))
+    uploads.close()
+
+    assert [document.name for document in uploads] == ["a.txt", "b.txt"]
+
+
+def test_queue_raises_the_error_of_an_aborted_upload():
+    uploads = UploadQueue(timeout=1)
+    uploads.put(document())
+    uploads.abort(UploadError("Upload cancelled"))
+
+    with pytest.raises(UploadError, match="cancelled"):
+        list(uploads)
+
+
+def test_queue_wait_for_the_next_file_is_bounded():
+    uploads = UploadQueue(timeout=0.05)
+    uploads.put(document())
+    received = []
+
+    with pytest.raises(UploadError, match="stalled"):
+        for item in uploads:
+            received.append(item.name)
+
+    assert received == ["resume.txt"]
+
+
+def test_files_put_after_discard_are_closed():
+    uploads = UploadQueue(timeout=1)
+    queued, late = document("queued.txt"), document("late.txt")
+    uploads.put(queued)
+
+    uploads.discard()
+    uploads.put(late)
+
+    assert queued.file.closed and late.file.closed
+
+
+def test_worker_receives_files_as_they_arrive():
+    uploads = UploadQueue(timeout=1)
+    received = []
+    worker = threading.Thread(target=lambda: received.extend(item.name for item in uploads))
+    worker.start()
+
+    uploads.put(document("a.txt"))
+    uploads.put(document("b.txt"))
+    uploads.close()
+    worker.join(timeout=2)
+
+    assert received == ["a.txt", "b.txt"]